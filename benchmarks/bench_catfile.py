@@ -0,0 +1,68 @@
+"""Pooled ``git cat-file --batch`` reads vs. GitPython object traversal.
+
+    python -m benchmarks.bench_catfile --files 10000 --threads 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import git
+
+from benchmarks.synthetic import SyntheticRepoSpec, make_synthetic_repo
+from developerscope.catfile import get_pool
+
+
+def read_gitpython(repo: git.Repo) -> int:
+    total = 0
+    for item in repo.head.commit.tree.traverse():
+        if isinstance(item, git.Blob):
+            total += len(item.data_stream.read())
+    return total
+
+
+def read_catfile(repo: git.Repo, threads: int) -> int:
+    pool = get_pool(repo)
+    with pool.reader() as reader:
+        entries = list(reader.iter_tree(repo.head.commit.hexsha))
+
+    def read_chunk(chunk) -> int:
+        with pool.reader() as reader:
+            return sum(len(data) for data in reader.read_blobs(e.hexsha for e in chunk))
+
+    chunks = [entries[i::threads] for i in range(threads)]
+    with ThreadPoolExecutor(threads) as executor:
+        return sum(executor.map(read_chunk, chunks))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--loc", type=int, default=60)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec = SyntheticRepoSpec(files=args.files, loc_per_file=args.loc, merges_per_branch=0)
+        repo = git.Repo(make_synthetic_repo(tmp, spec))
+
+        started = time.perf_counter()
+        old_bytes = read_gitpython(repo)
+        old_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        new_bytes = read_catfile(repo, args.threads)
+        new_s = time.perf_counter() - started
+        get_pool(repo).close()
+
+        assert old_bytes == new_bytes, (old_bytes, new_bytes)
+        print(f"GitPython : {old_s:7.3f}s for {args.files} blobs ({old_bytes / 1e6:.1f} MB)")
+        print(f"cat-file  : {new_s:7.3f}s with {args.threads} reader(s)")
+        print(f"speed-up  : {old_s / new_s:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Diff-scoped vs. full-tree Halstead effort on a synthetic repository.
+
+    python -m benchmarks.bench_halstead --files 5000 --merges 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import git
+from radon.metrics import h_visit
+
+from benchmarks.synthetic import SyntheticRepoSpec, make_synthetic_repo
+from developerscope.haslted import halstead_effort
+
+
+def _legacy_effort_for_blob(blob: git.Blob) -> float:
+    # The pre-diff-scoped implementation, kept as the baseline.
+    if not str(blob.path).endswith(".py"):
+        return 0.0
+    code = blob.data_stream.read().decode("utf-8", errors="replace")
+    if not code.strip():
+        return 0.0
+    try:
+        h = h_visit(code).total if hasattr(h_visit(code), "total") else h_visit(code)
+        return float(getattr(h, "effort", 0.0))
+    except Exception:
+        return 0.0
+
+
+def legacy_halstead_effort(commit: git.Commit) -> float:
+    total = 0.0
+    for item in commit.tree.traverse():
+        if isinstance(item, git.Blob):
+            total += _legacy_effort_for_blob(item)
+    for item in commit.parents[0].tree.traverse():
+        if isinstance(item, git.Blob):
+            total -= _legacy_effort_for_blob(item)
+    return round(total, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--loc", type=int, default=60)
+    parser.add_argument("--merges", type=int, default=5)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec = SyntheticRepoSpec(
+            files=args.files, loc_per_file=args.loc, merges_per_branch=args.merges
+        )
+        repo = git.Repo(make_synthetic_repo(tmp, spec))
+        merges = [c for c in repo.iter_commits("master") if len(c.parents) > 1]
+
+        started = time.perf_counter()
+        new = [halstead_effort(c) for c in merges]
+        new_s = time.perf_counter() - started
+        print(f"diff-scoped : {new_s:8.3f}s  ({new_s / len(merges) * 1000:.1f} ms/merge)")
+
+        if args.skip_legacy:
+            return
+        started = time.perf_counter()
+        old = [legacy_halstead_effort(c) for c in merges]
+        old_s = time.perf_counter() - started
+        print(f"full-tree   : {old_s:8.3f}s  ({old_s / len(merges) * 1000:.1f} ms/merge)")
+        print(f"speed-up    : {old_s / new_s:8.1f}x over {len(merges)} merges, {args.files} files")
+
+        mismatched = [
+            (c.hexsha[:8], a, b)
+            for c, a, b in zip(merges, new, old)
+            if abs(a - b) > 0.01 * max(1.0, abs(b))
+        ]
+        if mismatched:
+            print("totals differ:", mismatched)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Commit metrics inline on the event loop vs. in the process-pool service.
+
+    python -m benchmarks.bench_metrics_pool --files 2000 --loc 400 --merges 40
+
+Scores every merge's changed Python blobs while a ticker coroutine runs on the
+same loop, and reports wall time plus the longest the ticker was held up – the
+time an LLM coroutine would have waited. The metric cache is disabled.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import git
+
+from benchmarks.synthetic import SyntheticRepoSpec, make_synthetic_repo
+
+TICK = 0.005
+
+
+async def _ticker(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - started - TICK)
+    return worst
+
+
+async def _measure(score) -> tuple[float, float]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await score()
+    wall = time.perf_counter() - started
+    stop.set()
+    return wall, await ticker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--loc", type=int, default=400)
+    parser.add_argument("--merges", type=int, default=40)
+    parser.add_argument("--files-per-merge", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    os.environ["DEVELOPERSCOPE_CACHE"] = "0"
+    from developerscope.haslted import get_metrics
+    from developerscope.metrics import MetricsService
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec = SyntheticRepoSpec(
+            files=args.files,
+            loc_per_file=args.loc,
+            merges_per_branch=args.merges,
+            files_per_merge=args.files_per_merge,
+        )
+        repo = git.Repo(make_synthetic_repo(tmp, spec))
+        merges = [c for c in repo.iter_commits("master") if len(c.parents) > 1]
+
+        async def inline() -> dict:
+            # What process_commit used to do: score on the loop thread.
+            results = {}
+            for commit in merges:
+                results[commit.hexsha] = get_metrics(commit)
+                await asyncio.sleep(0)
+            return results
+
+        service = MetricsService(workers=args.workers, batch_size=args.batch_size)
+        pooled_results: dict = {}
+
+        async def pooled() -> None:
+            pooled_results.update(await service.score_commits(merges))
+
+        async def warm() -> None:
+            # Start the workers outside the measurement.
+            await asyncio.get_running_loop().run_in_executor(service._get_executor(), int)
+
+        asyncio.run(warm())
+        inline_wall, inline_stall = asyncio.run(_measure(inline))
+        pool_wall, pool_stall = asyncio.run(_measure(pooled))
+        service.close()
+
+        expected = {c.hexsha: get_metrics(c) for c in merges}
+        print(f"{len(merges)} merges, {args.files_per_merge} files each, {args.loc} lines per file")
+        print(f"{'':<10}{'wall s':>10}{'worst loop stall ms':>22}")
+        print(f"{'inline':<10}{inline_wall:>10.2f}{inline_stall * 1e3:>22.1f}")
+        print(f"{'pool':<10}{pool_wall:>10.2f}{pool_stall * 1e3:>22.1f}")
+        print(f"pool: {args.workers} worker(s), {service.tasks} task(s) for {service.blobs_scored} blob(s)")
+        if pooled_results != expected:
+            print("metrics differ between inline and pool!")
+
+
+if __name__ == "__main__":
+    main()
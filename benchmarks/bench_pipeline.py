@@ -0,0 +1,219 @@
+"""End-to-end pipeline benchmark: discover → metrics → analyse → report, offline.
+
+    python -m benchmarks.bench_pipeline --files 2000 --branches 3 --merges 50 \\
+        --latency 0.5 --error-rate 0.02
+
+A synthetic repository is generated, the Responses API is replaced by the
+local fake server, and every stage runs the way the notebook runs it. Prints
+commits/sec, wall time per stage, p50/p99 per span and peak RSS; ``--json``
+also writes the numbers for comparing runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_responses import FakeResponsesServer
+from benchmarks.synthetic import SyntheticRepoSpec, make_synthetic_repo
+from developerscope import profiling
+from developerscope.usage import usage_stats
+
+ROOT = Path(__file__).resolve().parent.parent
+STAGES = ("discover", "metrics", "analyse", "report")
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux; report workers are child processes.
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024
+
+
+def run_pipeline(repo_path: Path, out_dir: Path, args: argparse.Namespace) -> int:
+    """Run every stage on *repo_path*; return the number of analysed merges."""
+    # Imported late: the OpenAI client and the scheduler read the environment.
+    import git
+
+    from developerscope._types import MergeRequestAnalysis, RepositoryStats
+    from developerscope.gpt import anylyze_commit
+    from developerscope.metrics import get_metrics_service, set_metrics_service
+    from developerscope.state import StateStore
+    from developerscope.stats import extract_repo_commit_stats
+    from report_generator import generate_dashboard, generate_reports
+
+    repo = git.Repo(repo_path)
+    stats: RepositoryStats = {
+        "url": "https://example.com/synthetic/repo",
+        "authors": [],
+        "status": "NEW",
+    }
+    stats_path = out_dir / "repo.json"
+
+    with profiling.span("stage.discover"):
+        extract_repo_commit_stats(stats, repo_path)
+        stats_path.write_text(json.dumps(stats), encoding="utf-8")
+        store = StateStore(stats_path.with_suffix(".sqlite"))
+        store.import_json(stats_path)
+        commits = [repo.commit(r.commit_hash) for r in store.commits(status="NEW")]
+
+    with profiling.span("stage.metrics"):
+        metrics = asyncio.run(get_metrics_service().score_commits(commits))
+
+    async def process(commit: git.Commit) -> bool:
+        if not store.claim(commit.hexsha):
+            return False
+        try:
+            with profiling.span("analyse"):
+                analysis: MergeRequestAnalysis | str = await anylyze_commit(
+                    commit, triage=not args.no_triage, review=args.review
+                )
+        except Exception:
+            profiling.count("pipeline.failed")
+            store.release(commit.hexsha)
+            return False
+        if not isinstance(analysis, dict):
+            profiling.count("pipeline.unparsable")
+            store.release(commit.hexsha)
+            return False
+        store.complete(
+            {
+                **analysis,
+                "commitHash": commit.hexsha,
+                "metrics": metrics[commit.hexsha],
+                "committedAt": commit.committed_date,
+            }
+        )
+        return True
+
+    async def analyse_all() -> int:
+        return sum(await asyncio.gather(*(process(c) for c in commits)))
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        with profiling.span("stage.analyse"):
+            done = asyncio.run(analyse_all())
+
+        with profiling.span("stage.report"):
+            store.export_json(stats_path)
+            reports = out_dir / "reports"
+            generate_reports(str(stats_path.with_suffix("")), stats["url"], str(reports), args.workers)
+            generate_dashboard(store.rollups(), stats["url"], str(reports))
+    store.close()
+    set_metrics_service(None)
+    return done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--loc", type=int, default=60, help="Python lines per file")
+    parser.add_argument("--branches", type=int, default=2)
+    parser.add_argument("--merges", type=int, default=25, help="merges per branch")
+    parser.add_argument("--files-per-merge", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake API latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 5xx responses")
+    parser.add_argument("--rate-limit-share", type=float, default=0.0, help="share of 429 responses")
+    parser.add_argument("--concurrency", type=int, default=None, help="initial LLM concurrency")
+    parser.add_argument("--workers", type=int, default=None, help="report worker processes")
+    parser.add_argument("--no-triage", action="store_true")
+    parser.add_argument("--review", choices=("auto", "always", "never"), default="auto")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", help="also write the span trace (JSONL) here")
+    parser.add_argument("--json", help="write the results as JSON here")
+    parser.add_argument("--verbose", action="store_true", help="keep the pipeline's own output")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, FakeResponsesServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_share=args.rate_limit_share,
+        seed=args.seed,
+    ) as server:
+        spec = SyntheticRepoSpec(
+            files=args.files,
+            loc_per_file=args.loc,
+            branches=args.branches,
+            merges_per_branch=args.merges,
+            files_per_merge=args.files_per_merge,
+            seed=args.seed,
+        )
+        started = time.perf_counter()
+        repo_path = make_synthetic_repo(Path(tmp) / "repo", spec)
+        generated = time.perf_counter() - started
+        out_dir = Path(tmp) / "out"
+        out_dir.mkdir()
+
+        os.environ.update(
+            OPENAI_BASE_URL=server.base_url,
+            OPENAI_API_KEY="benchmark",
+            DEVELOPERSCOPE_LLM_CACHE="0",
+            DEVELOPERSCOPE_CACHE_DIR=str(Path(tmp) / "cache"),
+        )
+        if args.concurrency:
+            os.environ["DEVELOPERSCOPE_CONCURRENCY"] = str(args.concurrency)
+        os.chdir(ROOT)  # schema.json and the report templates live here
+
+        profiling.enable(args.trace)
+        started = time.perf_counter()
+        done = run_pipeline(repo_path, out_dir, args)
+        wall = time.perf_counter() - started
+        summary = profiling.disable(print_summary=False)
+        assert summary is not None
+
+        spans = summary["spans"]
+        results = {
+            "spec": vars(args),
+            "generate_repo_s": round(generated, 3),
+            "merges_analysed": done,
+            "wall_s": round(wall, 3),
+            "commits_per_s": round(done / wall, 3) if wall else 0.0,
+            "stages_s": {s: spans.get(f"stage.{s}", {}).get("total", 0.0) for s in STAGES},
+            "latency_ms": {
+                name: {"p50": round(s["p50"] * 1e3, 2), "p99": round(s["p99"] * 1e3, 2), "count": s["count"]}
+                for name, s in spans.items()
+                if not name.startswith("stage.")
+            },
+            "counters": summary["counters"],
+            "tokens": usage_stats.totals(),
+            "fake_server": {
+                "requests": server.requests,
+                "errors": server.errors,
+                "peak_in_flight": server.peak_in_flight,
+            },
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        }
+
+    print(f"repo: {args.files} files, {args.branches} branch(es) x {args.merges} merges (generated in {generated:.1f}s)")
+    print(f"analysed {done} merges in {wall:.2f}s  ->  {results['commits_per_s']:.2f} commits/s")
+    print("stages: " + "  ".join(f"{s} {t:.2f}s" for s, t in results["stages_s"].items()))
+    print(f"{'span':<24}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, row in results["latency_ms"].items():
+        print(f"{name:<24}{row['count']:>8}{row['p50']:>10.1f}{row['p99']:>10.1f}")
+    print(
+        f"fake API: {server.requests} requests, {server.errors} injected errors, "
+        f"peak {server.peak_in_flight} in flight"
+    )
+    tokens = results["tokens"]
+    print(
+        f"tokens: {tokens['input_tokens']} in ({tokens['cached_tokens']} cached), "
+        f"{tokens['output_tokens']} out; reviews skipped {tokens['reviews_skipped']}, "
+        f"short {tokens['reviews_short']} (~{tokens['skipped_tokens']} input tokens not sent)"
+    )
+    print(f"peak RSS: {results['peak_rss_mb']:.0f} MB")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
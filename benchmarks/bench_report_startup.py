@@ -0,0 +1,100 @@
+"""Report generation start-up and output size: SVG charts vs. matplotlib PNGs.
+
+    python -m benchmarks.bench_report_startup --runs 5 --merges 200
+
+Each backend is measured in a fresh interpreter: importing ``report_generator``
+and rendering one report for a synthetic author.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import report_generator
+imported = time.perf_counter()
+with open(sys.argv[1], encoding="utf-8") as f:
+    analysis = json.load(f)
+html = report_generator.render_report(analysis, "https://example.com/repo", "")
+rendered = time.perf_counter()
+print(json.dumps({"import": imported - started, "render": rendered - imported, "bytes": len(html.encode())}))
+"""
+
+EFFORTS = ["Trivial", "Minor", "Moderate", "Large", "Major"]
+TYPES = ["Feature", "Bug‑fix", "Refactor", "Performance", "Docs / comments"]
+LEVELS = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+
+def synthetic_analysis(merges: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    requests = []
+    for n in range(merges):
+        issues = [
+            {
+                "filePath": f"pkg/module_{rng.randrange(100)}.py",
+                "line": str(rng.randrange(1, 400)),
+                "issue": "Unvalidated input reaches the query builder.",
+                "proposedSolution": "Use a **parameterised** query:\n\n```python\ncur.execute(sql, (value,))\n```",
+                "level": rng.choice(LEVELS),
+            }
+            for _ in range(rng.randrange(4))
+        ]
+        requests.append(
+            {
+                "hiddenReasoning": "",
+                "type": rng.choice(TYPES),
+                "issues": issues,
+                "effortEstimate": rng.choice(EFFORTS),
+                "commitHash": f"{n:040x}",
+                "metrics": {"halstedEffort": rng.random() * 1000},
+            }
+        )
+    return {"author": "bench", "summary": "", "branches": [{"branch": "master", "mergeRequests": requests}]}
+
+
+def run(backend: str, analysis_path: str, runs: int) -> list[dict]:
+    env = {**os.environ, "DEVELOPERSCOPE_CHARTS": backend}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD, analysis_path],
+            env=env, cwd=root, check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--merges", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(synthetic_analysis(args.merges), f)
+    try:
+        for backend in ("png", "svg"):
+            rows = run(backend, f.name, args.runs)
+            imp = statistics.median(r["import"] for r in rows)
+            render = statistics.median(r["render"] for r in rows)
+            size = rows[0]["bytes"]
+            print(
+                f"{backend}: import {imp * 1e3:7.1f} ms  render {render * 1e3:7.1f} ms"
+                f"  total {(imp + render) * 1e3:7.1f} ms  html {size / 1024:7.1f} KiB"
+            )
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
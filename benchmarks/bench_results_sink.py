@@ -0,0 +1,80 @@
+"""Peak memory of an author report: whole-JSON vs. streamed from the NDJSON log.
+
+    python -m benchmarks.bench_results_sink --merges 20000
+
+Appends *merges* synthetic analyses to a results log, then renders the
+author's report twice – from the ``<author>.json`` written by
+``export_authors`` (loaded whole, as before) and straight from the log via
+``AuthorResults`` – and prints time and peak traced memory of each.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.bench_report_startup import synthetic_analysis
+from developerscope.sink import AuthorResults, ResultSink, export_authors
+
+
+def _measure(func) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--merges", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from report_generator import generate_report, get_template
+
+    get_template()
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp, "repo.results.ndjson")
+        sink = ResultSink(log)
+        started = time.perf_counter()
+        for mr in synthetic_analysis(args.merges, args.seed)["branches"][0]["mergeRequests"]:
+            sink.append("bench", "master", mr)
+        sink.close()
+        append_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        export_authors(log, Path(tmp, "repo"))
+        export_s = time.perf_counter() - started
+
+        def whole() -> None:
+            with open(Path(tmp, "repo", "bench.json"), encoding="utf-8") as f:
+                analysis = json.load(f)
+            generate_report(analysis, "https://example.com/repo", "", str(Path(tmp, "whole")))
+
+        def streamed() -> None:
+            generate_report(
+                AuthorResults(log, "bench"), "https://example.com/repo", "", str(Path(tmp, "streamed"))
+            )
+
+        whole_s, whole_mb = _measure(whole)
+        stream_s, stream_mb = _measure(streamed)
+        log_mb = log.stat().st_size / 2**20
+        same = Path(tmp, "whole", "bench.html").read_bytes() == Path(tmp, "streamed", "bench.html").read_bytes()
+
+    print(f"{args.merges} analyses, {log_mb:.1f} MiB of NDJSON")
+    print(f"append: {append_s:.2f}s   export_authors: {export_s:.2f}s")
+    print(f"{'report from':<14}{'time s':>8}{'peak MiB':>10}")
+    print(f"{'<author>.json':<14}{whole_s:>8.2f}{whole_mb:>10.1f}")
+    print(f"{'NDJSON stream':<14}{stream_s:>8.2f}{stream_mb:>10.1f}")
+    print("identical HTML" if same else "HTML differs!")
+
+
+if __name__ == "__main__":
+    main()
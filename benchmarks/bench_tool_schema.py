@@ -0,0 +1,71 @@
+"""Size of the ``get_file_contents`` tool definition: whole-tree enum vs. diff scope.
+
+    python -m benchmarks.bench_tool_schema --files 50000 --merges 20
+
+Reports the serialized tool and full request sizes per merge (both passes send
+the tool), and the time to build each definition.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from typing import Literal
+
+import git
+
+from benchmarks.synthetic import SyntheticRepoSpec, make_synthetic_repo
+from developerscope.analyzer import get_prompt_for_merge_commit
+from developerscope.gpt import tool_get_file_contents
+
+
+Scope = Literal["all", "diff"]
+
+
+def _measure(commit: git.Commit, scope: Scope, prompt: str) -> tuple[int, int, float]:
+    started = time.perf_counter()
+    tool = tool_get_file_contents(commit, scope=scope)
+    elapsed = time.perf_counter() - started
+    tool_bytes = len(json.dumps(tool).encode())
+    return tool_bytes, tool_bytes + len(prompt.encode()), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--loc", type=int, default=40)
+    parser.add_argument("--merges", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec = SyntheticRepoSpec(
+            files=args.files, loc_per_file=args.loc, branches=1, merges_per_branch=args.merges
+        )
+        repo = git.Repo(make_synthetic_repo(tmp, spec))
+        merges = [c for c in repo.iter_commits("master", merges=True)][: args.merges]
+
+        results: dict[Scope, list[tuple[int, int, float]]] = {"all": [], "diff": []}
+        for commit in merges:
+            prompt = get_prompt_for_merge_commit(commit)
+            for scope in results:
+                results[scope].append(_measure(commit, scope, prompt))
+
+        print(f"{len(merges)} merges, {args.files} files in the tree")
+        for scope, rows in results.items():
+            tool = statistics.median(r[0] for r in rows)
+            request = statistics.median(r[1] for r in rows)
+            build = statistics.median(r[2] for r in rows)
+            print(
+                f"{scope:>4}: tool {tool / 1024:9.1f} KiB  request {request / 1024:9.1f} KiB"
+                f"  build {build * 1e3:7.1f} ms  (median per pass)"
+            )
+        all_request = sum(r[1] for r in results["all"])
+        diff_request = sum(r[1] for r in results["diff"])
+        print(f"request size reduction: {all_request / diff_request:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
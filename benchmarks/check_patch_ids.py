@@ -0,0 +1,124 @@
+"""Regression check: patch-ids and diff stats of merges are first-parent only.
+
+    python -m benchmarks.check_patch_ids
+
+Builds two small histories where a merge's first- and second-parent patches
+differ and checks ``patch_ids`` and ``diff_stats`` against them:
+
+* backport – a feature merged into ``master`` and cherry-picked into
+  ``release`` must share one patch-id, although both branches moved on;
+* same base – two different features merged on top of the same commit must
+  not share one, although the branch they skipped is the same.
+
+Exits non-zero when a check fails.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import git
+
+from developerscope.patchid import patch_ids
+from developerscope.workqueue import diff_stats
+
+_ENV = {
+    **os.environ,
+    "GIT_AUTHOR_NAME": "Alice Example",
+    "GIT_AUTHOR_EMAIL": "alice@example.com",
+    "GIT_COMMITTER_NAME": "Alice Example",
+    "GIT_COMMITTER_EMAIL": "alice@example.com",
+}
+
+
+def _git(path: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=path, env=_ENV, check=True, stdout=subprocess.PIPE, text=True
+    ).stdout.strip()
+
+
+def _commit(path: Path, file: str, text: str) -> None:
+    (path / file).write_text(text)
+    _git(path, "add", file)
+    _git(path, "commit", "-q", "-m", f"Change {file}")
+
+
+def _merge(path: Path, branch: str) -> str:
+    _git(path, "merge", "-q", "--no-ff", "-m", f"Merge branch '{branch}'", branch)
+    return _git(path, "rev-parse", "HEAD")
+
+
+def backport(path: Path) -> tuple[str, str]:
+    """Merges of one feature into ``master`` and, cherry-picked, into ``release``."""
+    _git(path, "init", "-q", "-b", "master")
+    _commit(path, "base.txt", "base\n")
+    _git(path, "branch", "release")
+    _git(path, "checkout", "-q", "-b", "feature")
+    _commit(path, "feature.txt", "feature\n")
+    _git(path, "checkout", "-q", "master")
+    _commit(path, "master.txt", "master only\n")
+    merged = _merge(path, "feature")
+
+    _git(path, "checkout", "-q", "release")
+    _commit(path, "release.txt", "release only\n")
+    _git(path, "checkout", "-q", "-b", "backport")
+    _git(path, "cherry-pick", "feature")
+    _git(path, "checkout", "-q", "release")
+    return merged, _merge(path, "backport")
+
+
+def same_base(path: Path) -> tuple[str, str]:
+    """Merges of two different features, each on top of the same commit."""
+    _git(path, "init", "-q", "-b", "master")
+    _commit(path, "base.txt", "base\n")
+    for feature in ("one", "two"):
+        _git(path, "branch", feature, "master")
+        _git(path, "checkout", "-q", feature)
+        _commit(path, f"{feature}.txt", f"{feature}\n")
+    _git(path, "checkout", "-q", "master")
+    _commit(path, "master.txt", "master only\n")
+    for feature in ("one", "two"):
+        _git(path, "branch", f"into-{feature}", "master")
+    _git(path, "checkout", "-q", "into-one")
+    first = _merge(path, "one")
+    _git(path, "checkout", "-q", "into-two")
+    return first, _merge(path, "two")
+
+
+def main() -> None:
+    failures = []
+
+    def check(ok: bool, what: str) -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {what}")
+        if not ok:
+            failures.append(what)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "backport")
+        path.mkdir()
+        merged, backported = backport(path)
+        repo = git.Repo(path)
+        ids = patch_ids(repo.git_dir, [merged, backported])
+        check(ids.get(merged) is not None and ids.get(merged) == ids.get(backported), "backport shares a patch-id")
+        diffs = diff_stats(repo, [merged, backported])
+        check(diffs[merged] == diffs[backported] == (1, ["feature.txt"]), "backport diff stats are the feature's")
+
+        path = Path(tmp, "same-base")
+        path.mkdir()
+        first, second = same_base(path)
+        repo = git.Repo(path)
+        ids = patch_ids(repo.git_dir, [first, second])
+        check(len({ids.get(first), ids.get(second), None}) == 3, "features on the same base have distinct patch-ids")
+        diffs = diff_stats(repo, [first, second])
+        check(diffs[first] == (1, ["one.txt"]) and diffs[second] == (1, ["two.txt"]), "same-base diff stats are each feature's")
+
+    if failures:
+        sys.exit(f"{len(failures)} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Local stand-in for the OpenAI Responses API.
+
+Serves ``POST /v1/responses`` with schema-valid ``MergeRequestAnalysis``
+answers (or a ``get_file_contents`` call when a tool call is required), after
+a configurable latency, and fails a configurable share of requests with 429 or
+500. Like provider prompt caching, input that repeats an earlier request's
+prefix (tools, format and leading messages) is reported as cached tokens.
+Point the client at it with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``.
+
+It is a test double for the benchmarks and lives with them, outside the
+``developerscope`` package.
+
+    python -m benchmarks.fake_responses --port 8765 --latency 0.5 --error-rate 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+_TYPES = ["Feature", "Bug‑fix", "Refactor", "Performance", "Chore / dependency bump"]
+_EFFORTS = ["Trivial", "Minor", "Moderate", "Large", "Major"]
+_LEVELS = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+# Providers only cache prefixes of at least this many tokens.
+MIN_CACHED_TOKENS = 1024
+
+
+class FakeResponsesServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_share: float = 0.8,
+        max_concurrency: int | None = None,
+        record_bodies: bool = False,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share
+        # Requests beyond this many in flight get a 429, like a provider
+        # enforcing a concurrency ceiling.
+        self.max_concurrency = max_concurrency
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.record_bodies = record_bodies
+        self.bodies: list[dict[str, Any]] = []
+        self.cached_tokens = 0
+        self._prefixes: set[str] = set()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host!s}:{port}/v1"
+
+    def start(self) -> "FakeResponsesServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeResponsesServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ── request handling ─────────────────────────────────────────
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                status, headers, payload = server.handle(self.path, body)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def handle(
+        self, path: str, body: dict[str, Any]
+    ) -> tuple[int, dict[str, str], Any]:
+        if not path.rstrip("/").endswith("/responses"):
+            return 404, {}, {"error": {"message": f"no route {path}"}}
+
+        with self._lock:
+            self.requests += 1
+            if self.record_bodies:
+                self.bodies.append(body)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            over_limit = (
+                self.max_concurrency is not None
+                and self.in_flight > self.max_concurrency
+            )
+            fail = over_limit or self._rng.random() < self.error_rate
+            rate_limited = over_limit or self._rng.random() < self.rate_limit_share
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+        try:
+            if fail:
+                with self._lock:
+                    self.errors += 1
+                if rate_limited:
+                    return (
+                        429,
+                        {"retry-after-ms": "50"},
+                        _error("Rate limit reached", "rate_limit_exceeded"),
+                    )
+                time.sleep(delay / 2)
+                return 500, {}, _error("The server had an error", "server_error")
+            time.sleep(delay)
+            cached = self._cached_tokens(body)
+            with self._lock:
+                self.cached_tokens += cached
+            return 200, {}, fake_response(body, cached)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _cached_tokens(self, body: dict[str, Any]) -> int:
+        """Tokens of the longest input prefix an earlier request already sent."""
+        digest = hashlib.sha256(
+            json.dumps([body.get("tools"), body.get("text")], sort_keys=True).encode()
+        )
+        length = cached = 0
+        with self._lock:
+            for message in body.get("input") or []:
+                chunk = json.dumps(message, sort_keys=True, ensure_ascii=False)
+                digest.update(chunk.encode())
+                length += len(chunk) // 4
+                key = digest.hexdigest()
+                if key in self._prefixes:
+                    cached = length
+                else:
+                    self._prefixes.add(key)
+        return cached if cached >= MIN_CACHED_TOKENS else 0
+
+
+def _error(message: str, code: str) -> dict[str, Any]:
+    return {"error": {"message": message, "type": code, "code": code}}
+
+
+def _file_choices(tools: list[dict[str, Any]]) -> list[str]:
+    for tool in tools:
+        items = (
+            tool.get("parameters", {})
+            .get("properties", {})
+            .get("files", {})
+            .get("items", {})
+        )
+        if items.get("enum"):
+            return items["enum"]
+    return []
+
+
+def fake_analysis(seed: str) -> dict[str, Any]:
+    """A deterministic, schema-valid ``MergeRequestAnalysis`` for *seed*."""
+    rng = random.Random(hashlib.sha256(seed.encode()).hexdigest())
+    return {
+        "hiddenReasoning": "Synthetic analysis produced by the fake Responses server.",
+        "type": rng.choice(_TYPES),
+        "issues": [
+            {
+                "filePath": f"pkg/module_{rng.randint(0, 99)}.py",
+                "line": str(rng.randint(1, 200)),
+                "issue": "Synthetic issue",
+                "proposedSolution": "Synthetic **fix**.",
+                "level": rng.choice(_LEVELS),
+            }
+            for _ in range(rng.randint(0, 3))
+        ],
+        "effortEstimate": rng.choice(_EFFORTS),
+    }
+
+
+def fake_response(body: dict[str, Any], cached_tokens: int = 0) -> dict[str, Any]:
+    prompt = json.dumps(body.get("input"), sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(prompt.encode()).hexdigest()
+    input_tokens = len(prompt) // 4 + 1
+    cached_tokens = min(cached_tokens, input_tokens)
+
+    if body.get("tool_choice") == "required" and body.get("tools"):
+        files = _file_choices(body["tools"])[:2]
+        arguments = json.dumps({"files": files})
+        output: dict[str, Any] = {
+            "type": "function_call",
+            "id": f"fc_{digest[:24]}",
+            "call_id": f"call_{digest[:24]}",
+            "name": body["tools"][0].get("name", "get_file_contents"),
+            "arguments": arguments,
+            "status": "completed",
+        }
+        output_tokens = len(arguments) // 4 + 1
+    else:
+        text = json.dumps(fake_analysis(prompt), ensure_ascii=False)
+        output = {
+            "type": "message",
+            "id": f"msg_{digest[:24]}",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }
+        output_tokens = len(text) // 4 + 1
+
+    return {
+        "id": f"resp_{digest[:24]}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": body.get("model", "fake"),
+        "status": "completed",
+        "output": [output],
+        "parallel_tool_calls": bool(body.get("parallel_tool_calls", False)),
+        "tool_choice": body.get("tool_choice", "auto"),
+        "tools": body.get("tools", []),
+        "temperature": body.get("temperature"),
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": cached_tokens},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeResponsesServer(
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        max_concurrency=args.max_concurrency,
+    )
+    print(f"Serving fake Responses API at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
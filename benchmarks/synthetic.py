@@ -0,0 +1,145 @@
+"""Synthetic git repositories for benchmarks.
+
+Repositories are written with a single ``git fast-import`` stream, so even
+trees with tens of thousands of files are created in a few seconds.
+"""
+
+from __future__ import annotations
+
+import random
+import subprocess
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+# Feature commits are written here and the ref is dropped afterwards, the same
+# way merged feature branches usually get deleted.
+_SCRATCH_REF = "refs/heads/synthetic-scratch"
+
+
+@dataclass
+class SyntheticRepoSpec:
+    files: int = 2000
+    loc_per_file: int = 60
+    branches: int = 1
+    merges_per_branch: int = 20
+    files_per_merge: int = 3
+    seed: int = 0
+    authors: list[tuple[str, str]] = field(
+        default_factory=lambda: [
+            ("Alice Example", "alice@example.com"),
+            ("Bob Example", "12345+bob@users.noreply.github.com"),
+            ("Carol Example", "carol@example.com"),
+        ]
+    )
+
+
+def python_source(rng: random.Random, loc: int) -> str:
+    """Return syntactically valid Python with roughly *loc* lines."""
+    lines: list[str] = []
+    fn = 0
+    while len(lines) < loc:
+        a, b = rng.randint(1, 99), rng.randint(1, 99)
+        lines += [
+            f"def fn_{fn}(x, y={a}):",
+            f"    z = x * {b} + y - {a}",
+            f"    if z > {a * b}:",
+            f"        return z // {b} + fn_{fn}_helper(x)",
+            "    return z ** 2 - x",
+            "",
+            f"def fn_{fn}_helper(v):",
+            f"    return [i * v for i in range({a})]",
+            "",
+        ]
+        fn += 1
+    return "\n".join(lines) + "\n"
+
+
+class _FastImport:
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.mark = 0
+        self.when = 1_700_000_000
+
+    def data(self, payload: bytes) -> None:
+        self.chunks.append(b"data %d\n" % len(payload))
+        self.chunks.append(payload + b"\n")
+
+    def commit(
+        self,
+        ref: str,
+        author: tuple[str, str],
+        message: str,
+        parents: list[int],
+        changes: dict[str, str],
+    ) -> int:
+        self.mark += 1
+        self.when += 60
+        name, email = author
+        self.chunks.append(f"commit {ref}\nmark :{self.mark}\n".encode())
+        self.chunks.append(
+            f"committer {name} <{email}> {self.when} +0000\n".encode()
+        )
+        self.data(message.encode())
+        if parents:
+            self.chunks.append(f"from :{parents[0]}\n".encode())
+        for parent in parents[1:]:
+            self.chunks.append(f"merge :{parent}\n".encode())
+        for path, content in changes.items():
+            self.chunks.append(f"M 100644 inline {path}\n".encode())
+            self.data(content.encode())
+        return self.mark
+
+    def stream(self) -> bytes:
+        return b"".join(self.chunks) + b"done\n"
+
+
+def make_synthetic_repo(path: str | Path, spec: SyntheticRepoSpec) -> Path:
+    """Create a repository at *path* shaped by *spec* and return its path.
+
+    ``master`` receives the initial tree; every branch (``master`` plus
+    ``release-N``) then gets ``merges_per_branch`` merge commits, each merging a
+    short-lived feature commit that rewrites ``files_per_merge`` files.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["git", "init", "-q", "-b", "master", str(path)], check=True)
+
+    rng = random.Random(spec.seed)
+    fi = _FastImport()
+    paths = [
+        f"pkg{i % 50}/module_{i}.py" if i % 10 else f"docs/page_{i}.md"
+        for i in range(spec.files)
+    ]
+    initial = {
+        p: python_source(rng, spec.loc_per_file) if p.endswith(".py") else f"# {p}\n"
+        for p in paths
+    }
+    root = fi.commit("refs/heads/master", spec.authors[0], "Initial import", [], initial)
+
+    branches = ["master"] + [f"release-{i}" for i in range(1, spec.branches)]
+    for branch in branches:
+        ref = f"refs/heads/{branch}"
+        tip = root
+        for n in range(spec.merges_per_branch):
+            author = rng.choice(spec.authors)
+            touched = rng.sample(paths, min(spec.files_per_merge, len(paths)))
+            changes = {
+                p: python_source(rng, spec.loc_per_file) if p.endswith(".py") else f"# {p} {n}\n"
+                for p in touched
+            }
+            feature = fi.commit(_SCRATCH_REF, author, f"Change {n}", [tip], changes)
+            # The feature commit sits on top of *tip*, so the merge keeps its tree.
+            tip = fi.commit(
+                ref, author, f"Merge branch 'feature/{branch}-{n}' into {branch}", [tip, feature], changes
+            )
+
+    subprocess.run(
+        ["git", "fast-import", "--quiet", "--force"],
+        cwd=path,
+        input=fi.stream(),
+        check=True,
+    )
+    subprocess.run(["git", "update-ref", "-d", _SCRATCH_REF], cwd=path, check=True)
+    subprocess.run(["git", "checkout", "-q", "-f", "master"], cwd=path, check=True)
+    return path
@@ -0,0 +1,7 @@
+import sys
+
+from developerscope.cli import main
+
+# Guarded: spawn/forkserver workers re-import the main module as __mp_main__.
+if __name__ == "__main__":
+    sys.exit(main())
@@ -41,6 +41,8 @@ class CommitMetrics(TypedDict):
 class DetailedMergeRequestAnalysis(MergeRequestAnalysis):
     commitHash: str
     metrics: CommitMetrics
+    # committer timestamp (unix seconds), used for the time-window rollups
+    committedAt: NotRequired[int]
 
 
 class Branch(TypedDict):
@@ -58,13 +60,22 @@ class AuthorsAnalysis(TypedDict):
 ### Stat
 
 
+type StatusEnum = Literal["NEW", "PENDING", "DONE"]
+
+
 class CommitStatus(TypedDict):
     commitHash: str
-    status: Literal[
-        "NEW"
-        "PENDING",
-        "DONE",
-    ]
+    status: StatusEnum
+    # git patch-id of the first-parent patch; "" for an empty diff
+    patchId: NotRequired[str]
+
+
+class MergeCommitInfo(TypedDict):
+    commitHash: str
+    parents: list[str]
+    authorEmail: str
+    authorName: str
+    branches: list[str]
 
 
 class BranchStats(TypedDict):
@@ -82,3 +93,71 @@ class RepositoryStats(TypedDict):
     url: str
     authors: list[AuthorStats]
     status: Literal["NEW", "CLONED", "PENDING", "DONE"]
+    # branch name -> head SHA at the last discovery run
+    watermarks: NotRequired[dict[str, str]]
+    # developerscope.patchid.PATCH_ID_VERSION of the commits' patchId values
+    patchIdVersion: NotRequired[int]
+
+
+###########################################
+### Metrics
+
+
+class FileHalstead(TypedDict):
+    path: str
+    before: float
+    after: float
+    delta: float
+
+
+class HalsteadBreakdown(TypedDict):
+    total: float
+    files: list[FileHalstead]
+
+
+###########################################
+### Rollups
+
+
+type RollupScope = Literal["repo", "author", "branch", "week", "month"]
+
+
+class Rollup(TypedDict):
+    merges: int
+    issues: int
+    severity: dict[IssueEnum, int]
+    types: dict[MergeRequestEnum, int]
+    effort: dict[EffortEnum, int]
+    halstead: float
+
+
+type Rollups = dict[RollupScope, dict[str, Rollup]]
+
+
+###########################################
+### Results (NDJSON)
+
+
+# one line of out/<repo>.results.ndjson
+class ResultRecord(TypedDict):
+    author: str
+    branch: str
+    analysis: DetailedMergeRequestAnalysis
+
+
+###########################################
+### Manifest (multi-repository runs)
+
+
+class ManifestRepo(TypedDict):
+    url: str
+    # local clone, relative to the manifest; default: ../<name>
+    path: NotRequired[str]
+    # state file stem in "out"; default: the last URL segment
+    name: NotRequired[str]
+
+
+class Manifest(TypedDict):
+    repos: list[ManifestRepo]
+    # state directory, relative to the manifest; default: out
+    out: NotRequired[str]
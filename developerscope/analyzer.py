@@ -1,22 +1,29 @@
 from collections import defaultdict
 
-from pathlib import Path
 import re
+from typing import Iterable, Iterator, Sequence
 
 import git
-from pydriller import Repository
 
 import warnings
 
 warnings.filterwarnings("ignore", category=SyntaxWarning)
 
-from developerscope.haslted import halstead_effort
-
-TARGET_REPO = "devQ_testData_PythonProject"
-current_repo_path = Path().resolve()
-
-repo_path = current_repo_path.parent / TARGET_REPO
-
+from developerscope import profiling
+from developerscope._types import HalsteadBreakdown, MergeCommitInfo
+from developerscope.contents import (
+    DEFAULT_MAX_FILE_BYTES,
+    DEFAULT_MAX_TOTAL_BYTES,
+    format_file_contents,
+    tree_index,
+)
+from developerscope.diffbuilder import (
+    DEFAULT_TOKEN_BUDGET,
+    build_diff,
+    first_parent_patches,
+)
+from developerscope.haslted import halstead_breakdown
+from developerscope.mapreduce import DEFAULT_SHARD_TOKENS, shard_diffs
 
 def extract_username(email: str) -> str:
     email = email.lower()
@@ -41,29 +48,97 @@ def get_all_branches(repo_path: str):
     return git_repo.branches
 
 
+def _commit_exists(git_repo: git.Repo, sha: str) -> bool:
+    try:
+        git_repo.git.cat_file("-e", f"{sha}^{{commit}}")
+    except git.GitCommandError:
+        return False
+    return True
+
+
+def iter_merge_commits(
+    repo_path: str,
+    branches: list[str] | None = None,
+    exclude: Iterable[str] = (),
+) -> Iterator[MergeCommitInfo]:
+    """Yield every merge commit reachable from *branches* in one graph walk.
+
+    History reachable from any commit in *exclude* (e.g. the branch heads of a
+    previous run) is not walked at all; unknown SHAs there are ignored.
+
+    Commits come newest-first in topological order, so by the time a commit is
+    read all of its descendants have been, and the set of branches containing
+    it is already final – results are streamed, not collected. A merge
+    reachable from several branches is yielded once; ``branches`` lists all of
+    them, the checked-out branch first when it is one of them.
+    """
+    git_repo = git.Repo(str(repo_path))
+    heads = {head.name: head.commit.hexsha for head in git_repo.branches}
+    if branches is not None:
+        heads = {name: heads[name] for name in branches}
+    if not heads:
+        return
+
+    names = list(heads)
+    if not git_repo.head.is_detached and git_repo.active_branch.name in heads:
+        names.remove(git_repo.active_branch.name)
+        names.insert(0, git_repo.active_branch.name)
+
+    # Bit i of reach[sha] is set when names[i] contains sha.
+    reach: dict[str, int] = defaultdict(int)
+    for i, name in enumerate(names):
+        reach[heads[name]] |= 1 << i
+
+    stop = [f"^{sha}" for sha in set(exclude) if _commit_exists(git_repo, sha)]
+    proc = git_repo.git.log(
+        "--topo-order",
+        "--format=%H%x00%P%x00%ae%x00%an",
+        *set(heads.values()),
+        *stop,
+        "--",
+        as_process=True,
+    )
+    walked = 0
+    for raw in proc.stdout:
+        walked += 1
+        hexsha, parents, email, name = (
+            raw.decode("utf-8", errors="replace").rstrip("\n").split("\x00")
+        )
+        mask = reach.pop(hexsha, 0)
+        parent_shas = parents.split()
+        for parent in parent_shas:
+            reach[parent] |= mask
+
+        if len(parent_shas) < 2:
+            continue
+        profiling.count("git.merges_discovered")
+        yield {
+            "commitHash": hexsha,
+            "parents": parent_shas,
+            "authorEmail": email,
+            "authorName": name,
+            "branches": [n for i, n in enumerate(names) if mask >> i & 1],
+        }
+    proc.wait()
+    profiling.count("git.commits_walked", walked)
+
+
 def get_merge_commits_map(repo_path: str, only_in_branch: str | None = None):
 
     merge_commts_map: dict[str, list[str]] = defaultdict(list)
     author_mapping = defaultdict(set)
 
-    if only_in_branch is None:
-        branches = [head.name for head in get_all_branches(repo_path)]
-    else:
-        branches = [only_in_branch]
-    
-    for branch in branches:
-        repo = Repository(str(repo_path), only_in_branch=branch)
-
-        for commit in repo.traverse_commits():
-            if not commit.msg.startswith("Merge"):
-                continue
+    branches = None if only_in_branch is None else [only_in_branch]
+    for merge in iter_merge_commits(repo_path, branches):
+        username = extract_username(merge["authorEmail"])
 
-            # print(commit.msg.__repr__())
-            username = extract_username(commit.author.email)
+        author_mapping[username].add((merge["authorEmail"], merge["authorName"]))
 
-            author_mapping[username].add((commit.author.email, commit.author.name))
+        merge_commts_map[username].append(merge["commitHash"])
 
-            merge_commts_map[username].append(commit.hash)
+    # Oldest first, as before.
+    for commit_hashes in merge_commts_map.values():
+        commit_hashes.reverse()
 
     return merge_commts_map, author_mapping
 
@@ -76,57 +151,92 @@ from developerscope._types import (
 )
 
 
-def get_difference(commit: git.Commit) -> str:
+def get_difference(
+    commit: git.Commit,
+    token_budget: int | None = DEFAULT_TOKEN_BUDGET,
+    breakdown: HalsteadBreakdown | None = None,
+) -> str:
     # if len(merge_commit.parents) != 2:
     #     raise ValueError("Only 2 parents allowed for merge request commits")
 
-    first_parent = commit.parents[0]
-    diff_index = first_parent.diff(commit, create_patch=True)
+    return build_diff(commit, token_budget, breakdown).text
 
-    difference = ""
-    for diff in diff_index:
-        diff_text = diff.diff.decode("utf-8")
-        file_header = f"==== File: {diff.a_path or diff.b_path} ====\n"
-        difference += file_header + diff_text + "\n\n"
 
-    return difference
+def _prompt_header(commit: git.Commit, breakdown: HalsteadBreakdown) -> str:
+    prompt = commit.message + "\n\n"
 
+    prompt += "HASLTED EFFORT: %s\n\n" % breakdown["total"]
+    return prompt
 
-def get_prompt_for_merge_commit(commit: git.Commit) -> str:
-    prompt = commit.message + "\n\n"
 
-    prompt += "HASLTED EFFORT: %s\n\n" % halstead_effort(commit)
+def get_prompt_for_merge_commit(
+    commit: git.Commit, token_budget: int | None = DEFAULT_TOKEN_BUDGET
+) -> str:
+    breakdown = halstead_breakdown(commit)
+    prompt = _prompt_header(commit, breakdown)
 
     # for file in get_current_state_paths(commit):
     #     prompt += file + '\n'
-    prompt += "\n" + get_difference(commit)
+    prompt += "\n" + get_difference(commit, token_budget, breakdown)
     return prompt
 
 
-def get_current_state(commit: git.Commit, include_only: list[str] | None = None):
-    file_chunks = []
-
-    for blob in commit.tree.traverse():
-        if blob.type == "blob":  # it's a file
-            file_path = blob.path
-            if include_only:
-                if file_path not in include_only:
-                    continue
-
-            file_content = blob.data_stream.read().decode("utf-8", errors="replace")
-            print(file_path)
-            formatted = f"### FILE: `{file_path}`\n\n```\n{file_content}\n```\n"
-            file_chunks.append(formatted)
-
-    # Join all file contents into a single string
-    final_string = "\n\n".join(file_chunks)
-    return final_string
+def get_prompts_for_merge_commit(
+    commit: git.Commit,
+    shard_tokens: int | None = DEFAULT_SHARD_TOKENS,
+    token_budget: int | None = DEFAULT_TOKEN_BUDGET,
+    diffs: Sequence[git.Diff] | None = None,
+) -> list[tuple[str, int]]:
+    """Return ``(prompt, weight)`` per shard of *commit*'s diff.
+
+    A merge that fits into *shard_tokens* gets the single prompt
+    :func:`get_prompt_for_merge_commit` would build; *weight* is the shard's
+    approximate diff size. *diffs* is the first-parent diff with patches when
+    the caller already has it.
+    """
+    with profiling.span("prompt.build") as sp:
+        prompts = _build_prompts(commit, shard_tokens, token_budget, diffs)
+        sp.set(shards=len(prompts), diff_tokens=sum(weight for _, weight in prompts))
+    return prompts
+
+
+def _build_prompts(
+    commit: git.Commit,
+    shard_tokens: int | None,
+    token_budget: int | None,
+    diffs: Sequence[git.Diff] | None,
+) -> list[tuple[str, int]]:
+    breakdown = halstead_breakdown(commit)
+    header = _prompt_header(commit, breakdown)
+    diffs = list(diffs) if diffs is not None else list(first_parent_patches(commit))
+    shards = [diffs] if shard_tokens is None else shard_diffs(diffs, shard_tokens)
+    if len(shards) <= 1:
+        built = build_diff(commit, token_budget, breakdown, diffs=diffs)
+        return [(header + "\n" + built.text, built.tokens)]
+
+    prompts = []
+    for i, shard in enumerate(shards, start=1):
+        built = build_diff(commit, token_budget, breakdown, diffs=shard)
+        note = (
+            f"SHARD {i}/{len(shards)}: this is one part of a large merge; "
+            "only the files below are shown.\n\n"
+        )
+        prompts.append((header + note + built.text, built.tokens))
+    return prompts
+
+
+def get_current_state(
+    commit: git.Commit,
+    include_only: Iterable[str] | None = None,
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+) -> str:
+    """Contents of *include_only* (or every file) in *commit*, size-capped."""
+    with profiling.span("tool.file_contents") as sp:
+        result = format_file_contents(commit, include_only, max_file_bytes, max_total_bytes)
+        sp.set(bytes=len(result))
+    return result
 
 
 def get_current_state_paths(commit: git.Commit) -> list[str]:
-    file_paths = []
-
-    for blob in commit.tree.traverse():
-        if blob.type == "blob":  # it's a file
-            file_paths.append(str(blob.path))
-    return file_paths
+    return list(tree_index(commit))
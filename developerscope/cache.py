@@ -0,0 +1,152 @@
+"""Content-addressed metric cache.
+
+Metrics computed from a git blob only depend on the blob's bytes, so they are
+keyed by the blob hexsha (plus the metric name and a version string that
+changes whenever the metric implementation or radon does). Entries live in a
+small SQLite file, so they survive crashes and re-runs.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("DEVELOPERSCOPE_CACHE_DIR", Path.home() / ".cache" / "developerscope")
+)
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+# Eviction needs a COUNT(*) – only check every so many inserts.
+_EVICT_EVERY = 1000
+
+
+class MetricCache:
+    """Persistent blob-sha → metric value store with LRU eviction."""
+
+    def __init__(self, path: str | Path, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._conn = sqlite3.connect(
+            str(self.path), isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metrics ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " accessed INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS metrics_accessed ON metrics(accessed)"
+        )
+        row = self._conn.execute("SELECT MAX(accessed) FROM metrics").fetchone()
+        self._clock = row[0] or 0
+
+    @staticmethod
+    def key(blob_sha: str, metric: str, version: str) -> str:
+        return f"{metric}:{version}:{blob_sha}"
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get(self, blob_sha: str, metric: str, version: str) -> Any | None:
+        key = self.key(blob_sha, metric, version)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM metrics WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE metrics SET accessed = ? WHERE key = ?", (self._tick(), key)
+            )
+        return json.loads(row[0])
+
+    def put(self, blob_sha: str, metric: str, version: str, value: Any) -> None:
+        key = self.key(blob_sha, metric, version)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metrics (key, value, accessed) VALUES (?, ?, ?)",
+                (key, json.dumps(value), self._tick()),
+            )
+            self._puts += 1
+            if self._puts % _EVICT_EVERY == 0:
+                self._evict()
+
+    def get_or_compute(
+        self, blob_sha: str, metric: str, version: str, compute: Callable[[], Any]
+    ) -> Any:
+        """Return the cached value, computing and storing it on a miss."""
+        value = self.get(blob_sha, metric, version)
+        if value is None:
+            value = compute()
+            self.put(blob_sha, metric, version, value)
+        return value
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM metrics").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM metrics WHERE key IN"
+            " (SELECT key FROM metrics ORDER BY accessed LIMIT ?)",
+            (excess,),
+        )
+        self.evictions += excess
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class _NullCache(MetricCache):
+    """Stand-in used when caching is disabled – always computes."""
+
+    def __init__(self) -> None:
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, blob_sha: str, metric: str, version: str) -> Any | None:
+        self.misses += 1
+        return None
+
+    def put(self, blob_sha: str, metric: str, version: str, value: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+_default_cache: MetricCache | None = None
+
+
+def get_metric_cache() -> MetricCache:
+    """Return the process-wide cache (``DEVELOPERSCOPE_CACHE=0`` disables it)."""
+    global _default_cache
+    if _default_cache is None:
+        if os.environ.get("DEVELOPERSCOPE_CACHE", "1") == "0":
+            _default_cache = _NullCache()
+        else:
+            _default_cache = MetricCache(DEFAULT_CACHE_DIR / "metrics.sqlite")
+    return _default_cache
+
+
+def set_metric_cache(cache: MetricCache | None) -> None:
+    """Replace the process-wide cache (``None`` re-reads the environment)."""
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,222 @@
+"""Bulk object access through long-lived ``git cat-file`` processes.
+
+A :class:`CatFileReader` keeps one ``git cat-file --batch`` (and, on demand,
+``--batch-check``) process open and talks to it over pipes, so reading an
+object costs a write and two reads instead of Python-level object construction
+or a fresh subprocess. Readers are not thread-safe; a :class:`CatFilePool`
+hands one out per worker thread.
+"""
+
+import os
+import queue
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterable, Iterator, NamedTuple
+
+import git
+
+from developerscope import profiling
+
+TREE_MODE = "40000"
+GITLINK_MODE = "160000"
+
+# Requests in flight per pipelined batch; 128 * 41 bytes stays well inside the
+# smallest pipe buffer.
+_PIPELINE_DEPTH = 128
+
+
+class ObjectInfo(NamedTuple):
+    hexsha: str
+    type: str
+    size: int
+
+
+class TreeEntry(NamedTuple):
+    path: str
+    mode: str
+    hexsha: str
+
+
+class CatFileReader:
+    """One ``git cat-file --batch`` / ``--batch-check`` pair for a repository."""
+
+    def __init__(self, git_dir: str):
+        self.git_dir = git_dir
+        self.bytes_read = 0
+        self._batch = self._spawn("--batch")
+        self._check: subprocess.Popen | None = None
+
+    def _spawn(self, mode: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["git", f"--git-dir={self.git_dir}", "cat-file", mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    @staticmethod
+    def _header(proc: subprocess.Popen, rev: str) -> ObjectInfo | None:
+        stdin: IO[bytes] = proc.stdin  # type: ignore[assignment]
+        stdin.write(rev.encode() + b"\n")
+        stdin.flush()
+        header = proc.stdout.readline().split()  # type: ignore[union-attr]
+        if len(header) != 3:  # "<rev> missing" / "<rev> ambiguous"
+            return None
+        return ObjectInfo(header[0].decode(), header[1].decode(), int(header[2]))
+
+    def info(self, rev: str) -> ObjectInfo | None:
+        """Return the sha, type and size of *rev*, or ``None`` if it is missing."""
+        if self._check is None:
+            self._check = self._spawn("--batch-check")
+        return self._header(self._check, rev)
+
+    def read(self, rev: str) -> tuple[ObjectInfo, bytes]:
+        info = self._header(self._batch, rev)
+        if info is None:
+            raise KeyError(f"object {rev!r} not found in {self.git_dir}")
+        stdout: IO[bytes] = self._batch.stdout  # type: ignore[assignment]
+        data = stdout.read(info.size)
+        stdout.read(1)  # trailing LF
+        self.bytes_read += info.size
+        profiling.count("git.bytes_read", info.size)
+        return info, data
+
+    def read_blob(self, hexsha: str) -> bytes:
+        return self.read(hexsha)[1]
+
+    def read_blobs(self, hexshas: Iterable[str]) -> Iterator[bytes]:
+        """Read many objects, pipelining requests in small batches.
+
+        A batch of requests is small enough to sit in the stdin pipe buffer, so
+        writing it never blocks on git waiting for us to drain stdout.
+        """
+        stdin: IO[bytes] = self._batch.stdin  # type: ignore[assignment]
+        stdout: IO[bytes] = self._batch.stdout  # type: ignore[assignment]
+        hexshas = list(hexshas)
+        for start in range(0, len(hexshas), _PIPELINE_DEPTH):
+            batch = hexshas[start : start + _PIPELINE_DEPTH]
+            stdin.write(b"".join(h.encode() + b"\n" for h in batch))
+            stdin.flush()
+            batch_bytes = 0
+            for hexsha in batch:
+                header = stdout.readline().split()
+                if len(header) != 3:
+                    raise KeyError(f"object {hexsha!r} not found in {self.git_dir}")
+                size = int(header[2])
+                data = stdout.read(size)
+                stdout.read(1)
+                self.bytes_read += size
+                batch_bytes += size
+                yield data
+            profiling.count("git.bytes_read", batch_bytes)
+
+    def iter_tree(self, treeish: str, prefix: str = "") -> Iterator[TreeEntry]:
+        """Yield every blob under *treeish* (a tree or commit), recursively.
+
+        Submodule entries are skipped – their object lives in another repo.
+        """
+        _, data = self.read(f"{treeish}^{{tree}}")
+        pos = 0
+        while pos < len(data):
+            space = data.index(b" ", pos)
+            nul = data.index(b"\0", space)
+            mode = data[pos:space].decode()
+            name = data[space + 1 : nul].decode("utf-8", errors="surrogateescape")
+            hexsha = data[nul + 1 : nul + 21].hex()
+            pos = nul + 21
+
+            path = prefix + name
+            if mode == TREE_MODE:
+                yield from self.iter_tree(hexsha, path + "/")
+            elif mode != GITLINK_MODE:
+                yield TreeEntry(path, mode, hexsha)
+
+    def close(self) -> None:
+        for proc in (self._batch, self._check):
+            if proc is None:
+                continue
+            proc.stdin.close()  # type: ignore[union-attr]
+            proc.wait()
+            proc.stdout.close()  # type: ignore[union-attr]
+
+
+class CatFilePool:
+    """Hands out at most *size* readers; a reader is used by one thread at a time."""
+
+    def __init__(self, git_dir: str, size: int | None = None):
+        self.git_dir = git_dir
+        self.size = size or os.cpu_count() or 4
+        self._idle: queue.LifoQueue[CatFileReader] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._all: list[CatFileReader] = []
+
+    @contextmanager
+    def reader(self) -> Iterator[CatFileReader]:
+        reader = self._checkout()
+        try:
+            yield reader
+        except BaseException:
+            # The pipe may be mid-object; never hand this process out again.
+            self._discard(reader)
+            raise
+        else:
+            self._idle.put(reader)
+
+    def _checkout(self) -> CatFileReader:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                reader = CatFileReader(self.git_dir)
+                self._all.append(reader)
+                return reader
+        return self._idle.get()
+
+    def _discard(self, reader: CatFileReader) -> None:
+        reader.close()
+        with self._lock:
+            self._all.remove(reader)
+            self._created -= 1
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(r.bytes_read for r in self._all)
+
+    def close(self) -> None:
+        with self._lock:
+            for reader in self._all:
+                reader.close()
+            self._all.clear()
+            self._created = 0
+        self._idle = queue.LifoQueue()
+
+
+_pools: dict[tuple[int, str], CatFilePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(repo: git.Repo | str) -> CatFilePool:
+    """Return the shared pool for *repo* (a ``git.Repo`` or its git dir).
+
+    Pools are per process – a forked worker never reuses its parent's pipes.
+    """
+    git_dir = os.path.realpath(repo.git_dir if isinstance(repo, git.Repo) else repo)
+    key = (os.getpid(), git_dir)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = CatFilePool(git_dir)
+        return _pools[key]
+
+
+def read_blob(repo: git.Repo | str, hexsha: str) -> bytes:
+    with get_pool(repo).reader() as reader:
+        return reader.read_blob(hexsha)
+
+
+def list_tree(repo: git.Repo | str, treeish: str) -> list[TreeEntry]:
+    with get_pool(repo).reader() as reader:
+        return list(reader.iter_tree(treeish))
@@ -0,0 +1,187 @@
+"""Inline SVG charts for the HTML reports, built straight from the data.
+
+No plotting library is involved: each chart is a few dozen SVG elements, a
+couple of KB in the page instead of a base64 PNG, and crisp at any zoom.
+"""
+
+import math
+from collections import Counter
+from html import escape
+from typing import Mapping, Sequence, TypeVar
+
+# Series labels: plain strings or a Literal of them, such as MergeRequestEnum.
+# Mappings are invariant in their key, so a fixed Mapping[str, str] would not
+# accept the report's dict[MergeRequestEnum, str] colours.
+Label = TypeVar("Label", bound=str)
+
+FONT = 'font-family="system-ui,-apple-system,Segoe UI,Roboto,Helvetica,Arial,sans-serif"'
+
+
+def _svg(width: int, height: int, body: list[str], label: str) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        f'width="100%" role="img" aria-label="{escape(label)}" {FONT} font-size="12">'
+        + "".join(body)
+        + "</svg>"
+    )
+
+
+def _text(x: float, y: float, text: str, **attrs: str) -> str:
+    extra = "".join(f' {k.replace("_", "-")}="{v}"' for k, v in attrs.items())
+    return f'<text x="{x:.1f}" y="{y:.1f}"{extra}>{escape(text)}</text>'
+
+
+def _nice_step(top: int, ticks: int = 5) -> int:
+    raw = max(top, 1) / ticks
+    magnitude = 10 ** math.floor(math.log10(raw)) if raw >= 1 else 1
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return max(1, int(factor * magnitude))
+    return int(10 * magnitude)
+
+
+def scatter_svg(
+    points: Sequence[tuple[str, int, Label]],
+    categories: Sequence[str],
+    colours: Mapping[Label, str],
+    title: str = "Issues vs. Effort",
+    legend_title: str = "Merge‑request type",
+) -> str:
+    """Scatter of ``(category, value, series)`` points over fixed x *categories*.
+
+    Coinciding points are drawn once, sized by how many merges they stand for.
+    """
+    width, height = 640, 400
+    left, right, top, bottom = 50, 190, 36, 86
+    plot_w, plot_h = width - left - right, height - top - bottom
+
+    step = _nice_step(max((p[1] for p in points), default=0))
+    y_max = max(step, math.ceil(max((p[1] for p in points), default=0) / step) * step)
+
+    def x_of(category: str) -> float:
+        return left + (categories.index(category) + 0.5) * plot_w / len(categories)
+
+    def y_of(value: float) -> float:
+        return top + plot_h - value / y_max * plot_h
+
+    body = [_text(left + plot_w / 2, 20, title, text_anchor="middle", font_size="14", font_weight="600")]
+    for value in range(0, y_max + 1, step):
+        y = y_of(value)
+        body.append(f'<line x1="{left}" y1="{y:.1f}" x2="{left + plot_w}" y2="{y:.1f}" stroke="#e5e5e5"/>')
+        body.append(_text(left - 6, y + 4, str(value), text_anchor="end"))
+    body.append(
+        f'<rect x="{left}" y="{top}" width="{plot_w}" height="{plot_h}" fill="none" stroke="#333"/>'
+    )
+    for category in categories:
+        x = x_of(category)
+        body.append(
+            _text(x, top + plot_h + 14, category, text_anchor="end",
+                  transform=f"rotate(-45 {x:.1f} {top + plot_h + 14})")
+        )
+    body.append(_text(left + plot_w / 2, height - 6, "Effort estimate", text_anchor="middle"))
+    body.append(
+        _text(14, top + plot_h / 2, "Number of issues", text_anchor="middle",
+              transform=f"rotate(-90 14 {top + plot_h / 2:.1f})")
+    )
+
+    for (category, value, series), count in Counter(points).items():
+        radius = 5 + min(count - 1, 8)
+        body.append(
+            f'<circle cx="{x_of(category):.1f}" cy="{y_of(value):.1f}" r="{radius}" '
+            f'fill="{colours.get(series, "#777")}" fill-opacity="0.85" stroke="#000" stroke-width="0.7">'
+            f"<title>{escape(series)}: {escape(category)}, {value} issue(s) × {count}</title></circle>"
+        )
+
+    legend_x, legend_y = left + plot_w + 16, top + 8
+    body.append(_text(legend_x, legend_y, legend_title, font_weight="600"))
+    for i, series in enumerate(dict.fromkeys(p[2] for p in points)):
+        y = legend_y + 20 + i * 18
+        body.append(f'<circle cx="{legend_x + 6}" cy="{y - 4}" r="5" fill="{colours.get(series, "#777")}"/>')
+        body.append(_text(legend_x + 16, y, series))
+
+    return _svg(width, height, body, title)
+
+
+def pie_svg(
+    counts: Mapping[Label, int], colours: Mapping[Label, str], title: str = "Commits by type"
+) -> str:
+    """Pie chart of *counts* with percentage labels."""
+    width, height = 440, 440
+    cx, cy, radius = width / 2, height / 2 + 10, 150
+    body = [_text(cx, 22, title, text_anchor="middle", font_size="14", font_weight="600")]
+
+    total = sum(counts.values())
+    if not total:
+        body.append(_text(cx, cy, "No data", text_anchor="middle"))
+        return _svg(width, height, body, title)
+
+    # Clockwise from 12 o'clock, like the matplotlib version.
+    angle = -math.pi / 2
+    for label, count in counts.items():
+        share = count / total
+        sweep = share * 2 * math.pi
+        colour = colours.get(label, "#777")
+        tooltip = f"<title>{escape(label)}: {count}</title>"
+        if share >= 1:
+            body.append(f'<circle cx="{cx}" cy="{cy}" r="{radius}" fill="{colour}">{tooltip}</circle>')
+        else:
+            x1, y1 = cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+            x2, y2 = cx + radius * math.cos(angle + sweep), cy + radius * math.sin(angle + sweep)
+            large = 1 if sweep > math.pi else 0
+            body.append(
+                f'<path d="M{cx},{cy} L{x1:.2f},{y1:.2f} A{radius},{radius} 0 {large} 1 {x2:.2f},{y2:.2f} Z" '
+                f'fill="{colour}" stroke="#fff" stroke-width="0.5">{tooltip}</path>'
+            )
+        middle = angle + sweep / 2
+        body.append(
+            _text(cx + radius * 0.6 * math.cos(middle), cy + radius * 0.6 * math.sin(middle) + 4,
+                  f"{share * 100:.0f}%", text_anchor="middle")
+        )
+        lx, ly = cx + radius * 1.12 * math.cos(middle), cy + radius * 1.12 * math.sin(middle) + 4
+        body.append(_text(lx, ly, label, text_anchor="start" if math.cos(middle) >= 0 else "end"))
+        angle += sweep
+
+    return _svg(width, height, body, title)
+
+
+def bar_svg(
+    bars: Sequence[tuple[str, int]],
+    title: str,
+    colour: str = "#1f77b4",
+    colours: Mapping[str, str] | None = None,
+) -> str:
+    """Vertical bar chart of ``(label, value)`` pairs."""
+    width, height = 640, 320
+    left, right, top, bottom = 50, 16, 36, 86
+    plot_w, plot_h = width - left - right, height - top - bottom
+    body = [_text(width / 2, 20, title, text_anchor="middle", font_size="14", font_weight="600")]
+    if not bars:
+        body.append(_text(width / 2, height / 2, "No data", text_anchor="middle"))
+        return _svg(width, height, body, title)
+
+    top_value = max(value for _, value in bars)
+    step = _nice_step(top_value)
+    y_max = max(step, math.ceil(top_value / step) * step)
+    for value in range(0, y_max + 1, step):
+        y = top + plot_h - value / y_max * plot_h
+        body.append(f'<line x1="{left}" y1="{y:.1f}" x2="{left + plot_w}" y2="{y:.1f}" stroke="#e5e5e5"/>')
+        body.append(_text(left - 6, y + 4, str(value), text_anchor="end"))
+
+    slot = plot_w / len(bars)
+    # Label every n-th bar so long series stay readable.
+    every = max(1, math.ceil(len(bars) / 26))
+    for i, (label, value) in enumerate(bars):
+        x = left + i * slot + slot * 0.1
+        bar_h = value / y_max * plot_h
+        fill = (colours or {}).get(label, colour)
+        body.append(
+            f'<rect x="{x:.1f}" y="{top + plot_h - bar_h:.1f}" width="{slot * 0.8:.1f}" '
+            f'height="{bar_h:.1f}" fill="{fill}"><title>{escape(label)}: {value}</title></rect>'
+        )
+        if i % every == 0:
+            lx, ly = x + slot * 0.4, top + plot_h + 14
+            body.append(
+                _text(lx, ly, label, text_anchor="end", transform=f"rotate(-45 {lx:.1f} {ly})")
+            )
+    body.append(f'<line x1="{left}" y1="{top + plot_h}" x2="{left + plot_w}" y2="{top + plot_h}" stroke="#333"/>')
+    return _svg(width, height, body, title)
@@ -0,0 +1,421 @@
+"""``python -m developerscope`` – the notebook pipeline as a headless CLI.
+
+    python -m developerscope discover https://github.com/org/repo
+    python -m developerscope metrics  https://github.com/org/repo
+    python -m developerscope plan     https://github.com/org/repo --top 20
+    python -m developerscope analyse  https://github.com/org/repo --budget-tokens 2000000
+    python -m developerscope report   https://github.com/org/repo
+    python -m developerscope orchestrate repos.json --analyse --budget-tokens 20000000
+
+State lives where the notebook keeps it: ``out/<repo>.json`` (``CommitStatus``
+per merge) and ``out/<repo>.sqlite``; finished analyses are also appended to
+``out/<repo>.results.ndjson``. Every subcommand picks up from there, so
+an interrupted ``analyse`` simply continues with the commits still NEW.
+``analyse`` takes the most valuable merges first (see
+:mod:`developerscope.workqueue`) and starts no new one once ``--limit``,
+``--budget-tokens`` or ``--budget-minutes`` is used up. ``orchestrate`` runs
+the same stages over every repository of a manifest (see
+:mod:`developerscope.orchestrator`).
+
+Only the standard library is imported at start-up; git, radon, openai and
+matplotlib load inside the subcommand that needs them.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+
+def _env_int(name: str) -> int | None:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+def _env_float(name: str) -> float | None:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def _env_choice(name: str, choices: tuple[str, ...], default: str) -> str:
+    # argparse checks `choices` against the command line only, not the default
+    value = os.environ.get(name) or default
+    if value not in choices:
+        raise SystemExit(f"{name} must be one of {', '.join(choices)}, not {value!r}")
+    return value
+
+
+def _paths(args: argparse.Namespace):
+    from developerscope.orchestrator import RepoSpec
+
+    # Same layout as the notebook: the repository is a sibling checkout.
+    return RepoSpec(args.url, Path(args.repo_path) if args.repo_path else None, Path(args.out))
+
+
+def _open_store(paths):
+    from developerscope.orchestrator import open_store
+
+    try:
+        return open_store(paths)
+    except FileNotFoundError as e:
+        raise SystemExit(str(e))
+
+
+def cmd_discover(args: argparse.Namespace) -> int:
+    from developerscope.orchestrator import discover_repo
+
+    paths = _paths(args)
+    started = time.perf_counter()
+    try:
+        added, incremental, counts = discover_repo(paths, full=args.full)
+    except FileNotFoundError as e:
+        raise SystemExit(str(e))
+
+    mode = "incremental" if incremental else "full"
+    print(f"{mode} discovery: {added} new merge(s) in {time.perf_counter() - started:.2f}s")
+    print(", ".join(f"{status}: {n}" for status, n in sorted(counts.items())))
+    return 0
+
+
+def cmd_metrics(args: argparse.Namespace) -> int:
+    import asyncio
+
+    import git
+
+    from developerscope.metrics import get_metrics_service, set_metrics_service
+
+    paths = _paths(args)
+    store = _open_store(paths)
+    repo = git.Repo(paths.repo)
+    records = list(store.commits(status=None if args.all else "NEW"))
+
+    started = time.perf_counter()
+    commits = [repo.commit(record.commit_hash) for record in records]
+    try:
+        metrics = asyncio.run(get_metrics_service().score_commits(commits))
+    finally:
+        set_metrics_service(None)
+    if args.json:
+        for commit in commits:
+            print(json.dumps({"commitHash": commit.hexsha, **metrics[commit.hexsha]}))
+    print(
+        f"metrics for {len(records)} merge(s) in {time.perf_counter() - started:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def _budget(args: argparse.Namespace):
+    from developerscope.workqueue import Budget
+
+    return Budget(
+        tokens=args.budget_tokens,
+        seconds=args.budget_minutes * 60 if args.budget_minutes is not None else None,
+        merges=args.limit,
+    )
+
+
+def _print_usage(signals, ok: bool) -> None:
+    from developerscope.usage import usage_stats
+
+    usage = usage_stats.commits.get(signals.commit_hash)
+    if ok and usage is not None and usage.requests:
+        print(f"{signals.commit_hash[:12]}: {usage.summary()}")
+
+
+async def _analyse(store, repo, args: argparse.Namespace):
+    from developerscope.orchestrator import analyse_merge
+    from developerscope.workqueue import MergeSignals, collect_signals, drain, plan
+
+    async def process(signals: MergeSignals, rank: int) -> bool:
+        ok = await analyse_merge(
+            store, repo, signals, rank, triage=not args.no_triage, review=args.review
+        )
+        _print_usage(signals, ok)
+        return ok
+
+    finished = 0
+
+    def progress(run) -> None:
+        nonlocal finished
+        finished += 1
+        if finished % args.batch_size == 0:
+            print(f"{run.succeeded}/{run.planned} analysed", file=sys.stderr)
+
+    budget = _budget(args)
+    records = list(store.commits(status="NEW"))
+    if args.order == "priority":
+        signals = await collect_signals(store, repo, records)
+    else:
+        signals = [
+            MergeSignals(r.commit_hash, r.author, r.branch, patch_id=r.patch_id or "")
+            for r in records
+        ]
+    done = {author: n for author, (_, n) in store.author_counts().items()}
+    queue = plan(signals, fair_share=args.fair_share, done=done)
+    return await drain(
+        queue, process, concurrency=args.batch_size, budget=budget, progress=progress
+    )
+
+
+def _print_dedup() -> None:
+    from developerscope.patchid import dedup_stats
+
+    if dedup_stats.reused:
+        print(
+            f"dedup: {dedup_stats.reused} merge(s) reused the analysis of an identical patch, "
+            f"{dedup_stats.saved_llm_calls} LLM call(s) saved"
+        )
+
+
+def cmd_analyse(args: argparse.Namespace) -> int:
+    import asyncio
+
+    import git
+
+    from developerscope.metrics import set_metrics_service
+    from developerscope.usage import usage_stats
+
+    paths = _paths(args)
+    store = _open_store(paths)
+    resumed = store.reset_pending()  # commits left PENDING by a crashed run
+    if resumed:
+        print(f"resuming: {resumed} pending merge(s) back to NEW", file=sys.stderr)
+
+    started = time.perf_counter()
+    try:
+        run = asyncio.run(_analyse(store, git.Repo(paths.repo), args))
+    finally:
+        store.export_json(paths.stats)
+        set_metrics_service(None)
+    print(
+        f"analysed {run.succeeded}/{run.started} merge(s) in {time.perf_counter() - started:.1f}s"
+    )
+    if run.stopped:
+        print(f"stopped at the {run.stopped}: {store.counts().get('NEW', 0)} merge(s) left NEW")
+    tokens = usage_stats.totals()
+    print(
+        f"tokens: {tokens['input_tokens']} in ({tokens['cached_tokens']} cached), "
+        f"{tokens['output_tokens']} out; {tokens['reviews_skipped']} review(s) skipped, "
+        f"~{tokens['skipped_tokens']} input tokens not sent"
+    )
+    _print_dedup()
+    return 0 if run.succeeded == run.started else 1
+
+
+def cmd_plan(args: argparse.Namespace) -> int:
+    import asyncio
+
+    import git
+
+    from developerscope.metrics import set_metrics_service
+    from developerscope.workqueue import collect_signals, plan
+
+    paths = _paths(args)
+    store = _open_store(paths)
+    try:
+        signals = asyncio.run(collect_signals(store, git.Repo(paths.repo)))
+    finally:
+        set_metrics_service(None)
+    done = {author: n for author, (_, n) in store.author_counts().items()}
+    queue = plan(signals, fair_share=args.fair_share, done=done)
+    if args.top is not None:
+        queue = queue[: args.top]
+    print(f"{'rank':>4}  {'commit':<12}  {'score':>5}  {'halstead':>9}  {'lines':>6}  "
+          f"{'sens':>4}  {'cover':>5}  author")
+    for rank, s in enumerate(queue):
+        print(
+            f"{rank:>4}  {s.commit_hash[:12]}  {s.score:>5.2f}  {s.halstead:>9.1f}  {s.lines:>6}  "
+            f"{len(s.sensitive):>4}  {s.coverage:>5.0%}  {s.author}"
+        )
+    return 0
+
+
+def cmd_report(args: argparse.Namespace) -> int:
+    from report_generator import (
+        generate_dashboard,
+        generate_reports,
+        generate_reports_from_results,
+    )
+
+    paths = _paths(args)
+    store = _open_store(paths)
+    output_dir = args.output_dir or str(paths.out / f"{paths.name}-reports")
+    if args.stream:
+        generate_reports_from_results(
+            str(store.results.path), paths.url, output_dir, args.workers, store.author_summaries()
+        )
+    else:
+        store.export_json(paths.stats)
+        generate_reports(str(paths.author_dir), paths.url, output_dir, args.workers, args.force)
+    generate_dashboard(store.rollups(), paths.url, output_dir)
+    return 0
+
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    from developerscope.sink import compact, export_authors
+
+    paths = _paths(args)
+    store = _open_store(paths)
+    started = time.perf_counter()
+    kept = compact(store.results.path)
+    written = export_authors(store.results.path, paths.author_dir, store.author_summaries())
+    print(
+        f"{kept} result(s) in {store.results.path}; {len(written)} author file(s) written "
+        f"to {paths.author_dir} in {time.perf_counter() - started:.2f}s"
+    )
+    return 0
+
+
+def cmd_orchestrate(args: argparse.Namespace) -> int:
+    from developerscope.orchestrator import load_manifest, run_manifest
+    from developerscope.usage import usage_stats
+
+    try:
+        specs = load_manifest(args.manifest, args.out)
+    except (OSError, ValueError, KeyError) as e:
+        raise SystemExit(f"{args.manifest}: {e!r}")
+    started = time.perf_counter()
+    results = run_manifest(
+        specs,
+        full=args.full,
+        analyse=args.analyse,
+        report=args.report,
+        budget=_budget(args),
+        fair_share=args.fair_share,
+        concurrency=args.batch_size,
+        triage=not args.no_triage,
+        review=args.review,
+        discovery_workers=args.workers,
+        on_merge=_print_usage,
+    )
+    width = max(len(r.spec.name) for r in results) if results else 4
+    for r in results:
+        counts = ", ".join(f"{status}: {n}" for status, n in sorted(r.counts.items()))
+        line = f"{r.spec.name:<{width}}  {r.new:>5} new"
+        if args.analyse:
+            line += f"  {r.analysed:>5}/{r.planned} analysed"
+        print(f"{line}  {r.error or counts}")
+    print(f"{len(specs)} repositories in {time.perf_counter() - started:.1f}s")
+    if args.analyse:
+        tokens = usage_stats.totals()
+        print(
+            f"tokens: {tokens['input_tokens']} in ({tokens['cached_tokens']} cached), "
+            f"{tokens['output_tokens']} out"
+        )
+        _print_dedup()
+    return 1 if any(r.error for r in results) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m developerscope",
+        description="Analyse the merge commits of a git repository.",
+    )
+    parser.add_argument("--profile", metavar="TRACE", help="write a JSONL timing trace here")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add(name: str, func, help: str) -> argparse.ArgumentParser:
+        p = sub.add_parser(name, help=help, description=help)
+        p.add_argument("url", help="repository URL, e.g. https://github.com/org/repo")
+        p.add_argument("--repo-path", help="local checkout (default: ../<repo name>)")
+        p.add_argument("--out", default="out", help="state directory (default: out)")
+        p.set_defaults(func=func)
+        return p
+
+    def add_fair_share(p: argparse.ArgumentParser) -> None:
+        p.add_argument(
+            "--fair-share",
+            action="store_true",
+            default=os.environ.get("DEVELOPERSCOPE_FAIR_SHARE", "") not in ("", "0"),
+            help="serve authors in turn, least analysed first",
+        )
+
+    p = add("discover", cmd_discover, "find merge commits; incremental after the first run")
+    p.add_argument("--full", action="store_true", help="walk the whole history again")
+
+    p = add("metrics", cmd_metrics, "compute Halstead and complexity metrics (warms the metric cache)")
+    p.add_argument("--all", action="store_true", help="include already analysed merges")
+    p.add_argument("--json", action="store_true", help="print one JSON line per merge")
+
+    def add_llm_options(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--batch-size", type=int, default=20, help="merges analysed concurrently")
+        p.add_argument("--limit", type=int, help="analyse at most this many merges")
+        p.add_argument(
+            "--budget-tokens",
+            type=int,
+            default=_env_int("DEVELOPERSCOPE_BUDGET_TOKENS"),
+            help="start no merge once this many input+output tokens are spent",
+        )
+        p.add_argument(
+            "--budget-minutes",
+            type=float,
+            default=_env_float("DEVELOPERSCOPE_BUDGET_MINUTES"),
+            help="start no merge after this many minutes",
+        )
+        add_fair_share(p)
+        p.add_argument("--no-triage", action="store_true", help="send trivial merges to the LLM too")
+        p.add_argument(
+            "--review",
+            choices=("auto", "always", "never"),
+            default=_env_choice("DEVELOPERSCOPE_REVIEW", ("auto", "always", "never"), "auto"),
+            help="auto: review only HIGH/CRITICAL findings (default)",
+        )
+
+    p = add("analyse", cmd_analyse, "analyse NEW merges with the LLM, most valuable first; resumable")
+    add_llm_options(p)
+    p.add_argument(
+        "--order",
+        choices=("priority", "discovery"),
+        default="priority",
+        help="priority: by Halstead delta, diff size, sensitive paths and author coverage",
+    )
+
+    p = add("plan", cmd_plan, "print the order `analyse` would take the NEW merges in")
+    p.add_argument("--top", type=int, help="only the first N")
+    add_fair_share(p)
+
+    p = add("report", cmd_report, "render author reports and the team dashboard")
+    p.add_argument("--output-dir", help="default: <out>/<repo>-reports")
+    p.add_argument("--workers", type=int, help="report worker processes")
+    p.add_argument("--force", action="store_true", help="re-render unchanged authors too")
+    p.add_argument(
+        "--stream", action="store_true", help="render from the NDJSON results, bounded memory"
+    )
+
+    add(
+        "compact",
+        cmd_compact,
+        "deduplicate the NDJSON results and write the per-author JSON files from them",
+    )
+
+    help = "discover and score every repository of a manifest; optionally analyse and report"
+    p = sub.add_parser("orchestrate", help=help, description=help)
+    p.add_argument("manifest", help='JSON: {"out": "out", "repos": [{"url": ..., "path": ...}]}')
+    p.add_argument("--out", help="state directory (default: the manifest's, else out)")
+    p.add_argument("--full", action="store_true", help="walk every history again")
+    p.add_argument(
+        "--workers",
+        type=int,
+        help="discovery worker processes (default: DEVELOPERSCOPE_DISCOVERY_WORKERS or 4)",
+    )
+    p.add_argument("--analyse", action="store_true", help="run the LLM stage over all repositories")
+    p.add_argument("--report", action="store_true", help="render each repository's reports")
+    add_llm_options(p)
+    p.set_defaults(func=cmd_orchestrate)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        from developerscope import profiling
+
+        profiling.enable(args.profile)
+    try:
+        return args.func(args)
+    finally:
+        if args.profile:
+            profiling.disable()
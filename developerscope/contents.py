@@ -0,0 +1,245 @@
+"""File contents served to the model through the ``get_file_contents`` tool.
+
+Each commit's tree is indexed once (path -> blob SHA) and blob bodies are kept
+in a process-wide LRU keyed by blob SHA, so the analyse and the review pass –
+and later commits that share unchanged files – never read the same object
+twice. Responses are bounded: every file is cut at ``max_file_bytes`` and the
+whole response at ``max_total_bytes``, with a marker wherever text was left
+out.
+
+:func:`scoped_paths` picks the files worth offering to the model up front: the
+ones the merge touched, the Python modules they import and their siblings.
+"""
+
+import os
+import posixpath
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, Sequence
+
+import git
+
+from developerscope import profiling
+from developerscope.catfile import get_pool
+from developerscope.diffbuilder import diff_path
+
+DEFAULT_MAX_FILE_BYTES = int(os.environ.get("DEVELOPERSCOPE_TOOL_FILE_BYTES", 48_000))
+DEFAULT_MAX_TOTAL_BYTES = int(os.environ.get("DEVELOPERSCOPE_TOOL_TOTAL_BYTES", 200_000))
+
+DEFAULT_MAX_SCOPED_PATHS = int(os.environ.get("DEVELOPERSCOPE_TOOL_MAX_PATHS", 300))
+
+_INDEX_ENTRIES = 64
+_CONTENT_BYTES = 64 * 1024 * 1024
+
+
+class _LRU:
+    """A thread-safe LRU bounded by entry count and total value size."""
+
+    def __init__(self, max_entries: int, max_bytes: int | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._items: OrderedDict[str, tuple[object, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key: str, value: object, size: int = 0) -> None:
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._items[key] = (value, size)
+            self._size += size
+            while len(self._items) > self.max_entries or (
+                self.max_bytes is not None and self._size > self.max_bytes and len(self._items) > 1
+            ):
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._size -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+_indexes = _LRU(_INDEX_ENTRIES)
+_module_maps = _LRU(_INDEX_ENTRIES)
+_contents = _LRU(1_000_000, _CONTENT_BYTES)
+
+
+def tree_index(commit: git.Commit) -> dict[str, str]:
+    """Return ``{path: blob sha}`` for every file in *commit*'s tree (memoized)."""
+    key = f"{commit.repo.git_dir}:{commit.tree.hexsha}"
+    index = _indexes.get(key)
+    if index is None:
+        with get_pool(commit.repo).reader() as reader:
+            index = {entry.path: entry.hexsha for entry in reader.iter_tree(commit.hexsha)}
+        _indexes.put(key, index)
+    return index  # type: ignore[return-value]
+
+
+def _module_map(commit: git.Commit) -> dict[str, list[str]]:
+    """Map every dotted module suffix to the Python files that provide it.
+
+    ``src/pkg/mod.py`` is reachable as ``src.pkg.mod``, ``pkg.mod`` and
+    ``mod``; packages are keyed by their ``__init__.py``.
+    """
+    key = f"{commit.repo.git_dir}:{commit.tree.hexsha}"
+    modules = _module_maps.get(key)
+    if modules is None:
+        modules = {}
+        for path in tree_index(commit):
+            if not path.endswith(".py"):
+                continue
+            parts = path[:-3].split("/")
+            if parts[-1] == "__init__":
+                parts.pop()
+            for i in range(len(parts)):
+                modules.setdefault(".".join(parts[i:]), []).append(path)
+        _module_maps.put(key, modules)
+    return modules  # type: ignore[return-value]
+
+
+_IMPORT = re.compile(
+    r"^\s*(?:from\s+(\.*[\w.]*)\s+import\s+([\w.*, ()]+)|import\s+([\w., ]+))", re.MULTILINE
+)
+
+
+def _imported_modules(path: str, source: str) -> set[str]:
+    """Dotted names imported by *source*, relative imports made absolute."""
+    package = posixpath.dirname(path).replace("/", ".")
+    names: set[str] = set()
+    for base, members, plain in _IMPORT.findall(source):
+        if plain:
+            names.update(n.split(" as ")[0].strip() for n in plain.split(","))
+            continue
+        level = len(base) - len(base.lstrip("."))
+        module = base.lstrip(".")
+        if level:
+            anchor = package.split(".") if package else []
+            anchor = anchor[: len(anchor) - (level - 1)] if level > 1 else anchor
+            module = ".".join([*anchor, module] if module else anchor)
+        names.add(module)
+        for member in members.strip("() ").split(","):
+            member = member.split(" as ")[0].strip()
+            if member and member != "*":
+                names.add(f"{module}.{member}" if module else member)
+    names.discard("")
+    return names
+
+
+def scoped_paths(
+    commit: git.Commit,
+    max_paths: int = DEFAULT_MAX_SCOPED_PATHS,
+    diffs: Sequence[git.Diff] | None = None,
+) -> list[str]:
+    """Paths worth offering for *commit*, most relevant first.
+
+    The files touched by the first-parent diff come first, then the Python
+    modules they import (resolved against the tree), then the other files in
+    their directories, up to *max_paths* in total. *diffs* is that diff when
+    the caller already has it.
+    """
+    index = tree_index(commit)
+    touched: list[str]
+    if diffs is not None:
+        touched = [diff_path(d) for d in diffs]
+    elif commit.parents:
+        touched = [diff_path(d) for d in commit.parents[0].diff(commit)]
+    else:
+        touched = list(index)
+    touched = [p for p in dict.fromkeys(touched) if p in index]
+
+    py_files = [p for p in touched if p.endswith(".py")]
+    sources = read_contents(commit.repo, (index[p] for p in py_files))
+    imported: list[str] = []
+    for path in py_files:
+        source = sources[index[path]].decode("utf-8", errors="replace")
+        for name in sorted(_imported_modules(path, source)):
+            matches = _module_map(commit).get(name, [])
+            if len(matches) <= 3:  # an ambiguous suffix resolves to nothing useful
+                imported.extend(matches)
+
+    directories = {posixpath.dirname(p) for p in touched}
+    siblings = [p for p in index if posixpath.dirname(p) in directories]
+
+    scoped = list(dict.fromkeys([*touched, *imported, *siblings]))
+    # An empty enum is not a valid schema; offer the top of the tree instead.
+    return scoped[:max_paths] or list(index)[:max_paths]
+
+
+def read_contents(repo: git.Repo, hexshas: Iterable[str]) -> dict[str, bytes]:
+    """Return the bodies of *hexshas*, reading only the ones not cached yet."""
+    found: dict[str, bytes] = {}
+    missing: list[str] = []
+    for hexsha in dict.fromkeys(hexshas):
+        data = _contents.get(hexsha)
+        if data is None:
+            missing.append(hexsha)
+        else:
+            found[hexsha] = data  # type: ignore[assignment]
+    profiling.count("contents.cache_hit", len(found))
+    if missing:
+        profiling.count("contents.cache_miss", len(missing))
+        with get_pool(repo).reader() as reader:
+            for hexsha, data in zip(missing, reader.read_blobs(missing)):
+                _contents.put(hexsha, data, len(data))
+                found[hexsha] = data
+    return found
+
+
+def _truncate(data: bytes, limit: int) -> tuple[bytes, int]:
+    """Cut *data* to at most *limit* bytes, at a line end when there is one."""
+    if len(data) <= limit:
+        return data, 0
+    cut = data.rfind(b"\n", 0, limit)
+    cut = limit if cut <= 0 else cut + 1
+    return data[:cut], len(data) - cut
+
+
+def format_file_contents(
+    commit: git.Commit,
+    paths: Iterable[str] | None = None,
+    max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+    max_total_bytes: int = DEFAULT_MAX_TOTAL_BYTES,
+) -> str:
+    """Render *paths* of *commit* (all files when ``None``) for the model."""
+    index = tree_index(commit)
+    wanted = list(index) if paths is None else list(dict.fromkeys(paths))
+    contents = read_contents(commit.repo, (index[p] for p in wanted if p in index))
+
+    chunks = []
+    remaining = max_total_bytes
+    for path in wanted:
+        header = f"### FILE: `{path}`\n\n"
+        hexsha = index.get(path)
+        if hexsha is None:
+            chunks.append(header + "(not found in this commit)\n")
+            continue
+        data = contents[hexsha]
+        if b"\0" in data[:8192]:
+            chunks.append(header + f"(binary file, {len(data)} bytes)\n")
+            continue
+        if remaining <= 0:
+            chunks.append(header + f"(omitted: response limit of {max_total_bytes} bytes reached)\n")
+            continue
+
+        body, cut = _truncate(data, min(max_file_bytes, remaining))
+        remaining -= len(body)
+        text = body.decode("utf-8", errors="replace")
+        marker = f"\n[... truncated, {cut} more bytes ...]\n" if cut else ""
+        chunks.append(f"{header}```\n{text}\n```{marker}\n")
+
+    return "\n\n".join(chunks)
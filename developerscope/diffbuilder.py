@@ -0,0 +1,240 @@
+"""Token-budgeted assembly of the first-parent diff of a merge commit.
+
+Binary and generated/lock files are skipped, patches are decoded leniently,
+and when the diff would not fit into the budget the hunks are ranked – by the
+file's Halstead delta, risk keywords and file type – and the least useful ones
+are dropped. Everything that was left out is reported, both in the result and
+as a short note at the end of the prompt text.
+"""
+
+import fnmatch
+import io
+import math
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Sequence, TypedDict
+
+import git
+
+from developerscope._types import HalsteadBreakdown
+
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("DEVELOPERSCOPE_DIFF_TOKENS", 120_000))
+
+GENERATED_PATTERNS = (
+    "*.lock",
+    "package-lock.json",
+    "pnpm-lock.yaml",
+    "go.sum",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.svg",
+    "*.ipynb",
+    "dist/*",
+    "build/*",
+    "vendor/*",
+    "node_modules/*",
+)
+
+FILE_TYPE_WEIGHTS = {
+    ".py": 1.0,
+    ".js": 0.9,
+    ".ts": 0.9,
+    ".go": 0.9,
+    ".java": 0.9,
+    ".sql": 0.9,
+    ".sh": 0.8,
+    ".html": 0.5,
+    ".yml": 0.5,
+    ".yaml": 0.5,
+    ".toml": 0.4,
+    ".cfg": 0.4,
+    ".ini": 0.4,
+    ".json": 0.3,
+    ".txt": 0.2,
+    ".md": 0.1,
+    ".rst": 0.1,
+}
+DEFAULT_FILE_WEIGHT = 0.6
+
+RISK_PATTERN = re.compile(
+    r"password|passwd|secret|token|api[_-]?key|credential|auth|session|cookie"
+    r"|crypt|hashlib|random|sql|execute|subprocess|os\.system|shell=True|eval\("
+    r"|exec\(|pickle|yaml\.load|verify=False|chmod|permission|sanitiz|escape",
+    re.IGNORECASE,
+)
+
+# Roughly one token per word or punctuation mark – close enough to BPE counts
+# for budgeting, and orders of magnitude faster than a real tokenizer.
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_HUNK_HEADER = re.compile(r"^@@", re.MULTILINE)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class DroppedItem(TypedDict):
+    path: str
+    reason: str
+    tokens: int
+
+
+@dataclass
+class _Hunk:
+    file_index: int
+    hunk_index: int
+    path: str
+    text: str
+    tokens: int
+    score: float
+
+
+@dataclass
+class DiffBuild:
+    text: str
+    tokens: int
+    kept_hunks: int
+    total_hunks: int
+    dropped: list[DroppedItem] = field(default_factory=list)
+
+
+def is_generated(path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return any(
+        fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern)
+        for pattern in GENERATED_PATTERNS
+    )
+
+
+def diff_path(diff: git.Diff) -> str:
+    """The path *diff* is reported under: the new one, the old one for deletions."""
+    return diff.b_path or diff.a_path or ""
+
+
+def _decode(data: bytes) -> str | None:
+    """Decode a patch; ``None`` for binary content."""
+    if data.startswith(b"Binary files") or b"\0" in data[:8192]:
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def patch_text(diff: git.Diff) -> str | None:
+    """The patch :func:`build_diff` would show for *diff*; ``None`` when it
+    omits the file as generated or binary."""
+    if is_generated(diff_path(diff)):
+        return None
+    raw = diff.diff or b""
+    return raw if isinstance(raw, str) else _decode(raw)
+
+
+def _split_hunks(patch: str) -> list[str]:
+    starts = [m.start() for m in _HUNK_HEADER.finditer(patch)]
+    if not starts:
+        return [patch] if patch else []
+    starts.append(len(patch))
+    return [patch[a:b] for a, b in zip(starts, starts[1:])]
+
+
+def _score(path: str, text: str, halstead_delta: float) -> float:
+    ext = os.path.splitext(path)[1].lower()
+    weight = FILE_TYPE_WEIGHTS.get(ext, DEFAULT_FILE_WEIGHT)
+    changed = "\n".join(l for l in text.splitlines() if l[:1] in "+-")
+    risk = len(RISK_PATTERN.findall(changed))
+    return weight * (1 + min(risk, 10) * 0.5) * (1 + math.log1p(abs(halstead_delta)) / 5)
+
+
+def first_parent_patches(commit: git.Commit) -> git.DiffIndex:
+    return commit.parents[0].diff(commit, create_patch=True)
+
+
+def build_diff(
+    commit: git.Commit,
+    token_budget: int | None = DEFAULT_TOKEN_BUDGET,
+    breakdown: HalsteadBreakdown | None = None,
+    diffs: Sequence[git.Diff] | None = None,
+) -> DiffBuild:
+    """Assemble the first-parent diff of *commit* within *token_budget* tokens.
+
+    *diffs* restricts the output to an already computed subset of the diff.
+    """
+    deltas = {f["path"]: f["delta"] for f in breakdown["files"]} if breakdown else {}
+    diff_index = diffs if diffs is not None else first_parent_patches(commit)
+
+    headers: list[str] = []
+    hunks: list[_Hunk] = []
+    dropped: list[DroppedItem] = []
+    for diff in diff_index:
+        path = diff_path(diff)
+        raw = diff.diff or b""
+        if isinstance(raw, str):
+            raw = raw.encode()
+        if is_generated(path):
+            dropped.append({"path": path, "reason": "generated", "tokens": len(raw) // 4})
+            continue
+        patch = _decode(raw)
+        if patch is None:
+            dropped.append({"path": path, "reason": "binary", "tokens": 0})
+            continue
+
+        file_index = len(headers)
+        headers.append(f"==== File: {path} ====\n")
+        delta = deltas.get(path, 0.0)
+        for hunk_index, text in enumerate(_split_hunks(patch)):
+            hunks.append(
+                _Hunk(file_index, hunk_index, path, text, estimate_tokens(text), _score(path, text, delta))
+            )
+
+    header_tokens = [estimate_tokens(h) for h in headers]
+    total = sum(h.tokens for h in hunks) + sum(header_tokens)
+    if token_budget is None or total <= token_budget:
+        kept = hunks
+    else:
+        kept, used, opened = [], 0, set()
+        cut: dict[str, DroppedItem] = {}
+        for hunk in sorted(hunks, key=lambda h: (-h.score, h.tokens)):
+            cost = hunk.tokens + (0 if hunk.file_index in opened else header_tokens[hunk.file_index])
+            if used + cost > token_budget:
+                item = cut.setdefault(hunk.path, {"path": hunk.path, "reason": "budget", "tokens": 0})
+                item["tokens"] += hunk.tokens
+                continue
+            used += cost
+            opened.add(hunk.file_index)
+            kept.append(hunk)
+        kept.sort(key=lambda h: (h.file_index, h.hunk_index))
+        dropped.extend(cut.values())
+
+    out = io.StringIO()
+    # Files without hunks (pure renames, mode changes) still get their header.
+    by_file: dict[int, list[_Hunk]] = {i: [] for i in range(len(headers))}
+    for hunk in kept:
+        by_file[hunk.file_index].append(hunk)
+    has_hunks = {hunk.file_index for hunk in hunks}
+    for file_index, file_hunks in by_file.items():
+        if not file_hunks and file_index in has_hunks:
+            continue  # every hunk of this file was cut
+        out.write(headers[file_index])
+        for hunk in file_hunks:
+            out.write(hunk.text)
+        out.write("\n\n")
+
+    if dropped:
+        out.write("==== Omitted from this diff ====\n")
+        for item in dropped:
+            out.write(f"- {item['path']} ({item['reason']}, ~{item['tokens']} tokens)\n")
+
+    text = out.getvalue()
+    return DiffBuild(
+        text=text,
+        tokens=estimate_tokens(text),
+        kept_hunks=len(kept),
+        total_hunks=len(hunks),
+        dropped=dropped,
+    )
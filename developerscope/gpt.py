@@ -53,17 +53,37 @@ Assume the user will paste the full raw data in the user message. Do not explain
 
 
 from pathlib import Path
-from typing import cast
+from typing import Literal, Sequence, cast
+import os
 import git
 
 from developerscope.analyzer import get_current_state_paths
+from developerscope.contents import scoped_paths, tree_index
+
+# "diff": offer the touched files and their neighbours, plus a free-form
+# ``extra_files`` list; "all": enumerate the whole tree (large requests).
+DEFAULT_TOOL_SCOPE: Literal["diff", "all"] = (
+    "all" if os.environ.get("DEVELOPERSCOPE_TOOL_SCOPE") == "all" else "diff"
+)
 
 
 def tool_get_file_contents(
-    targer_commit: git.Commit | None = None, files: list[str] = ["example.txt"]
+    targer_commit: git.Commit | None = None,
+    files: list[str] = ["example.txt"],
+    scope: Literal["diff", "all"] = DEFAULT_TOOL_SCOPE,
+    diffs: Sequence[git.Diff] | None = None,
 ):
+    properties = {}
     if targer_commit is not None:
-        files = get_current_state_paths(targer_commit)
+        if scope == "all":
+            files = get_current_state_paths(targer_commit)
+        else:
+            files = scoped_paths(targer_commit, diffs=diffs)
+            properties["extra_files"] = {
+                "type": "array",
+                "description": "Other paths from the repository root, for files not offered in `files`",
+                "items": {"type": "string"},
+            }
     return {
         "type": "function",
         "name": "get_file_contents",
@@ -71,7 +91,7 @@ def tool_get_file_contents(
         "strict": True,
         "parameters": {
             "type": "object",
-            "required": ["files"],
+            "required": ["files", *properties],
             "properties": {
                 "files": {
                     "type": "array",
@@ -81,20 +101,26 @@ def tool_get_file_contents(
                         "enum": files,
                         "description": "File name that exists in the git repository",
                     },
-                }
+                },
+                **properties,
             },
             "additionalProperties": False,
         },
     }
 
 
-from developerscope.analyzer import get_prompt_for_merge_commit
+from developerscope.analyzer import (
+    get_prompt_for_merge_commit,
+    get_prompts_for_merge_commit,
+)
 
 
-def get_input_messages_analyzer(targer_commit: git.Commit):
+def get_input_messages_analyzer(targer_commit: git.Commit, prompt: str | None = None):
+    if prompt is None:
+        prompt = get_prompt_for_merge_commit(targer_commit)
     input_messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": get_prompt_for_merge_commit(targer_commit)},
+        {"role": "user", "content": prompt},
     ]
 
     return input_messages
@@ -107,38 +133,146 @@ def get_review_input_messages(response):
     },
     {
       "role": "user",
-      "content": response.text
+      "content": response if isinstance(response, str) else response.text
     }
     ]
     return input_messages
 
 
+REVIEW_FILES_SEEN = """
+All files named in the reported issues were already retrieved above; call `get_file_contents` only if you need a file you have not seen.
+"""
+
+
+def fetched_files(input_messages) -> set[str]:
+    """Paths already returned by ``get_file_contents`` in a conversation."""
+    files: set[str] = set()
+    for item in input_messages:
+        if item.get("type") == "function_call" and item.get("name") == "get_file_contents":
+            args = json.loads(item["arguments"])
+            files.update(args.get("files", []), args.get("extra_files", []))
+    return files
+
+
+def get_review_continuation(input_messages, analysis_text: str, issue_files: set[str] | None):
+    """Continue the analyse conversation with the review instructions.
+
+    The analyse pass's system prompt, diff and tool results stay an unchanged
+    prefix of the review request, so the provider's prompt cache covers them.
+    Returns the messages and whether a ``get_file_contents`` call is still
+    required (it is not when every issue's file was already retrieved).
+    *issue_files* is ``None`` when the analysis did not parse: nothing is
+    known about its issues, so the call is required.
+    """
+    required = issue_files is None or bool(issue_files - fetched_files(input_messages))
+    review = SYSTEM_PROMPT_REVIEW if required else SYSTEM_PROMPT_REVIEW + REVIEW_FILES_SEEN
+    return [
+        *input_messages,
+        {"role": "assistant", "content": analysis_text},
+        {"role": "developer", "content": review},
+    ], required
+
+
 from developerscope._types import MergeRequestAnalysis
 import json
-from openai import AsyncOpenAI
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
-client = AsyncOpenAI()
+# schema.json ships next to the package, not in whatever directory we run from.
+SCHEMA_PATH = Path(
+    os.environ.get(
+        "DEVELOPERSCOPE_SCHEMA", Path(__file__).resolve().parent.parent / "schema.json"
+    )
+)
 
-with open("schema.json") as file:
-    schemaMergeRequest = json.load(file)
 
+@lru_cache(maxsize=1)
+def get_client() -> "AsyncOpenAI":
+    """The shared OpenAI client, created (and ``openai`` imported) on first use."""
+    from openai import AsyncOpenAI
 
-async def _get_response(input_messages, tools, required_tool: bool | None):
+    # Retries are the scheduler's job – it also adapts concurrency to 429s.
+    return AsyncOpenAI(max_retries=0)
+
+
+@lru_cache(maxsize=1)
+def get_schema() -> dict:
+    with open(SCHEMA_PATH, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def __getattr__(name: str):
+    # ``gpt.client`` / ``gpt.schemaMergeRequest`` used to be module globals.
+    if name == "client":
+        return get_client()
+    if name == "schemaMergeRequest":
+        return get_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+from developerscope import profiling
+from developerscope.llm_cache import get_response_cache, request_key
+from developerscope.scheduler import estimate_tokens, get_scheduler
+from developerscope.usage import CommitUsage, usage_stats
+
+
+async def _get_response(
+    input_messages,
+    tools,
+    required_tool: bool | None,
+    priority: int = 0,
+    usage: CommitUsage | None = None,
+    cache_key: str | None = None,
+):
     if required_tool:
         tool_choice = "required"
     elif required_tool is None:
         tool_choice = "none"
     else:
         tool_choice = "auto"
-    return await client.responses.create(
+    request = dict(
         model="gpt-4.1",
         input=input_messages,
-        text={"format": schemaMergeRequest},
+        text={"format": get_schema()},
         temperature=0.2,
         tools=tools,
         tool_choice=tool_choice,
         parallel_tool_calls=False,
     )
+    if cache_key is not None:
+        # Routes every request of one commit to the same provider-side cache.
+        request["prompt_cache_key"] = cache_key
+
+    cache = get_response_cache()
+    key = request_key(request)
+    cached = cache.get(key)  # raises ReplayMiss in replay-only mode
+    if cached is not None:
+        from openai.types.responses import Response
+
+        profiling.count("llm.cache_hit")
+        return Response.model_construct(**cached)
+
+    client = get_client()
+    with profiling.span("llm.request", priority=priority) as sp:
+        response = await get_scheduler().submit(
+            lambda: client.responses.create(**request),
+            priority=priority,
+            tokens=estimate_tokens(input_messages) + estimate_tokens(tools),
+        )
+        if response.usage is not None:
+            details = response.usage.input_tokens_details
+            sp.set(
+                tokens_in=response.usage.input_tokens,
+                tokens_cached=(details and details.cached_tokens) or 0,
+                tokens_out=response.usage.output_tokens,
+            )
+            if usage is not None:
+                usage.add(response.usage)
+    cache.put(key, response.model_dump(mode="json"))
+    return response
 
 
 from developerscope.analyzer import get_current_state
@@ -146,21 +280,36 @@ from developerscope.analyzer import get_current_state
 
 def call_function(name, args, commit: git.Commit):
     if name == "get_file_contents":
-        return get_current_state(commit, args["files"])
-
-
-from developerscope._types import MergeRequestAnalysis
-import json
-from openai import AsyncOpenAI
-
-
-async def run_chat_with_functions(input_messages, tools, target_commit: git.Commit, required_tool=True):
+        # Free-form paths are checked against the tree index; unknown ones
+        # come back as "not found" instead of being read.
+        index = tree_index(commit)
+        extra = [p.strip().lstrip("/") for p in args.get("extra_files", [])]
+        rejected = [p for p in extra if p not in index]
+        result = get_current_state(commit, [*args["files"], *(p for p in extra if p in index)])
+        if rejected:
+            result += "\n\nNot in this commit: " + ", ".join(rejected)
+        return result
+
+
+async def run_chat_with_functions(
+    input_messages,
+    tools,
+    target_commit: git.Commit,
+    required_tool=True,
+    priority: int = 0,
+    usage: CommitUsage | None = None,
+):
     max_calls = 3
     for i in range(max_calls):
         if i == max_calls - 1:
             required_tool = None  # means forbidden
         response = await _get_response(
-            input_messages, tools, required_tool=required_tool if tools else False
+            input_messages,
+            tools,
+            required_tool=required_tool if tools else False,
+            priority=priority,
+            usage=usage,
+            cache_key=target_commit.hexsha,
         )
 
         if response.output[0].type == "message":
@@ -170,8 +319,9 @@ async def run_chat_with_functions(input_messages, tools, target_commit: git.Comm
             input_messages.append(dict(tool_call))
             name = tool_call.name
             args = json.loads(tool_call.arguments)
-            print(name, args)
-            result = call_function(name, args, target_commit)
+            profiling.count("llm.tool_calls")
+            with profiling.span("tool.call", tool=name):
+                result = call_function(name, args, target_commit)
             input_messages.append(
                 {
                     "type": "function_call_output",
@@ -184,12 +334,142 @@ async def run_chat_with_functions(input_messages, tools, target_commit: git.Comm
     return response.output[0].content[0]
 
 
-async def anylyze_commit(target_commit: git.Commit):
-    tools = [tool_get_file_contents(target_commit), ]
-    input_messages = get_input_messages_analyzer(target_commit)
-    response = await run_chat_with_functions(input_messages, tools, target_commit)
-    input_messages = get_review_input_messages(response)
-    response = await run_chat_with_functions(input_messages, tools, target_commit)
+import asyncio
+
+from developerscope.mapreduce import DEFAULT_SHARD_TOKENS, reduce_analyses
+from developerscope.diffbuilder import first_parent_patches
+from developerscope.triage import triage_commit
+
+
+# "auto": review only analyses that report HIGH or CRITICAL issues – the review
+# keeps nothing else, so for the rest its answer is known; "always": review
+# every commit; "never": return the analyse pass unreviewed. Unparsable
+# analyses are reviewed in every mode – the review repairs them.
+REVIEW_MODES = ("auto", "always", "never")
+_review_mode = os.environ.get("DEVELOPERSCOPE_REVIEW", "auto")
+if _review_mode not in REVIEW_MODES:
+    raise ValueError(
+        f"DEVELOPERSCOPE_REVIEW must be one of {', '.join(REVIEW_MODES)}, not {_review_mode!r}"
+    )
+DEFAULT_REVIEW_MODE = cast(Literal["auto", "always", "never"], _review_mode)
+REVIEW_LEVELS = ("HIGH", "CRITICAL")
+
+
+async def _analyse_shards(
+    target_commit: git.Commit,
+    prompts: list[tuple[str, int]],
+    tools,
+    priority: int,
+    usage: CommitUsage | None = None,
+) -> str:
+    """Run the SYSTEM_PROMPT pass on every shard at once and reduce the results.
+
+    Answers that are not JSON are not dropped: they follow the reduced analysis
+    as labelled text, so the result does not parse either and the review pass
+    repairs it – the same as an unparsable answer of an unsharded merge.
+    """
+    responses = await asyncio.gather(
+        *(
+            run_chat_with_functions(
+                get_input_messages_analyzer(target_commit, prompt),
+                tools,
+                target_commit,
+                priority=priority,
+                usage=usage,
+            )
+            for prompt, _ in prompts
+        )
+    )
+    parts, weights, unparsable = [], [], []
+    for i, (response, (_, weight)) in enumerate(zip(responses, prompts), start=1):
+        try:
+            parts.append(cast(MergeRequestAnalysis, json.loads(response.text)))
+        except ValueError:
+            unparsable.append(f"[shard {i}/{len(prompts)}, not valid JSON]\n{response.text}")
+            continue
+        weights.append(weight)
+    if not unparsable:
+        return json.dumps(reduce_analyses(parts, weights), ensure_ascii=False)
+    profiling.count("shards.unparsable", len(unparsable))
+    reduced = [json.dumps(reduce_analyses(parts, weights), ensure_ascii=False)] if parts else []
+    return "\n\n".join(reduced + unparsable)
+
+
+async def anylyze_commit(
+    target_commit: git.Commit,
+    priority: int = 0,
+    shard_tokens: int | None = DEFAULT_SHARD_TOKENS,
+    triage: bool = True,
+    review: Literal["auto", "always", "never"] = DEFAULT_REVIEW_MODE,
+):
+    """Analyse and review *target_commit*.
+
+    With *triage*, trivial merges (docs only, lock files, empty diff, comment
+    changes) are answered locally without any LLM call. Merges whose diff
+    exceeds *shard_tokens* are analysed shard by shard, concurrently, and the
+    shard results reduced before the review pass. *review* decides when the
+    review pass runs (see ``DEFAULT_REVIEW_MODE``); it continues the analyse
+    conversation so both passes share a cacheable prefix. Token usage and how
+    the review ran are recorded in ``usage_stats``.
+    """
+    # One first-parent diff for triage, the prompts and the tool's file list.
+    diffs = list(first_parent_patches(target_commit))
+    if triage:
+        with profiling.span("triage"):
+            analysis = triage_commit(target_commit, diffs)
+        if analysis is not None:
+            profiling.count("triage.skipped")
+            return analysis
+
+    usage = usage_stats.for_commit(target_commit.hexsha)
+    tools = [tool_get_file_contents(target_commit, diffs=diffs), ]
+    prompts = get_prompts_for_merge_commit(target_commit, shard_tokens, diffs=diffs)
+    if len(prompts) > 1:
+        conversation = None
+        text = await _analyse_shards(target_commit, prompts, tools, priority, usage)
+    else:
+        conversation = get_input_messages_analyzer(target_commit, prompts[0][0])
+        response = await run_chat_with_functions(
+            conversation, tools, target_commit, priority=priority, usage=usage
+        )
+        text = response.text
+
+    try:
+        analysis = cast(MergeRequestAnalysis, json.loads(text))
+    except ValueError:
+        analysis = None  # unparsable – let the review pass repair it
+    if analysis is not None:
+        serious = [i for i in analysis["issues"] if i["level"] in REVIEW_LEVELS]
+        if review == "never":
+            usage.review = "off"
+            return analysis
+        if review == "auto" and not serious:
+            # The review keeps only HIGH/CRITICAL issues, so here it could
+            # only have answered with an empty list.
+            skipped = conversation or get_review_input_messages(text)
+            usage.review = "skipped"
+            usage.skipped_tokens = estimate_tokens(skipped) + estimate_tokens(tools)
+            profiling.count("review.skipped")
+            return {**analysis, "issues": []}
+
+    if conversation is None:
+        # Sharded: there is no single conversation to continue.
+        input_messages, required_tool = get_review_input_messages(text), True
+    else:
+        issue_files = {i["filePath"] for i in serious} if analysis is not None else None
+        input_messages, required_tool = get_review_continuation(
+            conversation, text, issue_files
+        )
+    usage.review = "full" if required_tool else "short"
+    # The review pass goes ahead of new analyses so started commits finish first.
+    response = await run_chat_with_functions(
+        input_messages,
+        tools,
+        target_commit,
+        required_tool=required_tool,
+        priority=priority - 1,
+        usage=usage,
+    )
     try:
         return cast(MergeRequestAnalysis, json.loads(response.text))
     except Exception:
@@ -222,7 +502,7 @@ async def generate_summary(data: str) -> str:
         {"role": "system", "content": "Generate VERY SHORT (2-3 sentence summary) for this person"},
         {"role": "user", "content": data},
     ]
-    response = await client.responses.create(
+    response = await get_client().responses.create(
         model="gpt-4.1",
         input=input_messages,
     )
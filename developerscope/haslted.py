@@ -1,22 +1,152 @@
-from radon.metrics import h_visit  # Halstead
+import ast
+
 import git
+import radon
 
+from developerscope import profiling
+from developerscope._types import CommitMetrics, FileHalstead, HalsteadBreakdown
+from developerscope.cache import get_metric_cache
+from developerscope.catfile import list_tree, read_blob
 
-def _is_python(path: str) -> bool:
-    return path.endswith(".py")
+# Bump the prefix whenever the way a blob is scored changes – it invalidates
+# every cached value for this metric.
+HALSTEAD_VERSION = f"1/radon-{radon.__version__}"
+COMPLEXITY_VERSION = f"1/radon-{radon.__version__}"
 
-def _halstead_effort_for_blob(blob: git.Blob) -> float:
-    """Compute Halstead *effort* for a *single* blob – non‑blocking."""
-    if not _is_python(blob.path):
-        return 0.0
-    code = blob.data_stream.read().decode("utf-8", errors="replace")
+
+def _is_python(path: str | None) -> bool:
+    return path is not None and path.endswith(".py")
+
+
+def score_source(code: str) -> tuple[float, int]:
+    """Return ``(Halstead effort, cyclomatic complexity)`` for Python source.
+
+    The source is parsed once and both radon visitors walk the same AST.
+    Unparsable source scores ``(0.0, 0)``.
+    """
     if not code.strip():
-        return 0.0
+        return 0.0, 0
+    # radon is imported on first use
+    from radon.metrics import h_visit_ast
+    from radon.visitors import ComplexityVisitor
+
+    try:
+        tree = ast.parse(code)
+    except Exception:
+        return 0.0, 0
+    try:
+        h = h_visit_ast(tree)
+        effort = float(getattr(getattr(h, "total", h), "effort", 0.0))
+    except Exception:
+        effort = 0.0
     try:
-        h = h_visit(code).total if hasattr(h_visit(code), "total") else h_visit(code)
-        return float(getattr(h, "effort", 0.0))
+        complexity = int(ComplexityVisitor.from_ast(tree).total_complexity)
     except Exception:
+        complexity = 0
+    return effort, complexity
+
+
+def _halstead_effort_for_source(code: str) -> float:
+    """Compute Halstead *effort* for Python source – parses it exactly once."""
+    return score_source(code)[0]
+
+
+def cached_scores(hexsha: str) -> tuple[float, int] | None:
+    """Both cached scores of a blob, or ``None`` unless both are cached."""
+    cache = get_metric_cache()
+    effort = cache.get(hexsha, "halstead", HALSTEAD_VERSION)
+    if effort is None:
+        return None
+    complexity = cache.get(hexsha, "cyclomatic", COMPLEXITY_VERSION)
+    if complexity is None:
+        return None
+    return effort, complexity
+
+
+def store_scores(hexsha: str, scores: tuple[float, int]) -> None:
+    cache = get_metric_cache()
+    cache.put(hexsha, "halstead", HALSTEAD_VERSION, scores[0])
+    cache.put(hexsha, "cyclomatic", COMPLEXITY_VERSION, scores[1])
+
+
+def _scores_for_blob(repo: git.Repo, hexsha: str | None) -> tuple[float, int]:
+    """Halstead effort and cyclomatic complexity of a *single* Python blob."""
+    if hexsha is None:
+        return 0.0, 0
+
+    profiling.count("halstead.blobs")
+    scores = cached_scores(hexsha)
+    if scores is None:
+        profiling.count("halstead.computed")
+        code = read_blob(repo, hexsha).decode("utf-8", errors="replace")
+        scores = score_source(code)
+        store_scores(hexsha, scores)
+    return scores
+
+
+def _halstead_effort_for_blob(
+    repo: git.Repo, path: str | None, hexsha: str | None
+) -> float:
+    """Compute Halstead *effort* for a *single* blob – non‑blocking."""
+    if not _is_python(path):
         return 0.0
+    return _scores_for_blob(repo, hexsha)[0]
+
+
+def python_blob_pairs(commit: git.Commit) -> list[tuple[str, str | None, str | None]]:
+    """``(path, old blob, new blob)`` for every Python file *commit* changed."""
+    pairs = []
+    for diff in _first_parent_diff(commit):
+        a = diff.a_blob.hexsha if diff.a_blob and _is_python(diff.a_path) else None
+        b = diff.b_blob.hexsha if diff.b_blob and _is_python(diff.b_path) else None
+        if a or b:
+            pairs.append((diff.b_path or diff.a_path, a, b))
+    return pairs
+
+
+def _first_parent_diff(commit: git.Commit) -> git.DiffIndex:
+    """Return the parent→*commit* diff (no patches, only changed paths)."""
+    if commit.parents:
+        return commit.parents[0].diff(commit)
+    # Root commit: everything is an addition.
+    return commit.diff(git.NULL_TREE, R=True)
+
+
+def halstead_breakdown(commit: git.Commit) -> HalsteadBreakdown:
+    """Return per-file Halstead effort for the Python files *commit* changed.
+
+    Only the paths touched by the first-parent diff are looked at; each old and
+    new blob is read and parsed once.
+    """
+    with profiling.span("halstead.breakdown") as sp:
+        result = _halstead_breakdown(commit)
+        sp.set(files=len(result["files"]))
+    return result
+
+
+def _halstead_breakdown(commit: git.Commit) -> HalsteadBreakdown:
+    files: list[FileHalstead] = []
+    total = 0.0
+    for diff in _first_parent_diff(commit):
+        if not (_is_python(diff.a_path) or _is_python(diff.b_path)):
+            continue
+        before = _halstead_effort_for_blob(
+            commit.repo, diff.a_path, diff.a_blob and diff.a_blob.hexsha
+        )
+        after = _halstead_effort_for_blob(
+            commit.repo, diff.b_path, diff.b_blob and diff.b_blob.hexsha
+        )
+        total += after - before
+        files.append(
+            {
+                "path": diff.b_path or diff.a_path,
+                "before": round(before, 2),
+                "after": round(after, 2),
+                "delta": round(after - before, 2),
+            }
+        )
+
+    return {"total": round(total, 2), "files": files}
 
 
 def halstead_effort(commit: git.Commit, *, changed_only: bool = True) -> float:
@@ -25,14 +155,27 @@ def halstead_effort(commit: git.Commit, *, changed_only: bool = True) -> float:
     If *changed_only* is True we look at the diff – cheaper and more relevant –
     otherwise we walk the whole tree.
     """
+    if changed_only:
+        return halstead_breakdown(commit)["total"]
+
     total = 0.0
-    for blob in commit.tree.traverse():
-        if blob.type == "blob":
-            total += _halstead_effort_for_blob(blob)
+    for entry in list_tree(commit.repo, commit.hexsha):
+        total += _halstead_effort_for_blob(commit.repo, entry.path, entry.hexsha)
+    return round(total, 2)
 
-    if changed_only:
-        parent = commit.parents[0]
-        for blob in parent.tree.traverse():
-            if blob:
-                total -= _halstead_effort_for_blob(blob)
-    return round(total, 2)
\ No newline at end of file
+
+def get_metrics(commit: git.Commit) -> CommitMetrics:
+    """Halstead effort and cyclomatic complexity deltas of *commit*'s Python files.
+
+    Synchronous; async callers should use
+    :func:`developerscope.metrics.get_metrics_async`, which scores the blobs in
+    worker processes.
+    """
+    effort = 0.0
+    complexity = 0
+    for _, before, after in python_blob_pairs(commit):
+        old = _scores_for_blob(commit.repo, before)
+        new = _scores_for_blob(commit.repo, after)
+        effort += new[0] - old[0]
+        complexity += new[1] - old[1]
+    return {"halstedEffort": round(effort, 2), "cyclomaticComplexity": complexity}
@@ -0,0 +1,169 @@
+"""Deterministic on-disk cache of LLM responses.
+
+A request is keyed by a hash of everything that determines its answer – the
+normalised input messages, tool definitions, response schema, model,
+temperature and tool choice – so re-analysing a commit after a crash, a report
+tweak or on a mirror clone costs nothing. Entries are zlib-compressed JSON
+files, expired by age and evicted least-recently-used once the cache grows past
+``max_bytes``.
+
+In *replay only* mode a miss raises :class:`ReplayMiss` instead of reaching the
+network, so outputs and benchmarks can be regenerated offline.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+from developerscope.cache import DEFAULT_CACHE_DIR
+
+DEFAULT_TTL = 90 * 24 * 3600
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+# Per-response identifiers that differ between otherwise identical requests.
+_VOLATILE_KEYS = {"id", "status"}
+
+
+class ReplayMiss(LookupError):
+    pass
+
+
+def _normalise(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, dict):
+        volatile = _VOLATILE_KEYS if value.get("type") == "function_call" else set()
+        return {
+            str(k): _normalise(v)
+            for k, v in value.items()
+            if k not in volatile and v is not None
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    if isinstance(value, str):
+        return "\n".join(line.rstrip() for line in value.replace("\r\n", "\n").split("\n"))
+    return value
+
+
+def request_key(request: dict[str, Any]) -> str:
+    """Return the cache key of a ``responses.create`` keyword-argument dict."""
+    canonical = json.dumps(_normalise(request), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        replay_only: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.z"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if time.time() - stat.st_mtime > self.ttl:
+                self._remove(path, stat.st_size)
+                raise FileNotFoundError(path)
+            payload = json.loads(zlib.decompress(path.read_bytes()))
+        except (FileNotFoundError, zlib.error, ValueError):
+            self.misses += 1
+            if self.replay_only:
+                raise ReplayMiss(f"No cached LLM response for {key}")
+            return None
+        os.utime(path)  # mtime doubles as the LRU clock
+        self.hits += 1
+        return payload
+
+    def put(self, key: str, payload: dict[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = zlib.compress(json.dumps(payload, ensure_ascii=False).encode(), 6)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(p.stat().st_size for p in self.directory.glob("*/*.json.z"))
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: Path, size: int) -> None:
+        path.unlink(missing_ok=True)
+        self.evictions += 1
+        if self._size is not None:
+            self._size -= size
+
+    def _evict(self) -> None:
+        entries = sorted(
+            ((p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob("*/*.json.z")),
+            key=lambda e: e[0],
+        )
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if self._size is None or self._size <= target:
+                break
+            self._remove(path, size)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class _NullResponseCache(ResponseCache):
+    def __init__(self) -> None:
+        super().__init__(DEFAULT_CACHE_DIR / "responses")
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        self.misses += 1
+        return None
+
+    def put(self, key: str, payload: dict[str, Any]) -> None:
+        pass
+
+
+_default_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache.
+
+    ``DEVELOPERSCOPE_LLM_CACHE=0`` disables it, ``DEVELOPERSCOPE_LLM_REPLAY=1``
+    turns on replay-only mode.
+    """
+    global _default_cache
+    if _default_cache is None:
+        if os.environ.get("DEVELOPERSCOPE_LLM_CACHE", "1") == "0":
+            _default_cache = _NullResponseCache()
+        else:
+            _default_cache = ResponseCache(
+                DEFAULT_CACHE_DIR / "responses",
+                replay_only=os.environ.get("DEVELOPERSCOPE_LLM_REPLAY", "0") == "1",
+            )
+    return _default_cache
+
+
+def set_response_cache(cache: ResponseCache | None) -> None:
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,121 @@
+"""Splitting oversized merges into shards and merging the shard analyses.
+
+A merge whose diff is larger than ``shard_tokens`` is cut into file groups –
+files of the same directory stay together – that are analysed concurrently;
+:func:`reduce_analyses` folds the per-shard ``MergeRequestAnalysis`` objects
+back into one.
+"""
+
+import math
+import os
+from collections import Counter
+from typing import Sequence
+
+import git
+
+from developerscope._types import (
+    EffortEnum,
+    MergeRequestAnalysis,
+    MergeRequestEnum,
+    PottentialIssue,
+)
+from developerscope.diffbuilder import diff_path, estimate_tokens, patch_text
+
+DEFAULT_SHARD_TOKENS = int(os.environ.get("DEVELOPERSCOPE_SHARD_TOKENS", 30_000))
+
+EFFORT_ORDER: list[EffortEnum] = ["Trivial", "Minor", "Moderate", "Large", "Major"]
+
+# Tie-breaker for the dominant type: the riskier classification wins.
+TYPE_PRECEDENCE: list[MergeRequestEnum] = [
+    "Security‐patch",
+    "Bug‑fix",
+    "Feature",
+    "Performance",
+    "Refactor",
+    "Chore / dependency bump",
+    "Docs / comments",
+]
+
+
+def shard_diffs(diffs: Sequence[git.Diff], shard_tokens: int) -> list[list[git.Diff]]:
+    """Pack *diffs* into groups of roughly *shard_tokens*, directory by directory.
+
+    Files are sized the way :func:`~developerscope.diffbuilder.build_diff`
+    counts them. Generated and binary files, which it omits, cost nothing: they
+    ride along in the first group, so they never cause a split of their own.
+    """
+    omitted: list[git.Diff] = []
+    tokens: dict[int, int] = {}
+    by_dir: dict[str, list[git.Diff]] = {}
+    for diff in sorted(diffs, key=diff_path):
+        patch = patch_text(diff)
+        if patch is None:
+            omitted.append(diff)
+            continue
+        tokens[id(diff)] = estimate_tokens(patch) + 1
+        by_dir.setdefault(os.path.dirname(diff_path(diff)), []).append(diff)
+
+    shards: list[list[git.Diff]] = []
+    current: list[git.Diff] = []
+    size = 0
+    for group in by_dir.values():
+        group_size = sum(tokens[id(d)] for d in group)
+        # Keep a directory whole when it fits; otherwise split it file by file.
+        items = [group] if group_size <= shard_tokens else [[d] for d in group]
+        for item in items:
+            item_size = sum(tokens[id(d)] for d in item)
+            if current and size + item_size > shard_tokens:
+                shards.append(current)
+                current, size = [], 0
+            current.extend(item)
+            size += item_size
+    if current:
+        shards.append(current)
+    if omitted:
+        shards[:1] = [omitted + (shards[0] if shards else [])]
+    return shards
+
+
+def _effort(points: float) -> EffortEnum:
+    return EFFORT_ORDER[min(len(EFFORT_ORDER) - 1, int(math.log2(max(points, 1))))]
+
+
+def reduce_analyses(
+    parts: Sequence[MergeRequestAnalysis], weights: Sequence[int] | None = None
+) -> MergeRequestAnalysis:
+    """Fold shard analyses into one.
+
+    * ``issues`` – concatenated, duplicates (same file, line and text) removed;
+    * ``type`` – the type with the largest total shard weight (diff size);
+    * ``effortEstimate`` – efforts add up on a doubling scale (Trivial = 1,
+      Minor = 2, … Major = 16), so two Moderate shards make a Large merge.
+    """
+    if not parts:
+        raise ValueError("Nothing to reduce")
+    weights = list(weights) if weights is not None else [1] * len(parts)
+
+    issues: list[PottentialIssue] = []
+    seen: set[tuple[str, str, str]] = set()
+    votes: Counter[MergeRequestEnum] = Counter()
+    points = 0.0
+    reasoning = []
+    for i, (part, weight) in enumerate(zip(parts, weights), start=1):
+        for issue in part.get("issues", []):
+            key = (issue["filePath"], issue["line"], issue["issue"])
+            if key not in seen:
+                seen.add(key)
+                issues.append(issue)
+        votes[part["type"]] += weight
+        points += 2 ** EFFORT_ORDER.index(part["effortEstimate"])
+        reasoning.append(f"[shard {i}/{len(parts)}] {part.get('hiddenReasoning', '')}")
+
+    dominant = max(
+        votes,
+        key=lambda t: (votes[t], -TYPE_PRECEDENCE.index(t) if t in TYPE_PRECEDENCE else -99),
+    )
+    return {
+        "hiddenReasoning": "\n".join(reasoning),
+        "type": dominant,
+        "issues": issues,
+        "effortEstimate": _effort(points),
+    }
@@ -0,0 +1,178 @@
+"""Commit metrics scored in worker processes, awaitable from the event loop.
+
+Radon parses every changed Python blob, which is CPU-bound: run inline it
+blocks all LLM coroutines and keeps one core busy. :class:`MetricsService`
+looks blobs up in the metric cache on the loop and ships only the misses to a
+``ProcessPoolExecutor``, many blob hashes per task. Workers read the blobs
+through their own ``git cat-file --batch`` pool, so only hashes and scores
+cross the process boundary.
+
+    metrics = await get_metrics_async(commit)
+    by_commit = await get_metrics_service().score_commits(commits)
+
+``DEVELOPERSCOPE_METRICS_WORKERS`` sets the pool size (``0`` scores inline on a
+thread instead), ``DEVELOPERSCOPE_METRICS_BATCH`` the blobs per task.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import git
+
+from developerscope import profiling
+from developerscope._types import CommitMetrics
+from developerscope.catfile import get_pool
+from developerscope.haslted import cached_scores, python_blob_pairs, score_source, store_scores
+
+DEFAULT_WORKERS = int(os.environ.get("DEVELOPERSCOPE_METRICS_WORKERS", os.cpu_count() or 1))
+DEFAULT_BATCH_SIZE = int(os.environ.get("DEVELOPERSCOPE_METRICS_BATCH", 64))
+
+
+def _init_worker() -> None:
+    # Pay for the radon import once per worker, not in the first task.
+    score_source("x = 1\n")
+
+
+def _score_blobs(git_dir: str, hexshas: list[str]) -> list[tuple[float, int]]:
+    """Worker task: read *hexshas* in one cat-file round trip and score them."""
+    with get_pool(git_dir).reader() as reader:
+        return [
+            score_source(data.decode("utf-8", errors="replace"))
+            for data in reader.read_blobs(hexshas)
+        ]
+
+
+def _blob_pairs(git_dir: str, hexshas: list[str]) -> list[list[tuple[str, str | None, str | None]]]:
+    """Thread task: :func:`python_blob_pairs` of the commits *hexshas*.
+
+    It opens its own Repo: the caller's object pipes are shared with the rest
+    of the pipeline and are not thread-safe.
+    """
+    repo = git.Repo(git_dir)
+    try:
+        return [python_blob_pairs(repo.commit(hexsha)) for hexsha in hexshas]
+    finally:
+        repo.close()
+
+
+class MetricsService:
+    """Scores commits' Python blobs in a process pool; see the module docstring."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.tasks = 0
+        self.blobs_scored = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers <= 0:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            else:
+                # Not fork: the parent has cat-file pipes, SQLite handles and
+                # HTTP client threads that a forked child must not inherit.
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=context, initializer=_init_worker
+                )
+        return self._executor
+
+    async def score_blobs(
+        self, repo: git.Repo, hexshas: set[str]
+    ) -> dict[str, tuple[float, int]]:
+        """Scores of the Python blobs *hexshas*; misses are computed in the pool."""
+        scores: dict[str, tuple[float, int]] = {}
+        missing: list[str] = []
+        for hexsha in hexshas:
+            cached = cached_scores(hexsha)
+            if cached is None:
+                missing.append(hexsha)
+            else:
+                scores[hexsha] = cached
+        profiling.count("halstead.blobs", len(hexshas))
+        if not missing:
+            return scores
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        git_dir = str(repo.git_dir)
+        batches = [
+            missing[start : start + self.batch_size]
+            for start in range(0, len(missing), self.batch_size)
+        ]
+        with profiling.span("metrics.pool", blobs=len(missing), tasks=len(batches)):
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, _score_blobs, git_dir, b) for b in batches)
+            )
+        for batch, batch_scores in zip(batches, results):
+            for hexsha, blob_scores in zip(batch, batch_scores):
+                scores[hexsha] = blob_scores
+                store_scores(hexsha, blob_scores)
+        self.tasks += len(batches)
+        self.blobs_scored += len(missing)
+        profiling.count("halstead.computed", len(missing))
+        return scores
+
+    async def score_commits(self, commits: list[git.Commit]) -> dict[str, CommitMetrics]:
+        """``{commit sha: CommitMetrics}``, batching blobs across all *commits*."""
+        if not commits:
+            return {}
+        # Listing the changed paths is one git diff-tree per commit; it runs on
+        # a thread so the LLM coroutines keep going meanwhile.
+        repo = commits[0].repo
+        pairs = await asyncio.get_running_loop().run_in_executor(
+            None, _blob_pairs, str(repo.git_dir), [c.hexsha for c in commits]
+        )
+        blobs = {sha for commit_pairs in pairs for _, *shas in commit_pairs for sha in shas if sha}
+        scores = await self.score_blobs(repo, blobs)
+
+        metrics: dict[str, CommitMetrics] = {}
+        for commit, commit_pairs in zip(commits, pairs):
+            effort, complexity = 0.0, 0
+            for _, before, after in commit_pairs:
+                old = scores[before] if before else (0.0, 0)
+                new = scores[after] if after else (0.0, 0)
+                effort += new[0] - old[0]
+                complexity += new[1] - old[1]
+            metrics[commit.hexsha] = {
+                "halstedEffort": round(effort, 2),
+                "cyclomaticComplexity": complexity,
+            }
+        return metrics
+
+    async def commit_metrics(self, commit: git.Commit) -> CommitMetrics:
+        return (await self.score_commits([commit]))[commit.hexsha]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_service: MetricsService | None = None
+
+
+def get_metrics_service() -> MetricsService:
+    global _service
+    if _service is None:
+        _service = MetricsService()
+    return _service
+
+
+def set_metrics_service(service: MetricsService | None) -> None:
+    """Replace the process-wide service, closing the previous one's workers."""
+    global _service
+    if _service is not None and _service is not service:
+        _service.close()
+    _service = service
+
+
+async def get_metrics_async(commit: git.Commit) -> CommitMetrics:
+    """Awaitable :func:`developerscope.haslted.get_metrics`."""
+    return await get_metrics_service().commit_metrics(commit)
@@ -0,0 +1,385 @@
+"""The pipeline over many repositories at once.
+
+A manifest (JSON, :class:`~developerscope._types.Manifest`) lists local clones:
+
+    {
+        "out": "out",
+        "repos": [
+            {"url": "https://github.com/org/api", "path": "../api"},
+            {"url": "https://github.com/org/web", "path": "../web"}
+        ]
+    }
+
+Every repository keeps the single-repository layout – ``<out>/<name>.json``,
+``.sqlite``, ``.results.ndjson`` and ``<out>/<name>/`` – so its state and
+outputs stay isolated and ``python -m developerscope <command> <url>`` keeps
+working on it. Only the machinery is shared:
+
+* discovery runs in one process pool, a repository per task;
+* metrics are scored in the process-wide :class:`~developerscope.metrics.MetricsService`
+  pool, the blobs of all repositories at once;
+* every LLM call goes through the process-wide
+  :class:`~developerscope.scheduler.LLMScheduler` – one concurrency limit and
+  one RPM/TPM budget – and a single work queue takes the most valuable merges
+  of all repositories first, under one token/time :class:`~developerscope.workqueue.Budget`.
+
+Heavy modules (git, radon, openai) are imported on first use, so importing
+this module stays cheap for the CLI.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Literal
+
+from developerscope._types import Manifest
+
+if TYPE_CHECKING:
+    import git
+
+    from developerscope.state import StateStore
+    from developerscope.workqueue import Budget, MergeSignals
+
+DEFAULT_DISCOVERY_WORKERS = int(os.environ.get("DEVELOPERSCOPE_DISCOVERY_WORKERS", 4))
+
+
+def repo_name(url: str) -> str:
+    return url.rstrip("/").split("/")[-1].removesuffix(".git")
+
+
+@dataclass
+class RepoSpec:
+    """Where one repository's checkout and state live."""
+
+    url: str
+    # local checkout; default: a sibling of the working directory, see `repo`
+    checkout: Path | None = None
+    out: Path = Path("out")
+    # file name stem of the state; default: the last URL segment
+    name: str = ""
+
+    def __post_init__(self):
+        self.name = self.name or repo_name(self.url)
+        self.out = Path(self.out)
+
+    @property
+    def repo(self) -> Path:
+        return Path(self.checkout) if self.checkout else Path.cwd().parent / self.name
+
+    @property
+    def stats(self) -> Path:
+        return self.out / f"{self.name}.json"
+
+    @property
+    def store(self) -> Path:
+        return self.stats.with_suffix(".sqlite")
+
+    @property
+    def author_dir(self) -> Path:
+        return self.stats.with_suffix("")
+
+    @property
+    def reports(self) -> Path:
+        return self.out / f"{self.name}-reports"
+
+
+def load_manifest(path: str | Path, out: str | Path | None = None) -> list[RepoSpec]:
+    """Read a manifest; relative paths are relative to the manifest's directory.
+
+    *out* overrides the manifest's ``out`` (default ``out``). Raises
+    ``ValueError`` when two repositories would share a state name.
+    """
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        manifest: Manifest = json.load(f)
+    base = path.parent
+    out_dir = Path(out) if out is not None else base / manifest.get("out", "out")
+
+    specs: list[RepoSpec] = []
+    seen: set[str] = set()
+    for entry in manifest["repos"]:
+        name = entry.get("name") or repo_name(entry["url"])
+        spec = RepoSpec(
+            url=entry["url"],
+            # like the CLI: clones sit next to the directory holding the manifest
+            checkout=base / entry.get("path", f"../{name}"),
+            out=out_dir,
+            name=name,
+        )
+        if spec.name in seen:
+            raise ValueError(f"{path}: two repositories named {spec.name!r}; set a distinct 'name'")
+        seen.add(spec.name)
+        specs.append(spec)
+    return specs
+
+
+def open_store(spec: RepoSpec) -> "StateStore":
+    """The repository's state store, refreshed from ``<out>/<name>.json``."""
+    from developerscope.state import StateStore
+
+    if not spec.stats.exists() and not spec.store.exists():
+        raise FileNotFoundError(f"No state for {spec.url} in {spec.out}; run `discover` first.")
+    store = StateStore(spec.store)
+    if spec.stats.exists():
+        store.import_json(spec.stats)
+    return store
+
+
+def discover_repo(spec: RepoSpec, full: bool = False) -> tuple[int, bool, dict[str, int]]:
+    """Discover *spec*'s merges, incrementally after the first run unless *full*.
+
+    Returns the number of new merges, whether the run was incremental and the
+    merge count per status.
+    """
+    from developerscope.state import StateStore
+    from developerscope.stats import extract_repo_commit_stats
+
+    if not spec.repo.exists():
+        raise FileNotFoundError(f"Expected a checkout of {spec.url} at {spec.repo}")
+    spec.out.mkdir(parents=True, exist_ok=True)
+
+    # The store has the freshest statuses; the JSON is the fallback.
+    store = StateStore(spec.store)
+    try:
+        if spec.stats.exists():
+            store.import_json(spec.stats)
+        stats = store.repo_stats()
+        if not stats["url"]:
+            stats["url"], stats["status"] = spec.url, "NEW"
+
+        incremental = "watermarks" in stats and not full
+        added = extract_repo_commit_stats(stats, spec.repo, incremental)
+        with open(spec.stats, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=4, ensure_ascii=False)
+        store.import_json(spec.stats)
+        return added, incremental, store.counts()
+    finally:
+        store.close()
+
+
+async def analyse_merge(
+    store: "StateStore",
+    repo: "git.Repo",
+    signals: "MergeSignals",
+    rank: int,
+    *,
+    triage: bool = True,
+    review: Literal["auto", "always", "never"] = "auto",
+) -> bool:
+    """Claim, analyse and complete one NEW merge; False if it was not analysed.
+
+    *rank* is its place in the work queue and becomes the LLM request priority.
+    A merge whose patch-id already has an analysis reuses it without the LLM,
+    and NEW merges sharing its patch-id are completed with its analysis too.
+    """
+    from developerscope import profiling
+    from developerscope.gpt import anylyze_commit
+    from developerscope.metrics import get_metrics_async
+    from developerscope.patchid import record_reuse
+
+    # NEW -> PENDING; skip commits another worker already took
+    if not store.claim(signals.commit_hash):
+        return False
+    commit = repo.commit(signals.commit_hash)
+    try:
+        # Scored in worker processes; the prompt then reads the metric cache.
+        metrics = await get_metrics_async(commit)
+        # e.g. a backport of a merge analysed in an earlier run
+        source = store.analysis_by_patch(signals.patch_id)
+        if source is not None:
+            analysis = source
+            record_reuse(source, source["commitHash"])
+        else:
+            with profiling.span("analyse"):
+                analysis = await anylyze_commit(
+                    commit, priority=rank, triage=triage, review=review
+                )
+    except Exception as e:
+        print(f"{commit.hexsha[:12]}: {e}", file=sys.stderr)
+        store.release(commit.hexsha)
+        return False
+    if not isinstance(analysis, dict):
+        print(f"{commit.hexsha[:12]}: unparsable analysis", file=sys.stderr)
+        store.release(commit.hexsha)
+        return False
+    store.complete(
+        {
+            **analysis,
+            "commitHash": commit.hexsha,
+            "metrics": metrics,
+            "committedAt": commit.committed_date,
+        }
+    )
+
+    for twin in store.twins(commit.hexsha):
+        if not store.claim(twin.commit_hash):
+            continue
+        twin_commit = repo.commit(twin.commit_hash)
+        try:
+            # Same patch, but the blobs around it may differ per branch.
+            twin_metrics = await get_metrics_async(twin_commit)
+        except Exception as e:
+            print(f"{twin.commit_hash[:12]}: {e}", file=sys.stderr)
+            store.release(twin.commit_hash)
+            continue
+        store.complete(
+            {
+                **analysis,
+                "commitHash": twin.commit_hash,
+                "metrics": twin_metrics,
+                "committedAt": twin_commit.committed_date,
+            }
+        )
+        record_reuse(analysis, commit.hexsha)
+    return True
+
+
+@dataclass
+class RepoResult:
+    spec: RepoSpec
+    new: int = 0
+    # NEW merges when the queue was planned, and how many of them got analysed
+    planned: int = 0
+    analysed: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+    # why the repository dropped out of the run; "" if it did not
+    error: str = ""
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # Not fork, for the same reasons as the metrics pool.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def discover_all(
+    specs: list[RepoSpec], full: bool = False, workers: int | None = None
+) -> list[RepoResult]:
+    """Discover every repository, up to *workers* at a time in a process pool."""
+    results = [RepoResult(spec) for spec in specs]
+    if not specs:
+        return results
+    workers = workers or DEFAULT_DISCOVERY_WORKERS
+    with _pool(max(1, min(workers, len(specs)))) as pool:
+        futures = [pool.submit(discover_repo, spec, full) for spec in specs]
+        for result, future in zip(results, futures):
+            try:
+                result.new, _, result.counts = future.result()
+            except Exception as e:
+                result.error = f"discovery failed: {e}"
+    return results
+
+
+async def _run(
+    results: list[RepoResult],
+    analyse: bool,
+    budget: "Budget | None",
+    fair_share: bool,
+    concurrency: int,
+    triage: bool,
+    review: Literal["auto", "always", "never"],
+    on_merge: "Callable[[MergeSignals, bool], None] | None",
+) -> None:
+    import git
+
+    from developerscope.workqueue import collect_signals, drain, merge_plans, plan
+
+    live: dict[str, tuple[RepoResult, "StateStore", git.Repo]] = {}
+    for result in results:
+        if result.error:
+            continue
+        try:
+            store = open_store(result.spec)
+            store.reset_pending()  # commits left PENDING by a crashed run
+            live[result.spec.name] = (result, store, git.Repo(result.spec.repo))
+        except Exception as e:
+            result.error = f"cannot open state: {e}"
+
+    # Every repository's blobs go to the one metrics pool together.
+    collected = await asyncio.gather(
+        *(collect_signals(store, repo) for _, store, repo in live.values()),
+        return_exceptions=True,
+    )
+    plans = []
+    for (name, (result, store, _)), signals in zip(list(live.items()), collected):
+        if isinstance(signals, BaseException):
+            result.error = f"metrics failed: {signals}"
+            del live[name]
+            continue
+        for s in signals:
+            s.repo = name
+        result.planned = len(signals)
+        done = {author: n for author, (_, n) in store.author_counts().items()}
+        plans.append(plan(signals, fair_share=fair_share, done=done))
+
+    if analyse:
+        async def process(signals: "MergeSignals", rank: int) -> bool:
+            result, store, repo = live[signals.repo]
+            ok = await analyse_merge(store, repo, signals, rank, triage=triage, review=review)
+            result.analysed += ok
+            if on_merge is not None:
+                on_merge(signals, ok)
+            return ok
+
+        try:
+            await drain(merge_plans(plans), process, concurrency=concurrency, budget=budget)
+        finally:
+            for result, store, _ in live.values():
+                store.export_json(result.spec.stats)
+
+    for result, store, _ in live.values():
+        result.counts = store.counts()
+        store.close()
+
+
+def run_manifest(
+    specs: list[RepoSpec],
+    *,
+    full: bool = False,
+    analyse: bool = False,
+    report: bool = False,
+    budget: "Budget | None" = None,
+    fair_share: bool = False,
+    concurrency: int = 20,
+    triage: bool = True,
+    review: Literal["auto", "always", "never"] = "auto",
+    discovery_workers: int | None = None,
+    on_merge: "Callable[[MergeSignals, bool], None] | None" = None,
+) -> list[RepoResult]:
+    """Discover and score every repository; with *analyse*, run the LLM stage
+    over all of them through one queue, and with *report* render their reports.
+
+    A repository that fails drops out with its ``error`` set; the others go on.
+    *on_merge* is called with each merge the LLM stage took and whether it was
+    analysed.
+    """
+    from developerscope.metrics import set_metrics_service
+
+    results = discover_all(specs, full, discovery_workers)
+    try:
+        asyncio.run(
+            _run(results, analyse, budget, fair_share, concurrency, triage, review, on_merge)
+        )
+    finally:
+        set_metrics_service(None)
+
+    if report:
+        from report_generator import generate_dashboard, generate_reports
+
+        for result in results:
+            if result.error:
+                continue
+            spec = result.spec
+            store = open_store(spec)
+            try:
+                generate_reports(str(spec.author_dir), spec.url, str(spec.reports))
+                generate_dashboard(store.rollups(), spec.url, str(spec.reports))
+            finally:
+                store.close()
+    return results
@@ -0,0 +1,98 @@
+"""Patch-ID fingerprints, so identical merges share one analysis.
+
+A release backport or a cherry-pick lands the same change on another branch as
+a separate merge whose first-parent patch is identical. ``git patch-id
+--stable`` hashes a patch ignoring whitespace and line numbers, so such merges
+get the same fingerprint. Discovery stores it per merge
+(``CommitStatus.patchId``, ``""`` for an empty diff); the analyse stage sends
+one merge per fingerprint to the LLM and fans its analysis out to the others,
+counting what that saved in ``dedup_stats``.
+
+Ids are only comparable when computed the same way: stats carry the
+``PATCH_ID_VERSION`` they were made with, and ids of another version are
+dropped and computed again.
+"""
+
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+
+from developerscope import profiling
+from developerscope._types import MergeRequestAnalysis
+from developerscope.usage import usage_stats
+
+# Bumped whenever patch_ids() changes what it hashes. 2: version 1 hashed the
+# second-parent patch of a merge, not the first-parent one.
+PATCH_ID_VERSION = 2
+
+
+def patch_ids(git_dir: str | os.PathLike[str], hexshas: Iterable[str]) -> dict[str, str]:
+    """``{sha: patch id}`` of each commit's first-parent patch.
+
+    One ``git diff-tree --stdin -p | git patch-id --stable`` pipeline answers
+    for every commit. Commits with an empty patch are missing from the result.
+    """
+    hexshas = list(hexshas)
+    if not hexshas:
+        return {}
+    with profiling.span("discover.patch_ids", commits=len(hexshas)):
+        diff = subprocess.Popen(
+            # not `-m --first-parent`: with --stdin that diffs merges against every parent
+            ["git", f"--git-dir={git_dir}", "diff-tree", "--stdin", "-p",
+             "--diff-merges=first-parent", "--root", "--no-renames"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        patch_id = subprocess.Popen(
+            ["git", f"--git-dir={git_dir}", "patch-id", "--stable"],
+            stdin=diff.stdout,
+            stdout=subprocess.PIPE,
+        )
+        diff.stdout.close()  # type: ignore[union-attr]
+
+        def feed() -> None:
+            # From a thread: diff-tree stops reading its input while its
+            # output waits for patch-id, whose output waits for us.
+            with diff.stdin:  # type: ignore[union-attr]
+                diff.stdin.write("".join(f"{sha}\n" for sha in hexshas).encode())  # type: ignore[union-attr]
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        output = patch_id.communicate()[0]
+        feeder.join()
+        diff.wait()
+
+    ids = {}
+    for line in output.decode().splitlines():
+        pid, sha = line.split()
+        ids[sha] = pid
+    return ids
+
+
+@dataclass
+class DedupStats:
+    # merges completed with the analysis of an identical patch
+    reused: int = 0
+    saved_llm_calls: int = 0
+
+
+dedup_stats = DedupStats()
+
+
+def record_reuse(analysis: MergeRequestAnalysis, source_hash: str) -> None:
+    """Count one merge answered with *analysis*, first made for *source_hash*."""
+    from developerscope.triage import LLM_CALLS_PER_MERGE
+
+    usage = usage_stats.commits.get(source_hash)
+    if usage is not None:
+        calls = usage.requests
+    elif analysis["hiddenReasoning"].startswith("Local triage"):
+        calls = 0
+    else:
+        # analysed in an earlier run
+        calls = LLM_CALLS_PER_MERGE
+    dedup_stats.reused += 1
+    dedup_stats.saved_llm_calls += calls
+    profiling.count("dedup.reused")
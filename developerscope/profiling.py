@@ -0,0 +1,210 @@
+"""Timing spans and counters for a run, exported as a JSONL trace.
+
+Disabled unless ``DEVELOPERSCOPE_PROFILE`` is set (to ``1`` for a trace under
+``out/profile-<time>.jsonl`` or to a file path) or :func:`enable` is called.
+While disabled, :func:`span` returns a shared no-op context manager and
+:func:`count` returns immediately, so instrumented code pays one global lookup.
+
+    with profiling.span("llm.request", priority=0) as sp:
+        response = await ...
+        sp.set(tokens_in=response.usage.input_tokens)
+    profiling.count("llm.cache_hit")
+
+Keyword arguments of :func:`span` are labels; values passed to ``set`` are
+measurements and are also summed per span name. Every finished span is one
+``{"type": "span", ...}`` line in the trace; on :func:`disable` (or at exit) a
+``{"type": "summary", ...}`` line with per-span timing statistics and the
+counter totals is appended and the table printed.
+"""
+
+import atexit
+import json
+import os
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, IO
+
+
+class _NullSpan:
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def set(self, **values: int | float) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "labels", "values", "start")
+
+    def __init__(self, profiler: "Profiler", name: str, labels: dict[str, Any]):
+        self.profiler = profiler
+        self.name = name
+        self.labels = labels
+        self.values: dict[str, int | float] = {}
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.labels["error"] = exc_type.__name__
+        self.profiler.record(self.name, self.start, duration, self.labels, self.values)
+
+    def set(self, **values: int | float) -> None:
+        self.values.update(values)
+
+
+class Profiler:
+    """Collects spans and counters of one run and streams spans to *trace_path*."""
+
+    def __init__(self, trace_path: str | Path | None = None):
+        self.trace_path = Path(trace_path) if trace_path else None
+        self.started = time.perf_counter()
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        self.value_totals: dict[str, Counter[str]] = defaultdict(Counter)
+        # ints stay ints; a float sample (e.g. seconds) makes its counter a float
+        self.counters: dict[str, int | float] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = None
+        if self.trace_path is not None:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.trace_path, "a", encoding="utf-8")
+
+    def record(
+        self,
+        name: str,
+        start: float,
+        duration: float,
+        labels: dict[str, Any],
+        values: dict[str, int | float],
+    ) -> None:
+        with self._lock:
+            self.durations[name].append(duration)
+            self.value_totals[name].update(values)
+            if self._file is not None:
+                event = {
+                    "type": "span",
+                    "name": name,
+                    "start": round(start - self.started, 6),
+                    "duration": round(duration, 6),
+                    "thread": threading.get_ident(),
+                    **labels,
+                    **values,
+                }
+                self._file.write(json.dumps(event, default=str) + "\n")
+
+    def count(self, name: str, value: int | float = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            spans = {}
+            for name, values in sorted(self.durations.items()):
+                ordered = sorted(values)
+                spans[name] = {
+                    "count": len(values),
+                    "total": round(sum(values), 6),
+                    "mean": round(statistics.fmean(values), 6),
+                    "p50": round(ordered[len(ordered) // 2], 6),
+                    "p99": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 6),
+                    "max": round(ordered[-1], 6),
+                    **dict(sorted(self.value_totals[name].items())),
+                }
+            return {
+                "wall": round(time.perf_counter() - self.started, 6),
+                "spans": spans,
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def close(self) -> dict[str, Any]:
+        summary = self.summary()
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps({"type": "summary", **summary}) + "\n")
+                self._file.close()
+                self._file = None
+        return summary
+
+
+def format_summary(summary: dict[str, Any]) -> str:
+    """Render :meth:`Profiler.summary` as a plain-text table."""
+    lines = [
+        f"{'span':<28}{'count':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}  totals",
+    ]
+    for name, s in summary["spans"].items():
+        extra = ", ".join(
+            f"{k}={v:g}" for k, v in s.items()
+            if k not in ("count", "total", "mean", "p50", "p99", "max")
+        )
+        lines.append(
+            f"{name:<28}{s['count']:>8}{s['total']:>10.2f}{s['mean'] * 1e3:>10.1f}"
+            f"{s['p50'] * 1e3:>10.1f}{s['p99'] * 1e3:>10.1f}  {extra}"
+        )
+    if summary["counters"]:
+        lines.append("")
+        lines.extend(f"{name:<28}{value:>12g}" for name, value in summary["counters"].items())
+    lines.append(f"\nwall time: {summary['wall']:.2f}s")
+    return "\n".join(lines)
+
+
+_profiler: Profiler | None = None
+
+
+def get_profiler() -> Profiler | None:
+    return _profiler
+
+
+def enable(trace_path: str | Path | None = None) -> Profiler:
+    """Start collecting; spans are streamed to *trace_path* when given."""
+    global _profiler
+    if _profiler is not None:
+        _profiler.close()
+    _profiler = Profiler(trace_path)
+    return _profiler
+
+
+def disable(print_summary: bool = True) -> dict[str, Any] | None:
+    """Stop collecting, write the summary to the trace and return it."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    summary = profiler.close()
+    if print_summary:
+        print(format_summary(summary))
+    return summary
+
+
+def span(name: str, **labels: Any) -> _Span | _NullSpan:
+    profiler = _profiler
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, name, labels)
+
+
+def count(name: str, value: int | float = 1) -> None:
+    profiler = _profiler
+    if profiler is not None:
+        profiler.count(name, value)
+
+
+_env = os.environ.get("DEVELOPERSCOPE_PROFILE", "")
+if _env and _env != "0":
+    enable(
+        Path("out") / time.strftime("profile-%Y%m%d-%H%M%S.jsonl")
+        if _env == "1"
+        else _env
+    )
+    atexit.register(disable)
@@ -0,0 +1,72 @@
+"""Aggregates over finished analyses, kept up to date as each one lands.
+
+Every ``DetailedMergeRequestAnalysis`` is added to the rollup of its
+repository, author, branch, ISO week and month. A dashboard rendered from the
+rollups touches one small record per author/branch/window instead of every
+issue of every merge.
+"""
+
+from datetime import datetime, timezone
+from typing import Iterable
+
+from developerscope._types import (
+    DetailedMergeRequestAnalysis,
+    Rollup,
+    RollupScope,
+    Rollups,
+)
+
+REPO_KEY = ""
+
+
+def empty_rollup() -> Rollup:
+    return {
+        "merges": 0,
+        "issues": 0,
+        "severity": {},
+        "types": {},
+        "effort": {},
+        "halstead": 0.0,
+    }
+
+
+def add_analysis(rollup: Rollup, analysis: DetailedMergeRequestAnalysis) -> Rollup:
+    """Count *analysis* into *rollup* (in place) and return it."""
+    rollup["merges"] += 1
+    rollup["issues"] += len(analysis["issues"])
+    for issue in analysis["issues"]:
+        rollup["severity"][issue["level"]] = rollup["severity"].get(issue["level"], 0) + 1
+    rollup["types"][analysis["type"]] = rollup["types"].get(analysis["type"], 0) + 1
+    effort = analysis["effortEstimate"]
+    rollup["effort"][effort] = rollup["effort"].get(effort, 0) + 1
+    rollup["halstead"] += analysis.get("metrics", {}).get("halstedEffort", 0.0)
+    return rollup
+
+
+def rollup_keys(
+    author: str, branch: str, committed_at: int | None = None
+) -> list[tuple[RollupScope, str]]:
+    """The ``(scope, key)`` pairs one analysis contributes to."""
+    keys: list[tuple[RollupScope, str]] = [
+        ("repo", REPO_KEY),
+        ("author", author),
+        ("branch", branch),
+    ]
+    if committed_at is not None:
+        when = datetime.fromtimestamp(committed_at, timezone.utc)
+        year, week, _ = when.isocalendar()
+        keys.append(("week", f"{year}-W{week:02d}"))
+        keys.append(("month", f"{when.year}-{when.month:02d}"))
+    return keys
+
+
+def compute_rollups(
+    rows: Iterable[tuple[str, str, DetailedMergeRequestAnalysis]],
+) -> Rollups:
+    """Build every rollup from ``(author, branch, analysis)`` rows."""
+    rollups: Rollups = {}
+    for author, branch, analysis in rows:
+        for scope, key in rollup_keys(author, branch, analysis.get("committedAt")):
+            bucket = rollups.setdefault(scope, {})
+            add_analysis(bucket.setdefault(key, empty_rollup()), analysis)
+    return rollups
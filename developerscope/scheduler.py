@@ -0,0 +1,257 @@
+"""Adaptive-concurrency scheduler for LLM requests.
+
+Every request goes through :meth:`LLMScheduler.submit`, which
+
+* admits at most ``limit`` requests at a time, highest priority (lowest
+  number) first; ``limit`` grows by one after a window of successes and
+  halves on a rate limit or overload (AIMD),
+* waits for request-per-minute and token-per-minute budgets, and
+* retries rate limits, timeouts and 5xx errors with jittered exponential
+  backoff (or the provider's ``retry-after``), so no commit is dropped
+  because of a transient failure.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class _Budget:
+    """Token bucket refilled continuously at ``per_minute / 60`` per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def take(self, amount: float) -> None:
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.level >= amount:
+                self.level -= amount
+                return
+            await asyncio.sleep((amount - self.level) / self.rate)
+
+    def charge(self, amount: float) -> None:
+        """Correct an earlier estimate; the level may go negative (debt)."""
+        self._refill()
+        self.level -= amount
+
+
+@dataclass
+class SchedulerStats:
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    tokens: int = 0
+    limit_history: list[int] = field(default_factory=list)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        *,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_retries: int = 8,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.limit = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rpm = _Budget(requests_per_minute) if requests_per_minute else None
+        self.tpm = _Budget(tokens_per_minute) if tokens_per_minute else None
+        self.stats = SchedulerStats(limit_history=[initial_concurrency])
+
+        self._in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    # ── admission ────────────────────────────────────────────────
+
+    async def _acquire(self, priority: int) -> None:
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # the slot was handed to us already
+            raise
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.cancelled():
+                continue
+            self._in_flight += 1
+            future.set_result(None)
+
+    # ── AIMD ─────────────────────────────────────────────────────
+
+    def _on_success(self) -> None:
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_concurrency:
+            self._successes = 0
+            self._set_limit(self.limit + 1)
+
+    def _on_overload(self) -> None:
+        # Requests already in flight when the first 429 arrives will likely
+        # fail too; only back off once per couple of seconds.
+        now = time.monotonic()
+        if now - self._last_decrease < 2.0:
+            return
+        self._last_decrease = now
+        self._successes = 0
+        self._set_limit(max(self.min_concurrency, self.limit // 2))
+
+    def _set_limit(self, limit: int) -> None:
+        self.limit = limit
+        self.stats.limit_history.append(limit)
+        self._wake()
+
+    # ── retries ──────────────────────────────────────────────────
+
+    @staticmethod
+    def _status(exc: BaseException) -> int | None:
+        return getattr(exc, "status_code", None)
+
+    def _is_retryable(self, exc: BaseException) -> bool:
+        import openai
+
+        if isinstance(exc, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+            return True
+        return self._status(exc) in RETRYABLE_STATUS
+
+    def _delay(self, exc: BaseException, attempt: int) -> float:
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            if "retry-after-ms" in headers:
+                return float(headers["retry-after-ms"]) / 1000
+            if "retry-after" in headers:
+                return float(headers["retry-after"])
+        except ValueError:
+            pass
+        # "Full jitter": uniform over [0, capped exponential].
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    # ── public API ───────────────────────────────────────────────
+
+    async def submit(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        priority: int = 0,
+        tokens: int = 0,
+    ) -> T:
+        """Run *call* under the concurrency limit and budgets, retrying.
+
+        *call* must create a fresh request each time it is invoked. *tokens*
+        is the estimated request size; if the result reports ``usage`` the
+        token budget is corrected afterwards.
+        """
+        self.stats.submitted += 1
+        attempt = 0
+        while True:
+            await self._acquire(priority)
+            try:
+                if self.rpm is not None:
+                    await self.rpm.take(1)
+                if self.tpm is not None and tokens:
+                    await self.tpm.take(tokens)
+                result = await call()
+            except Exception as exc:
+                if not self._is_retryable(exc) or attempt >= self.max_retries:
+                    self.stats.failed += 1
+                    raise
+                if self._status(exc) == 429 or self._status(exc) in (502, 503):
+                    self.stats.rate_limited += 1
+                    self._on_overload()
+                error = exc
+            else:
+                self._on_success()
+                used = _usage_tokens(result)
+                self.stats.tokens += used
+                if self.tpm is not None and used:
+                    self.tpm.charge(used - tokens)
+                self.stats.completed += 1
+                return result
+            finally:
+                self._release()
+
+            self.stats.retries += 1
+            await asyncio.sleep(self._delay(error, attempt))
+            attempt += 1
+
+
+def _usage_tokens(result: Any) -> int:
+    usage = getattr(result, "usage", None)
+    return int(getattr(usage, "total_tokens", 0) or 0)
+
+
+def estimate_tokens(payload: Any) -> int:
+    """Rough request size: ~4 characters per token of the serialised input."""
+    return len(str(payload)) // 4 + 1
+
+
+_default_scheduler: LLMScheduler | None = None
+
+
+def _env_float(name: str) -> float | None:
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+def get_scheduler() -> LLMScheduler:
+    """Process-wide scheduler, configured from ``DEVELOPERSCOPE_*`` variables."""
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = LLMScheduler(
+            initial_concurrency=int(os.environ.get("DEVELOPERSCOPE_CONCURRENCY", 4)),
+            max_concurrency=int(os.environ.get("DEVELOPERSCOPE_MAX_CONCURRENCY", 32)),
+            requests_per_minute=_env_float("DEVELOPERSCOPE_RPM"),
+            tokens_per_minute=_env_float("DEVELOPERSCOPE_TPM"),
+        )
+    return _default_scheduler
+
+
+def set_scheduler(scheduler: LLMScheduler | None) -> None:
+    global _default_scheduler
+    _default_scheduler = scheduler
@@ -0,0 +1,211 @@
+"""Append-only NDJSON log of finished analyses.
+
+Each ``DetailedMergeRequestAnalysis`` is appended to ``out/<repo>.results.ndjson``
+as one :class:`ResultRecord` line the moment it completes; nothing is rewritten
+while a run is going. Readers stream the file a line at a time, so memory is
+bounded by one record plus the set of commit hashes already seen (used to drop
+the duplicate a crash between the append and the state commit can leave). A
+torn last line from a crash is skipped.
+
+    for analysis in AuthorResults(path, "alice"):
+        ...
+
+:func:`compact` rewrites the log without duplicates or torn lines, and
+:func:`export_authors` writes the ``out/<repo>/<author>.json`` files on demand.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import IO, Callable, Hashable, Iterator, TypeVar
+
+from developerscope._types import DetailedMergeRequestAnalysis, ResultRecord
+
+RESULTS_SUFFIX = ".results.ndjson"
+
+# Splitting keeps one spill file open per key; beyond this many they are
+# closed and reopened in append mode on demand.
+MAX_OPEN_SPILLS = 128
+
+
+class ResultSink:
+    """Appends result records to *path*, one flushed line each; thread-safe."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file: IO[str] | None = None
+
+    def _open(self) -> IO[str]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        torn = False
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        file = open(self.path, "a", encoding="utf-8")
+        if torn:
+            # Terminate a line cut short by a crash, or the next record
+            # would be glued to it and lost with it.
+            file.write("\n")
+        return file
+
+    def append(self, author: str, branch: str, analysis: DetailedMergeRequestAnalysis) -> None:
+        record: ResultRecord = {"author": author, "branch": branch, "analysis": analysis}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def iter_records(path: str | Path, author: str | None = None) -> Iterator[ResultRecord]:
+    """Stream the records of *path* (only *author*'s, if given), first one per commit."""
+    seen: set[str] = set()
+    try:
+        f = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.endswith("\n"):
+                break  # torn by a crash mid-write
+            try:
+                record: ResultRecord = json.loads(line)
+            except ValueError:
+                continue
+            if author is not None and record["author"] != author:
+                continue
+            commit_hash = record["analysis"]["commitHash"]
+            if commit_hash in seen:
+                continue
+            seen.add(commit_hash)
+            yield record
+
+
+class AuthorResults:
+    """Re-iterable view of one author's analyses in an NDJSON log.
+
+    Every iteration streams the file again; nothing is kept in memory.
+    """
+
+    def __init__(self, path: str | Path, author: str, summary: str = ""):
+        self.path = Path(path)
+        self.author = author
+        self.summary = summary
+
+    def __iter__(self) -> Iterator[DetailedMergeRequestAnalysis]:
+        for record in iter_records(self.path, self.author):
+            yield record["analysis"]
+
+
+Key = TypeVar("Key", bound=Hashable)
+
+
+def _split(
+    path: str | Path, directory: Path, key: Callable[[ResultRecord], Key]
+) -> dict[Key, Path]:
+    """One pass over *path*, appending every record to a spill file per *key*.
+
+    Returns the spill files in order of first appearance.
+    """
+    spills: dict[Key, Path] = {}
+    open_files: dict[Key, IO[str]] = {}
+    try:
+        for record in iter_records(path):
+            k = key(record)
+            file = open_files.get(k)
+            if file is None:
+                if len(open_files) >= MAX_OPEN_SPILLS:
+                    for f in open_files.values():
+                        f.close()
+                    open_files.clear()
+                spill = spills.setdefault(k, directory / f"{len(spills)}.ndjson")
+                file = open_files[k] = open(spill, "a", encoding="utf-8")
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        for f in open_files.values():
+            f.close()
+    return spills
+
+
+def split_by_author(path: str | Path, directory: str | Path) -> dict[str, Path]:
+    """Write each author's records to their own NDJSON file in *directory*."""
+    return _split(path, Path(directory), lambda r: r["author"])
+
+
+def compact(path: str | Path) -> int:
+    """Rewrite *path* without duplicate or torn records; returns how many remain.
+
+    Run it between runs – records appended meanwhile would be lost.
+    """
+    path = Path(path)
+    kept = 0
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as out:
+        for record in iter_records(path):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            kept += 1
+    os.replace(tmp, path)
+    return kept
+
+
+def _indented(obj: object, indent: str) -> str:
+    return indent + json.dumps(obj, indent=4, ensure_ascii=False).replace("\n", "\n" + indent)
+
+
+def export_authors(
+    path: str | Path,
+    author_dir: str | Path,
+    summaries: dict[str, str] | None = None,
+) -> list[Path]:
+    """Write ``<author_dir>/<author>.json`` (``AuthorsAnalysis``) from the log.
+
+    Streams: records are split into one spill file per author and branch, then
+    each author file is written branch by branch. Branches and merge requests
+    appear in the order the analyses completed. Returns the files written.
+    """
+    author_dir = Path(author_dir)
+    author_dir.mkdir(parents=True, exist_ok=True)
+    summaries = summaries or {}
+    written = []
+    with tempfile.TemporaryDirectory(dir=author_dir, prefix=".spill-") as tmp:
+        spills = _split(path, Path(tmp), lambda r: (r["author"], r["branch"]))
+        by_author: dict[str, list[tuple[str, Path]]] = {}
+        for (author, branch), spill in spills.items():
+            by_author.setdefault(author, []).append((branch, spill))
+
+        for author, branches in by_author.items():
+            # Same layout json.dump(..., indent=4) gives StateStore.export_json.
+            out_path = author_dir / f"{author}.json"
+            tmp_path = out_path.with_name(out_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                out.write("{\n")
+                out.write(f'    "author": {json.dumps(author, ensure_ascii=False)},\n')
+                out.write(f'    "summary": {json.dumps(summaries.get(author, ""), ensure_ascii=False)},\n')
+                out.write('    "branches": [\n')
+                for i, (branch, spill) in enumerate(branches):
+                    out.write("        {\n")
+                    out.write(f'            "branch": {json.dumps(branch, ensure_ascii=False)},\n')
+                    out.write('            "mergeRequests": [\n')
+                    first = True
+                    for record in iter_records(spill):
+                        if not first:
+                            out.write(",\n")
+                        out.write(_indented(record["analysis"], " " * 16))
+                        first = False
+                    out.write("\n            ]\n")
+                    out.write("        }" + ("," if i < len(branches) - 1 else "") + "\n")
+                out.write("    ]\n}")
+            os.replace(tmp_path, out_path)
+            written.append(out_path)
+    return written
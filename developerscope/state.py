@@ -0,0 +1,537 @@
+"""SQLite-backed run state for one analysed repository.
+
+Replaces rewriting ``out/<repo>.json`` and ``out/<repo>/<author>.json`` after
+every commit: each status change or finished analysis is a single indexed row
+update. The JSON layouts stay the exchange format – :meth:`StateStore.import_json`
+and :meth:`StateStore.export_json` convert in both directions. Finished
+analyses are also appended to ``out/<repo>.results.ndjson`` (see
+:mod:`developerscope.sink`).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, NamedTuple, cast
+
+from developerscope import profiling
+from developerscope._types import (
+    AuthorsAnalysis,
+    AuthorStats,
+    BranchStats,
+    CommitStatus,
+    DetailedMergeRequestAnalysis,
+    RepositoryStats,
+    Rollups,
+    StatusEnum,
+)
+from developerscope.patchid import PATCH_ID_VERSION
+from developerscope.rollups import add_analysis, compute_rollups, empty_rollup, rollup_keys
+from developerscope.sink import RESULTS_SUFFIX, ResultSink
+
+# NEW → PENDING when a worker claims a commit, PENDING → DONE when its analysis
+# lands, PENDING → NEW when the worker fails or a crashed run is resumed.
+ALLOWED_TRANSITIONS: dict[StatusEnum, tuple[StatusEnum, ...]] = {
+    "PENDING": ("NEW",),
+    "DONE": ("PENDING",),
+    "NEW": ("PENDING",),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    author TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS commits (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    commit_hash TEXT NOT NULL UNIQUE,
+    author TEXT NOT NULL REFERENCES authors(author),
+    branch TEXT NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('NEW', 'PENDING', 'DONE')),
+    updated_at REAL NOT NULL,
+    patch_id TEXT
+);
+CREATE INDEX IF NOT EXISTS commits_author ON commits(author, branch);
+CREATE INDEX IF NOT EXISTS commits_status ON commits(status);
+CREATE TABLE IF NOT EXISTS analyses (
+    commit_hash TEXT PRIMARY KEY REFERENCES commits(commit_hash),
+    analysis TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+"""
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class CommitRecord(NamedTuple):
+    commit_hash: str
+    author: str
+    branch: str
+    status: StatusEnum
+    # None until discovery fingerprinted it, "" for an empty diff
+    patch_id: str | None = None
+
+
+class StateStore:
+    """Run state of one repository, safe to share between threads and tasks.
+
+    Every thread gets its own connection; WAL mode lets readers proceed while
+    one writer commits, and ``busy_timeout`` queues concurrent writers.
+    """
+
+    def __init__(self, path: str | Path, results_path: str | Path | None = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self.results = ResultSink(results_path or self.path.with_suffix(RESULTS_SUFFIX))
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(commits)")}
+        if "patch_id" not in columns:  # stores from before patch-ids
+            self._conn.execute("ALTER TABLE commits ADD COLUMN patch_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS commits_patch ON commits(patch_id)")
+
+    def _write(self):
+        """``with self._write() as conn:`` – one IMMEDIATE transaction."""
+        return _Transaction(self._conn)
+
+    # ── repository / authors ─────────────────────────────────────
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def get_meta(self, key: str, default: str | None = None) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def add_author(self, author: str, name: str, email: str) -> None:
+        with self._write() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO authors (author, name, email) VALUES (?, ?, ?)",
+                (author, name, email),
+            )
+
+    def set_author_summary(self, author: str, summary: str) -> None:
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE authors SET summary = ? WHERE author = ?", (summary, author)
+            )
+
+    def authors(self) -> list[str]:
+        return [r[0] for r in self._conn.execute("SELECT author FROM authors ORDER BY rowid")]
+
+    # ── commits ──────────────────────────────────────────────────
+
+    def add_commit(
+        self,
+        commit_hash: str,
+        author: str,
+        branch: str,
+        status: StatusEnum = "NEW",
+        patch_id: str | None = None,
+    ) -> bool:
+        """Record a commit; returns False when it is already known."""
+        with self._write() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO commits"
+                " (commit_hash, author, branch, status, updated_at, patch_id)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (commit_hash, author, branch, status, time.time(), patch_id),
+            )
+        return cur.rowcount == 1
+
+    def get(self, commit_hash: str) -> CommitRecord | None:
+        row = self._conn.execute(
+            "SELECT commit_hash, author, branch, status, patch_id FROM commits"
+            " WHERE commit_hash = ?",
+            (commit_hash,),
+        ).fetchone()
+        return None if row is None else CommitRecord(*row)
+
+    def commits(
+        self, *, status: StatusEnum | None = None, author: str | None = None
+    ) -> Iterator[CommitRecord]:
+        query = "SELECT commit_hash, author, branch, status, patch_id FROM commits"
+        clauses: list[str] = []
+        params: list[str] = []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if author is not None:
+            clauses.append("author = ?")
+            params.append(author)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        for row in self._conn.execute(query + " ORDER BY seq", params).fetchall():
+            yield CommitRecord(*row)
+
+    def counts(self) -> dict[str, int]:
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM commits GROUP BY status")
+        return dict(rows.fetchall())
+
+    def twins(self, commit_hash: str, status: StatusEnum = "NEW") -> list[CommitRecord]:
+        """Other commits in *status* with the same (non-empty) patch-id."""
+        rows = self._conn.execute(
+            "SELECT t.commit_hash, t.author, t.branch, t.status, t.patch_id"
+            " FROM commits c JOIN commits t ON t.patch_id = c.patch_id"
+            " WHERE c.commit_hash = ? AND c.patch_id != '' AND t.commit_hash != c.commit_hash"
+            " AND t.status = ? ORDER BY t.seq",
+            (commit_hash, status),
+        )
+        return [CommitRecord(*row) for row in rows.fetchall()]
+
+    def author_counts(self) -> dict[str, tuple[int, int]]:
+        """``{author: (merges, merges DONE)}``."""
+        rows = self._conn.execute(
+            "SELECT author, COUNT(*), SUM(status = 'DONE') FROM commits GROUP BY author"
+        )
+        return {author: (total, done) for author, total, done in rows.fetchall()}
+
+    def transition(self, commit_hash: str, status: StatusEnum) -> None:
+        """Move *commit_hash* to *status*, atomically checking the current one."""
+        allowed = ALLOWED_TRANSITIONS[status]
+        with self._write() as conn:
+            cur = conn.execute(
+                f"UPDATE commits SET status = ?, updated_at = ? WHERE commit_hash = ?"
+                f" AND status IN ({','.join('?' * len(allowed))})",
+                (status, time.time(), commit_hash, *allowed),
+            )
+            if cur.rowcount != 1:
+                row = conn.execute(
+                    "SELECT status FROM commits WHERE commit_hash = ?", (commit_hash,)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(f"Commit {commit_hash} is not tracked")
+                raise InvalidTransition(f"{commit_hash}: {row[0]} -> {status}")
+
+    def claim(self, commit_hash: str) -> bool:
+        """NEW → PENDING; False when another worker got there first."""
+        try:
+            self.transition(commit_hash, "PENDING")
+        except InvalidTransition:
+            return False
+        return True
+
+    def release(self, commit_hash: str) -> None:
+        """PENDING → NEW, e.g. after a failed analysis."""
+        self.transition(commit_hash, "NEW")
+
+    def reset_pending(self) -> int:
+        """Return every PENDING commit to NEW (resume after a crash)."""
+        with self._write() as conn:
+            cur = conn.execute(
+                "UPDATE commits SET status = 'NEW', updated_at = ? WHERE status = 'PENDING'",
+                (time.time(),),
+            )
+        return cur.rowcount
+
+    def complete(self, analysis: DetailedMergeRequestAnalysis) -> None:
+        """Store *analysis*, move its commit PENDING → DONE and update the
+        rollups, all in one transaction."""
+        commit_hash = analysis["commitHash"]
+        with profiling.span("state.complete"), self._write() as conn:
+            cur = conn.execute(
+                "UPDATE commits SET status = 'DONE', updated_at = ?"
+                " WHERE commit_hash = ? AND status = 'PENDING'",
+                (time.time(), commit_hash),
+            )
+            if cur.rowcount != 1:
+                raise InvalidTransition(f"{commit_hash}: not PENDING")
+            conn.execute(
+                "INSERT OR REPLACE INTO analyses (commit_hash, analysis) VALUES (?, ?)",
+                (commit_hash, json.dumps(analysis, ensure_ascii=False)),
+            )
+            author, branch = conn.execute(
+                "SELECT author, branch FROM commits WHERE commit_hash = ?", (commit_hash,)
+            ).fetchone()
+            # Appended before COMMIT: a failed write rolls the commit back to
+            # PENDING, a crash after it at worst leaves a duplicate line.
+            self.results.append(author, branch, analysis)
+            for scope, key in rollup_keys(author, branch, analysis.get("committedAt")):
+                row = conn.execute(
+                    "SELECT data FROM rollups WHERE scope = ? AND key = ?", (scope, key)
+                ).fetchone()
+                rollup = add_analysis(json.loads(row[0]) if row else empty_rollup(), analysis)
+                conn.execute(
+                    "INSERT OR REPLACE INTO rollups (scope, key, data) VALUES (?, ?, ?)",
+                    (scope, key, json.dumps(rollup, ensure_ascii=False)),
+                )
+
+    def analysis(self, commit_hash: str) -> DetailedMergeRequestAnalysis | None:
+        row = self._conn.execute(
+            "SELECT analysis FROM analyses WHERE commit_hash = ?", (commit_hash,)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def analysis_by_patch(self, patch_id: str) -> DetailedMergeRequestAnalysis | None:
+        """The analysis of a DONE commit with this (non-empty) patch-id, if any."""
+        if not patch_id:
+            return None
+        row = self._conn.execute(
+            "SELECT a.analysis FROM commits c JOIN analyses a ON a.commit_hash = c.commit_hash"
+            " WHERE c.patch_id = ? AND c.status = 'DONE' ORDER BY c.seq LIMIT 1",
+            (patch_id,),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    # ── rollups ──────────────────────────────────────────────────
+
+    def rollups(self) -> Rollups:
+        result: Rollups = {}
+        for scope, key, data in self._conn.execute(
+            "SELECT scope, key, data FROM rollups ORDER BY scope, key"
+        ):
+            result.setdefault(scope, {})[key] = json.loads(data)
+        return result
+
+    def rebuild_rollups(self) -> None:
+        """Recompute every rollup from the stored analyses."""
+        with self._write() as conn:
+            rows = conn.execute(
+                "SELECT c.author, c.branch, a.analysis FROM analyses a"
+                " JOIN commits c ON c.commit_hash = a.commit_hash ORDER BY c.seq"
+            ).fetchall()
+            rollups = compute_rollups(
+                (author, branch, json.loads(analysis)) for author, branch, analysis in rows
+            )
+            conn.execute("DELETE FROM rollups")
+            conn.executemany(
+                "INSERT INTO rollups (scope, key, data) VALUES (?, ?, ?)",
+                [
+                    (scope, key, json.dumps(rollup, ensure_ascii=False))
+                    for scope, by_key in rollups.items()
+                    for key, rollup in by_key.items()
+                ],
+            )
+
+    # ── JSON layouts ─────────────────────────────────────────────
+
+    def import_json(self, stats_path: str | Path, author_dir: str | Path | None = None) -> None:
+        """Load ``out/<repo>.json`` and, if present, ``out/<repo>/<author>.json``.
+
+        Existing rows win, so importing twice is harmless.
+        """
+        from developerscope.analyzer import extract_username
+
+        stats_path = Path(stats_path)
+        with open(stats_path, encoding="utf-8") as f:
+            stats: RepositoryStats = json.load(f)
+        if author_dir is None:
+            author_dir = stats_path.with_suffix("")
+
+        now = time.time()
+        with self._write() as conn:
+            for key in ("url", "status"):
+                conn.execute(
+                    "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)", (key, stats[key])
+                )
+            if "watermarks" in stats:
+                # Discovery owns the watermarks: the JSON side is always newer.
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('watermarks', ?)",
+                    (json.dumps(stats["watermarks"]),),
+                )
+            # Discovery owns the patch-ids too. Ids of an older version are
+            # wrong, not merely stale: forget them until discovery recomputes.
+            patch_ids_current = stats.get("patchIdVersion") == PATCH_ID_VERSION
+            if patch_ids_current:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('patch_id_version', ?)",
+                    (str(PATCH_ID_VERSION),),
+                )
+            else:
+                conn.execute("DELETE FROM meta WHERE key = 'patch_id_version'")
+                conn.execute("UPDATE commits SET patch_id = NULL WHERE patch_id IS NOT NULL")
+            for author_stats in stats["authors"]:
+                author = extract_username(author_stats["email"])
+                conn.execute(
+                    "INSERT OR IGNORE INTO authors (author, name, email) VALUES (?, ?, ?)",
+                    (author, author_stats["name"], author_stats["email"]),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO commits"
+                    " (commit_hash, author, branch, status, updated_at, patch_id)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            c["commitHash"], author, branch["name"], c["status"], now,
+                            c.get("patchId") if patch_ids_current else None,
+                        )
+                        for branch in author_stats["branches"]
+                        for c in branch["commits"]
+                    ],
+                )
+                if patch_ids_current:
+                    conn.executemany(
+                        "UPDATE commits SET patch_id = ? WHERE commit_hash = ? AND patch_id IS NOT ?",
+                        [
+                            (c["patchId"], c["commitHash"], c["patchId"])
+                            for branch in author_stats["branches"]
+                            for c in branch["commits"]
+                            if "patchId" in c
+                        ],
+                    )
+
+            for author_file in sorted(Path(author_dir).glob("*.json")):
+                with open(author_file, encoding="utf-8") as f:
+                    author_analysis: AuthorsAnalysis = json.load(f)
+                if author_analysis.get("summary"):
+                    conn.execute(
+                        "UPDATE authors SET summary = ? WHERE author = ? AND summary IS NULL",
+                        (author_analysis["summary"], author_analysis["author"]),
+                    )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO analyses (commit_hash, analysis)"
+                    " SELECT ?, ? WHERE EXISTS"
+                    " (SELECT 1 FROM commits WHERE commit_hash = ?)",
+                    [
+                        (mr["commitHash"], json.dumps(mr, ensure_ascii=False), mr["commitHash"])
+                        for branch in author_analysis["branches"]
+                        for mr in branch["mergeRequests"]
+                    ],
+                )
+        self.rebuild_rollups()
+        if not self.results.path.exists():
+            self._backfill_results()
+
+    def _backfill_results(self) -> None:
+        """Seed the NDJSON log with analyses stored before it existed."""
+        for author, branch, analysis in self._conn.execute(
+            "SELECT c.author, c.branch, a.analysis FROM analyses a"
+            " JOIN commits c ON c.commit_hash = a.commit_hash ORDER BY c.seq"
+        ):
+            self.results.append(author, branch, json.loads(analysis))
+
+    def repo_stats(self) -> RepositoryStats:
+        authors: dict[str, AuthorStats] = {}
+        branches: dict[tuple[str, str], BranchStats] = {}
+        for author, name, email in self._conn.execute(
+            "SELECT author, name, email FROM authors ORDER BY rowid"
+        ):
+            authors[author] = {"name": name, "email": email, "branches": []}
+        for record in self.commits():
+            key = (record.author, record.branch)
+            if key not in branches:
+                branches[key] = {"name": record.branch, "commits": []}
+                authors[record.author]["branches"].append(branches[key])
+            commit: CommitStatus = {"commitHash": record.commit_hash, "status": record.status}
+            if record.patch_id is not None:
+                commit["patchId"] = record.patch_id
+            branches[key]["commits"].append(commit)
+        stats = cast(
+            RepositoryStats,
+            {
+                "url": self.get_meta("url", ""),
+                "authors": list(authors.values()),
+                "status": self.get_meta("status", "NEW"),
+            },
+        )
+        watermarks = self.get_meta("watermarks")
+        if watermarks is not None:
+            stats["watermarks"] = json.loads(watermarks)
+        patch_id_version = self.get_meta("patch_id_version")
+        if patch_id_version is not None:
+            stats["patchIdVersion"] = int(patch_id_version)
+        return stats
+
+    def author_summaries(self) -> dict[str, str]:
+        return {
+            author: summary
+            for author, summary in self._conn.execute(
+                "SELECT author, summary FROM authors WHERE summary IS NOT NULL"
+            )
+        }
+
+    def author_analysis(self, author: str) -> AuthorsAnalysis:
+        row = self._conn.execute(
+            "SELECT summary FROM authors WHERE author = ?", (author,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Author '{author}' not found in the state store")
+
+        branches: dict[str, list[DetailedMergeRequestAnalysis]] = {}
+        for branch, analysis in self._conn.execute(
+            "SELECT c.branch, a.analysis FROM commits c"
+            " LEFT JOIN analyses a ON a.commit_hash = c.commit_hash"
+            " WHERE c.author = ? ORDER BY c.seq",
+            (author,),
+        ):
+            branches.setdefault(branch, [])
+            if analysis is not None:
+                branches[branch].append(json.loads(analysis))
+
+        result: AuthorsAnalysis = {
+            "author": author,
+            "summary": row[0] or "",
+            "branches": [
+                {"branch": b, "mergeRequests": mrs} for b, mrs in branches.items()
+            ],
+        }
+        return result
+
+    def export_json(self, stats_path: str | Path, author_dir: str | Path | None = None) -> None:
+        """Write the store back out in the ``out/<repo>.json`` layouts, plus the
+        rollups as ``out/<repo>.rollups.json``."""
+        with profiling.span("state.export"):
+            self._export_json(Path(stats_path), author_dir)
+
+    def _export_json(self, stats_path: Path, author_dir: str | Path | None) -> None:
+        author_dir = Path(author_dir or stats_path.with_suffix(""))
+        author_dir.mkdir(parents=True, exist_ok=True)
+
+        with open(stats_path, "w", encoding="utf-8") as f:
+            json.dump(self.repo_stats(), f, indent=4, ensure_ascii=False)
+        for author in self.authors():
+            with open(author_dir / f"{author}.json", "w", encoding="utf-8") as f:
+                json.dump(self.author_analysis(author), f, indent=4, ensure_ascii=False)
+        with open(stats_path.with_suffix(".rollups.json"), "w", encoding="utf-8") as f:
+            json.dump(self.rollups(), f, indent=4, ensure_ascii=False)
+
+    def close(self) -> None:
+        self.results.close()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
@@ -0,0 +1,117 @@
+"""Discovery of merge commits into ``RepositoryStats``.
+
+A full run walks the whole history; an incremental run only walks what was
+added since the per-branch watermarks stored by the previous run and appends
+the new merges. Either way, statuses of merges already in the stats are kept.
+Every merge gets the patch-id of its first-parent patch (see
+:mod:`developerscope.patchid`).
+"""
+
+from pathlib import Path
+from typing import Iterable
+
+import git
+
+from developerscope._types import (
+    AuthorStats,
+    BranchStats,
+    CommitStatus,
+    RepositoryStats,
+)
+from developerscope.analyzer import extract_username, iter_merge_commits
+from developerscope.patchid import PATCH_ID_VERSION, patch_ids
+
+
+def extract_repo_commit_stats(
+    stats: RepositoryStats, repo_path: str | Path, incremental: bool = False
+) -> int:
+    """Fill ``stats["authors"]`` with the merges of *repo_path*; return how many are new.
+
+    With *incremental*, history below ``stats["watermarks"]`` is not walked
+    again and the existing authors/branches are extended in place. Without it
+    the layout is rebuilt from scratch. ``stats["watermarks"]`` is set to the
+    current branch heads in both cases.
+    """
+    git_repo = git.Repo(str(repo_path))
+    heads = {head.name: head.commit.hexsha for head in git_repo.branches}
+
+    known: dict[str, CommitStatus] = {
+        commit["commitHash"]: commit
+        for author in stats["authors"]
+        for branch in author["branches"]
+        for commit in branch["commits"]
+    }
+    if stats.get("patchIdVersion") != PATCH_ID_VERSION:
+        for commit in known.values():
+            commit.pop("patchId", None)
+
+    authors_map: dict[str, AuthorStats] = {}
+    branches_map: dict[tuple[str, str], BranchStats] = {}
+    watermarks: Iterable[str]
+    if incremental:
+        for author in stats["authors"]:
+            username = extract_username(author["email"])
+            authors_map[username] = author
+            for branch_stats in author["branches"]:
+                branches_map[username, branch_stats["name"]] = branch_stats
+        watermarks = stats.get("watermarks", {}).values()
+    else:
+        watermarks = ()
+
+    # Discovery streams newest first; new merges are appended oldest first.
+    discovered: dict[tuple[str, str], list[CommitStatus]] = {}
+    added = 0
+
+    # One walk over the graph. A merge reachable from several branches
+    # is recorded once, under the first of them (the checked-out one if any).
+    for merge in iter_merge_commits(str(repo_path), list(heads), exclude=watermarks):
+        if incremental and merge["commitHash"] in known:
+            continue
+        username = extract_username(merge["authorEmail"])
+        email, name = merge["authorEmail"], merge["authorName"]
+
+        if username not in authors_map:
+            authors_map[username] = {"name": name, "email": email, "branches": []}
+        elif not incremental and (email, name) < (
+            authors_map[username]["email"],
+            authors_map[username]["name"],
+        ):
+            # pick first (stable)
+            authors_map[username]["email"] = email
+            authors_map[username]["name"] = name
+
+        branch_name = merge["branches"][0]
+        if (username, branch_name) not in branches_map:
+            branches_map[username, branch_name] = {"name": branch_name, "commits": []}
+            authors_map[username]["branches"].append(branches_map[username, branch_name])
+
+        previous = known.get(merge["commitHash"])
+        commit_status: CommitStatus = {
+            "commitHash": merge["commitHash"],
+            "status": previous["status"] if previous else "NEW",
+        }
+        if previous and "patchId" in previous:
+            commit_status["patchId"] = previous["patchId"]
+        added += previous is None
+        discovered.setdefault((username, branch_name), []).append(commit_status)
+
+    for key, commits in discovered.items():
+        commits.reverse()
+        branches_map[key]["commits"].extend(commits)
+
+    stats["authors"] = list(authors_map.values())
+    stats["watermarks"] = heads
+
+    # New merges, and once those discovered before patch-ids or with older ones.
+    missing = [
+        commit
+        for author in stats["authors"]
+        for branch in author["branches"]
+        for commit in branch["commits"]
+        if "patchId" not in commit
+    ]
+    ids = patch_ids(git_repo.git_dir, (c["commitHash"] for c in missing))
+    for commit in missing:
+        commit["patchId"] = ids.get(commit["commitHash"], "")
+    stats["patchIdVersion"] = PATCH_ID_VERSION
+    return added
@@ -0,0 +1,157 @@
+"""Rule-based triage that answers trivial merges without the LLM.
+
+Looks at the changed paths, the size of the first-parent diff and the Halstead
+breakdown. When a merge is confidently trivial – nothing changed, only docs,
+only lock/dependency files, or only comments and whitespace in Python – a
+``MergeRequestAnalysis`` is produced locally and both LLM passes are skipped.
+"""
+
+import fnmatch
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Sequence
+
+import git
+
+from developerscope._types import EffortEnum, MergeRequestAnalysis, MergeRequestEnum
+from developerscope.diffbuilder import diff_path, first_parent_patches
+from developerscope.haslted import halstead_breakdown
+
+# fnmatch's "*" also matches "/", so "docs/*.txt" covers nested directories.
+# Plain text counts as docs only there: CMakeLists.txt and the like are build
+# code, and docs/ itself can hold code (docs/conf.py, Sphinx extensions).
+DOC_PATTERNS = (
+    "*.md",
+    "*.rst",
+    "*.adoc",
+    "docs/*.txt",
+    "doc/*.txt",
+    "LICENSE*",
+    "AUTHORS*",
+    "CHANGELOG*",
+    "CHANGES*",
+)
+
+DEPENDENCY_PATTERNS = (
+    "*.lock",
+    "package-lock.json",
+    "pnpm-lock.yaml",
+    "requirements*.txt",
+    "*-requirements.txt",
+    "constraints*.txt",
+    "go.mod",
+    "go.sum",
+)
+
+# Above this many changed lines a merge is never considered trivial by the
+# comment-only rule – a human-sized review is warranted anyway.
+MAX_COMMENT_ONLY_LINES = 400
+MINOR_DOC_LINES = 500
+
+# Each skipped merge saves the analyse and the review pass.
+LLM_CALLS_PER_MERGE = 2
+
+
+@dataclass
+class TriageStats:
+    examined: int = 0
+    skipped: int = 0
+    by_rule: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def saved_llm_calls(self) -> int:
+        return self.skipped * LLM_CALLS_PER_MERGE
+
+
+triage_stats = TriageStats()
+
+
+def _matches(path: str, patterns: tuple[str, ...]) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def _changed_lines(patch: str | bytes) -> list[str]:
+    text = patch if isinstance(patch, str) else patch.decode("utf-8", errors="replace")
+    return [
+        line[1:]
+        for line in text.splitlines()
+        if line[:1] in "+-" and not line.startswith(("+++", "---"))
+    ]
+
+
+def _analysis(
+    rule: str, type_: MergeRequestEnum, effort: EffortEnum, reason: str
+) -> MergeRequestAnalysis:
+    triage_stats.skipped += 1
+    triage_stats.by_rule[rule] += 1
+    return {
+        "hiddenReasoning": f"Local triage ({rule}): {reason}",
+        "type": type_,
+        "issues": [],
+        "effortEstimate": effort,
+    }
+
+
+def triage_commit(
+    commit: git.Commit, diffs: Sequence[git.Diff] | None = None
+) -> MergeRequestAnalysis | None:
+    """Return a local analysis for a trivial merge, or ``None`` to use the LLM.
+
+    *diffs* is the first-parent diff with patches when the caller already has it.
+    """
+    triage_stats.examined += 1
+    if not commit.parents:
+        return None
+
+    diffs = list(diffs) if diffs is not None else list(first_parent_patches(commit))
+    if not diffs:
+        return _analysis(
+            "empty-diff",
+            "Chore / dependency bump",
+            "Trivial",
+            "the merge does not change the first parent's tree.",
+        )
+
+    paths = [diff_path(d) for d in diffs]
+    changed = sum(len(_changed_lines(d.diff or b"")) for d in diffs)
+
+    if all(_matches(p, DEPENDENCY_PATTERNS) for p in paths):
+        return _analysis(
+            "dependencies",
+            "Chore / dependency bump",
+            "Trivial",
+            f"only dependency manifests or lock files changed: {', '.join(paths)}.",
+        )
+
+    if all(_matches(p, DOC_PATTERNS) for p in paths):
+        return _analysis(
+            "docs",
+            "Docs / comments",
+            "Trivial" if changed <= MINOR_DOC_LINES else "Minor",
+            f"only documentation changed ({len(paths)} files, {changed} lines).",
+        )
+
+    code = [d for d, p in zip(diffs, paths) if not _matches(p, DOC_PATTERNS)]
+    if changed <= MAX_COMMENT_ONLY_LINES and all(
+        diff_path(d).endswith(".py")
+        # a rename, mode change, added or deleted file is more than its comments
+        and not (d.renamed_file or d.new_file or d.deleted_file)
+        and bool(_changed_lines(d.diff or b""))
+        for d in code
+    ):
+        if any(f["delta"] != 0 for f in halstead_breakdown(commit)["files"]):
+            return None
+        for diff in code:
+            for line in _changed_lines(diff.diff or b""):
+                stripped = line.strip()
+                if stripped and not stripped.startswith("#"):
+                    return None
+        return _analysis(
+            "comments",
+            "Docs / comments",
+            "Trivial",
+            "only comments, whitespace or docs changed and the Halstead effort is unchanged.",
+        )
+
+    return None
@@ -0,0 +1,79 @@
+"""Per-commit LLM token accounting.
+
+Every request made for a commit adds its ``usage`` (input, provider-cached
+input and output tokens) to that commit's :class:`CommitUsage`. A review pass
+that is skipped records the input tokens it would have sent, so the savings of
+the conditional review and of prompt caching can be read per commit:
+
+    usage_stats.commits[sha].summary()
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+
+@dataclass
+class CommitUsage:
+    requests: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    # how the review pass ran; "" until the commit got that far, "skipped" when
+    # the "auto" mode found nothing for it to keep, "off" in the "never" mode
+    review: Literal["", "skipped", "off", "short", "full"] = ""
+    # estimated input tokens of a review pass that "auto" did not send
+    skipped_tokens: int = 0
+
+    def add(self, usage: Any) -> None:
+        """Add a Responses API ``usage`` object."""
+        self.requests += 1
+        self.input_tokens += usage.input_tokens or 0
+        self.output_tokens += usage.output_tokens or 0
+        details = getattr(usage, "input_tokens_details", None)
+        self.cached_tokens += getattr(details, "cached_tokens", None) or 0
+
+    @property
+    def saved_tokens(self) -> int:
+        """Input tokens not paid for at full price: cached plus never sent."""
+        return self.cached_tokens + self.skipped_tokens
+
+    def summary(self) -> str:
+        sent = self.input_tokens + self.skipped_tokens
+        share = self.saved_tokens / sent if sent else 0.0
+        return (
+            f"{self.requests} request(s), {self.input_tokens} in ({self.cached_tokens} cached), "
+            f"{self.output_tokens} out; review {self.review or 'n/a'}; "
+            f"saved ~{self.saved_tokens} input tokens ({share:.0%})"
+        )
+
+
+@dataclass
+class UsageStats:
+    commits: dict[str, CommitUsage] = field(default_factory=dict)
+
+    def for_commit(self, hexsha: str) -> CommitUsage:
+        return self.commits.setdefault(hexsha, CommitUsage())
+
+    def totals(self) -> dict[str, int]:
+        totals = {
+            "commits": len(self.commits),
+            "requests": 0,
+            "input_tokens": 0,
+            "cached_tokens": 0,
+            "output_tokens": 0,
+            "skipped_tokens": 0,
+            "reviews_skipped": 0,
+            "reviews_short": 0,
+        }
+        for usage in self.commits.values():
+            totals["requests"] += usage.requests
+            totals["input_tokens"] += usage.input_tokens
+            totals["cached_tokens"] += usage.cached_tokens
+            totals["output_tokens"] += usage.output_tokens
+            totals["skipped_tokens"] += usage.skipped_tokens
+            totals["reviews_skipped"] += usage.review == "skipped"
+            totals["reviews_short"] += usage.review == "short"
+        return totals
+
+
+usage_stats = UsageStats()
@@ -0,0 +1,307 @@
+"""Effort-ranked work queue for the LLM stage.
+
+Before any LLM call, every NEW merge gets cheap signals: the Halstead effort
+delta (scored in the metrics pool, which also warms the metric cache for the
+prompts), the first-parent diff size and touched sensitive paths (one
+``git diff-tree --stdin`` for all merges) and how much of its author's work is
+already analysed. :func:`plan` orders the merges by :func:`priority_score`;
+with *fair_share* it instead serves authors round-robin, least analysed first,
+so one prolific author cannot starve the others. :func:`drain` then feeds the
+LLM stage in that order until a :class:`Budget` of tokens, time or merges runs
+out – a partial run has analysed the most valuable merges it could.
+
+    signals = await collect_signals(store, repo)
+    run = await drain(plan(signals, fair_share=True), process, budget=Budget(tokens=2_000_000))
+"""
+
+import asyncio
+import heapq
+import math
+import re
+import subprocess
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable
+
+import git
+
+from developerscope import profiling
+from developerscope.metrics import get_metrics_service
+from developerscope.state import CommitRecord, StateStore
+from developerscope.usage import usage_stats
+
+# Paths whose changes deserve a reviewer's attention first.
+SENSITIVE_PATH_PATTERN = re.compile(
+    r"auth|login|passw|secret|token|credential|session|crypt|security|permission"
+    r"|acl|payment|billing|migration|\.sql$|dockerfile|\.github/workflows/|settings"
+    r"|config|requirements.*\.txt$|setup\.py$|pyproject\.toml$",
+    re.IGNORECASE,
+)
+
+# priority_score = log1p(|Halstead delta|) + LINES_WEIGHT * log1p(changed lines)
+#                + SENSITIVE_WEIGHT * min(sensitive paths, MAX_SENSITIVE)
+#                + COVERAGE_WEIGHT * (1 - share of the author's merges done)
+LINES_WEIGHT = 0.5
+SENSITIVE_WEIGHT = 1.5
+MAX_SENSITIVE = 3
+COVERAGE_WEIGHT = 2.0
+
+
+@dataclass
+class MergeSignals:
+    commit_hash: str
+    author: str
+    branch: str
+    # absolute Halstead effort delta of the Python files
+    halstead: float = 0.0
+    # lines added plus deleted against the first parent
+    lines: int = 0
+    sensitive: list[str] = field(default_factory=list)
+    # share of the author's merges analysed before this run
+    coverage: float = 0.0
+    score: float = 0.0
+    # manifest name, when several repositories share one queue
+    repo: str = ""
+    # git patch-id; merges sharing one are analysed once
+    patch_id: str = ""
+
+
+def priority_score(signals: MergeSignals) -> float:
+    return (
+        math.log1p(signals.halstead)
+        + LINES_WEIGHT * math.log1p(signals.lines)
+        + SENSITIVE_WEIGHT * min(len(signals.sensitive), MAX_SENSITIVE)
+        + COVERAGE_WEIGHT * (1 - signals.coverage)
+    )
+
+
+def diff_stats(repo: git.Repo, hexshas: Iterable[str]) -> dict[str, tuple[int, list[str]]]:
+    """``{sha: (changed lines, changed paths)}`` against each commit's first parent.
+
+    One ``git diff-tree --stdin`` process answers for every commit.
+    """
+    hexshas = list(hexshas)
+    if not hexshas:
+        return {}
+    proc = subprocess.run(
+        # not `-m --first-parent`: with --stdin that diffs merges against every parent
+        ["git", f"--git-dir={repo.git_dir}", "diff-tree", "--stdin", "-r", "-z",
+         "--diff-merges=first-parent", "--root", "--numstat", "--no-renames"],
+        input="".join(f"{sha}\n" for sha in hexshas).encode(),
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    lines: dict[str, int] = dict.fromkeys(hexshas, 0)
+    paths: dict[str, list[str]] = {sha: [] for sha in hexshas}
+    current: str | None = None
+    for field_ in proc.stdout.decode("utf-8", errors="replace").split("\0"):
+        if "\t" not in field_:
+            # header: the commit the next entries belong to; a repeated one adds to it
+            if field_ in lines:
+                current = field_
+            continue
+        if current is None:
+            continue
+        added, deleted, path = field_.split("\t", 2)
+        # "-" for binary files
+        lines[current] += (int(added) if added.isdigit() else 0) + (int(deleted) if deleted.isdigit() else 0)
+        paths[current].append(path)
+    return {sha: (lines[sha], paths[sha]) for sha in hexshas}
+
+
+async def collect_signals(
+    store: StateStore, repo: git.Repo, records: list[CommitRecord] | None = None
+) -> list[MergeSignals]:
+    """Signals for *records* (default: every NEW merge), scored by :func:`priority_score`."""
+    if records is None:
+        records = list(store.commits(status="NEW"))
+    if not records:
+        return []
+    with profiling.span("queue.signals", merges=len(records)):
+        counts = store.author_counts()
+        hexshas = [r.commit_hash for r in records]
+        diffs = diff_stats(repo, hexshas)
+        metrics = await get_metrics_service().score_commits([repo.commit(h) for h in hexshas])
+
+        result = []
+        for record in records:
+            lines, paths = diffs[record.commit_hash]
+            signals = MergeSignals(
+                commit_hash=record.commit_hash,
+                author=record.author,
+                branch=record.branch,
+                halstead=abs(metrics[record.commit_hash]["halstedEffort"]),
+                lines=lines,
+                sensitive=[p for p in paths if SENSITIVE_PATH_PATTERN.search(p)],
+                coverage=counts[record.author][1] / counts[record.author][0],
+                patch_id=record.patch_id or "",
+            )
+            signals.score = priority_score(signals)
+            result.append(signals)
+    return result
+
+
+def plan(
+    signals: list[MergeSignals],
+    fair_share: bool = False,
+    done: dict[str, int] | None = None,
+) -> list[MergeSignals]:
+    """Order *signals* for the LLM stage, most valuable first.
+
+    Of merges with the same patch-id only the best-ranked is kept: its
+    analysis is fanned out to the others when it completes.
+
+    With *fair_share* the next merge always goes to the author with the fewest
+    merges analysed so far – *done* before the run plus those already planned –
+    and it is their best remaining one, so every author is covered before
+    anyone gets a second helping.
+    """
+    ranked = []
+    patches: set[str] = set()
+    for s in sorted(signals, key=lambda s: s.score, reverse=True):
+        if s.patch_id:
+            if s.patch_id in patches:
+                continue
+            patches.add(s.patch_id)
+        ranked.append(s)
+    if not fair_share:
+        return ranked
+
+    by_author: dict[str, list[MergeSignals]] = {}
+    for s in ranked:
+        by_author.setdefault(s.author, []).append(s)
+    done = done or {}
+    heap = [
+        (done.get(author, 0), -queue[0].score, author, 0)
+        for author, queue in by_author.items()
+    ]
+    heapq.heapify(heap)
+    ordered = []
+    while heap:
+        served, _, author, index = heapq.heappop(heap)
+        queue = by_author[author]
+        ordered.append(queue[index])
+        if index + 1 < len(queue):
+            heapq.heappush(heap, (served + 1, -queue[index + 1].score, author, index + 1))
+    return ordered
+
+
+def merge_plans(plans: list[list[MergeSignals]]) -> list[MergeSignals]:
+    """Interleave several planned queues into one, keeping each queue's order.
+
+    The next merge is always the highest-scored head of any queue, so the
+    repositories of a multi-repository run compete on value.
+    """
+    heap = [(-queue[0].score, i, 0) for i, queue in enumerate(plans) if queue]
+    heapq.heapify(heap)
+    merged = []
+    while heap:
+        _, i, index = heapq.heappop(heap)
+        merged.append(plans[i][index])
+        if index + 1 < len(plans[i]):
+            heapq.heappush(heap, (-plans[i][index + 1].score, i, index + 1))
+    return merged
+
+
+@dataclass
+class Budget:
+    """Stops :func:`drain` from starting more merges; ``None`` is unlimited.
+
+    *tokens* counts input plus output tokens in ``usage_stats``. Merges in
+    flight are charged the average cost of the finished ones that reached the
+    LLM, so the run stops near the budget instead of a full wave of merges past
+    it. While that average rests on few merges, concurrency ramps up with it:
+    at most twice as many merges in flight as have been priced (one at first).
+    """
+
+    tokens: int | None = None
+    seconds: float | None = None
+    merges: int | None = None
+    started: float = field(default_factory=time.monotonic)
+    # finished merges that made LLM requests, and their tokens
+    priced: int = 0
+    priced_tokens: int = 0
+
+    def spent_tokens(self) -> int:
+        totals = usage_stats.totals()
+        return totals["input_tokens"] + totals["output_tokens"]
+
+    def exhausted(self, started_merges: int, in_flight: int) -> str | None:
+        """Why no further merge may start, or ``None`` while there is budget left."""
+        if self.merges is not None and started_merges >= self.merges:
+            return f"merge limit {self.merges}"
+        if self.seconds is not None and time.monotonic() - self.started >= self.seconds:
+            return f"time budget {self.seconds:g}s"
+        if self.tokens is not None:
+            spent = self.spent_tokens()
+            average = self.priced_tokens / self.priced if self.priced else 0
+            if spent + in_flight * average >= self.tokens:
+                return f"token budget {self.tokens}"
+        return None
+
+    def must_wait(self, in_flight: int) -> bool:
+        """True while a token budget cannot price one more merge in flight yet."""
+        return self.tokens is not None and in_flight >= max(1, 2 * self.priced)
+
+    def finished(self, commit_hash: str) -> None:
+        """Learn what the merge *commit_hash* cost."""
+        usage = usage_stats.commits.get(commit_hash)
+        if usage is not None and usage.requests:
+            self.priced += 1
+            self.priced_tokens += usage.input_tokens + usage.output_tokens
+
+
+@dataclass
+class QueueRun:
+    planned: int
+    started: int = 0
+    succeeded: int = 0
+    # why the run stopped early; "" when the queue was drained
+    stopped: str = ""
+
+
+async def drain(
+    queue: list[MergeSignals],
+    process: Callable[[MergeSignals, int], Awaitable[bool]],
+    *,
+    concurrency: int = 20,
+    budget: Budget | None = None,
+    progress: Callable[[QueueRun], None] | None = None,
+) -> QueueRun:
+    """Run ``process(signals, rank)`` over *queue* in order, *concurrency* at a time.
+
+    *rank* is the position in the queue, meant as the LLM request priority.
+    Merges are started strictly in queue order; once *budget* is exhausted no
+    new one starts and those in flight finish.
+    """
+    budget = budget or Budget()
+    run = QueueRun(planned=len(queue))
+    pending = iter(enumerate(queue))
+    in_flight = 0
+    finished = asyncio.Event()
+
+    async def worker() -> None:
+        nonlocal in_flight
+        for rank, signals in pending:
+            while budget.must_wait(in_flight):
+                finished.clear()
+                await finished.wait()
+            reason = budget.exhausted(run.started, in_flight)
+            if reason:
+                run.stopped = run.stopped or reason
+                return
+            run.started += 1
+            in_flight += 1
+            try:
+                ok = await process(signals, rank)
+            finally:
+                in_flight -= 1
+                budget.finished(signals.commit_hash)
+                finished.set()
+            # not `run.succeeded += await ...`: that reads the count before the await
+            run.succeeded += bool(ok)
+            if progress is not None:
+                progress(run)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return run
@@ -5,21 +5,34 @@ file.
 
 Dependencies
 ------------
-pip install jinja2 markdown matplotlib
+pip install jinja2 markdown
+pip install matplotlib  # optional, only for DEVELOPERSCOPE_CHARTS=png
 """
 
 from __future__ import annotations
+import argparse
 import base64
+import hashlib
 import io
 import json
 import os
+import tempfile
 from collections import Counter
-from typing import Any, Literal, NotRequired, TypedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Literal, NotRequired, TypedDict
 
-import matplotlib.pyplot as plt
 import markdown  # markdown -> HTML
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from developerscope.charts import bar_svg, pie_svg, scatter_svg
+from developerscope.rollups import empty_rollup
+from developerscope.sink import AuthorResults, split_by_author
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
 # if your project already defines these in a shared module, import them; otherwise
 # uncomment the fallback definitions below.
 from developerscope._types import *  # noqa: F401  (brings in EffortEnum, IssueEnum, etc.)
@@ -80,12 +93,25 @@ TYPE_COLOURS: dict[MergeRequestEnum, str] = {
     "Chore / dependency bump": "#e377c2",
 }
 
+# "svg" draws the charts as inline SVG; "png" renders them with matplotlib
+# (imported only then) and embeds base64 images.
+CHART_BACKEND: Literal["svg", "png"] = (
+    "png" if os.environ.get("DEVELOPERSCOPE_CHARTS") == "png" else "svg"
+)
+
 # ────────────────────────────────────────────────────────────────
 # Helper functions
 # ────────────────────────────────────────────────────────────────
 
+def _pyplot():
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
 def fig_to_base64(fig: plt.Figure) -> str:
     """Return the figure as a base‑64‑encoded PNG (no newlines)."""
+    plt = _pyplot()
     buf = io.BytesIO()
     fig.savefig(buf, format="png", bbox_inches="tight")
     plt.close(fig)
@@ -93,8 +119,27 @@ def fig_to_base64(fig: plt.Figure) -> str:
     return base64.b64encode(buf.read()).decode()
 
 
+def _img(b64: str, alt: str) -> str:
+    return f'<img src="data:image/png;base64,{b64}" alt="{alt}" />'
+
+
 def build_scatter(points: list[tuple[EffortEnum, int, MergeRequestEnum]]) -> str:
+    """Create the effort‑vs‑issues scatter plot as embeddable HTML."""
+    if CHART_BACKEND == "svg":
+        return scatter_svg(points, EFFORT_ORDER, TYPE_COLOURS)
+    return _img(build_scatter_png(points), "Scatter: issues vs. effort")
+
+
+def build_type_pie(type_counts: Counter[MergeRequestEnum]) -> str:
+    """Build a pie chart of commit types as embeddable HTML."""
+    if CHART_BACKEND == "svg":
+        return pie_svg(type_counts, TYPE_COLOURS)
+    return _img(build_type_pie_png(type_counts), "Pie chart: commits by type")
+
+
+def build_scatter_png(points: list[tuple[EffortEnum, int, MergeRequestEnum]]) -> str:
     """Create the effort‑vs‑issues scatter plot and return it as base‑64 PNG."""
+    plt = _pyplot()
     x = [EFFORT_ORDER.index(p[0]) for p in points]
     y = [p[1] for p in points]
     colours = [TYPE_COLOURS[p[2]] for p in points]
@@ -118,8 +163,9 @@ def build_scatter(points: list[tuple[EffortEnum, int, MergeRequestEnum]]) -> str
     return fig_to_base64(fig)
 
 
-def build_type_pie(type_counts: Counter[MergeRequestEnum]) -> str:
+def build_type_pie_png(type_counts: Counter[MergeRequestEnum]) -> str:
     """Build a pie chart of commit types and return as base‑64 PNG."""
+    plt = _pyplot()
     if not type_counts:
         # Empty chart placeholder
         fig, ax = plt.subplots(figsize=(5, 5))
@@ -144,87 +190,355 @@ def build_type_pie(type_counts: Counter[MergeRequestEnum]) -> str:
     return fig_to_base64(fig)
 
 
+# ────────────────────────────────────────────────────────────────
+# Template and markdown caches (one per process)
+# ────────────────────────────────────────────────────────────────
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_FILE = "_report_template.html"
+DASHBOARD_TEMPLATE_FILE = "_dashboard_template.html"
+
+# Bounded, so streaming a very long history does not grow it without limit.
+MARKDOWN_CACHE_SIZE = 4096
+_markdown_cache: dict[bytes, str] = {}
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str = TEMPLATE_FILE):
+    """Compile a template once per process."""
+    env = Environment(
+        loader=FileSystemLoader(searchpath=TEMPLATE_DIR),
+        autoescape=select_autoescape(["html"]),
+    )
+    # create default template if missing (developer can edit afterwards)
+    template_path = os.path.join(TEMPLATE_DIR, name)
+    if name == TEMPLATE_FILE and not os.path.exists(template_path):
+        with open(template_path, "w", encoding="utf-8") as tf:
+            tf.write(DEFAULT_TEMPLATE)
+    return env.get_template(name)
+
+
+def render_markdown(text: str) -> str:
+    """``markdown.markdown`` memoized by the hash of *text*."""
+    key = hashlib.sha1(text.encode("utf-8")).digest()
+    html = _markdown_cache.get(key)
+    if html is None:
+        if len(_markdown_cache) >= MARKDOWN_CACHE_SIZE:
+            _markdown_cache.clear()
+        html = _markdown_cache[key] = markdown.markdown(text)
+    return html
+
+
 # ────────────────────────────────────────────────────────────────
 # Main entry point
 # ────────────────────────────────────────────────────────────────
 
+def _merge_requests(analysis: AuthorsAnalysis) -> list[DetailedMergeRequestAnalysis]:
+    return [mr for br in analysis["branches"] for mr in br["mergeRequests"]]
+
+
+def _issue_rows(merge_requests: Iterable[DetailedMergeRequestAnalysis]) -> Iterator[dict[str, Any]]:
+    """Issues table rows, most severe first, produced lazily.
+
+    One pass over *merge_requests* per severity level instead of collecting and
+    sorting every issue – the order is the same as a stable sort by severity.
+    """
+    for level in SEVERITY_ORDER:
+        for mr in merge_requests:
+            for iss in mr["issues"]:
+                if iss["level"] != level:
+                    continue
+                yield {
+                    "level": iss["level"],
+                    "filePath": iss["filePath"],
+                    "line": iss["line"],
+                    "issue": iss["issue"],
+                    "proposedSolution": iss["proposedSolution"],
+                    "markdownSolution": render_markdown(iss["proposedSolution"]),
+                    "commit": mr["commitHash"],
+                }
+
+
+def stream_report(
+    merge_requests: Iterable[DetailedMergeRequestAnalysis],
+    author: str,
+    repo_url: str,
+    summary: str,
+) -> Iterator[str]:
+    """Yield the HTML report in chunks.
+
+    *merge_requests* is iterated several times (charts, then the issues of each
+    severity); pass a list or a re-iterable stream such as
+    :class:`developerscope.sink.AuthorResults`.
+    """
+    # ── Data collection ────────────────────────────────────────
+    scatter_pts: list[tuple[EffortEnum, int, MergeRequestEnum]] = []
+    type_counter: Counter[MergeRequestEnum] = Counter()
+    for mr in merge_requests:
+        # Scatter point
+        scatter_pts.append((mr["effortEstimate"], len(mr["issues"]), mr["type"]))
+        # Type pie
+        type_counter[mr["type"]] += 1
+
+    # ── Generate charts ────────────────────────────────────────
+    scatter_chart = build_scatter(scatter_pts)
+    pie_chart = build_type_pie(type_counter)
+
+    # ── Render HTML ────────────────────────────────────────────
+    return get_template().generate(
+        author=author,
+        summary=summary,
+        scatter_chart=scatter_chart,
+        pie_chart=pie_chart,
+        repo_url=repo_url.rstrip("/"),
+        issues=_issue_rows(merge_requests),
+    )
+
+
+def render_report(analysis: AuthorsAnalysis, repo_url: str, summary: str) -> str:
+    """Return the HTML report for *analysis*."""
+    return "".join(
+        stream_report(_merge_requests(analysis), analysis["author"], repo_url, summary)
+    )
+
+
 def generate_report(
-    analysis: AuthorsAnalysis,
+    analysis: AuthorsAnalysis | AuthorResults,
     repo_url: str,
     summary: str,
     output_dir: str = "out",
 ) -> str:
-    """Build the HTML report and write it to *output_dir/{author}.html*."""
-    author = analysis["author"]
+    """Build the HTML report and write it to *output_dir/{author}.html*.
+
+    *analysis* is either an ``AuthorsAnalysis`` or an
+    :class:`~developerscope.sink.AuthorResults` stream over the NDJSON results,
+    which is rendered without loading the author's analyses into memory.
+    """
+    if isinstance(analysis, AuthorResults):
+        out_html = _write_report(analysis, analysis.author, repo_url, summary, output_dir)
+    else:
+        out_html = _write_report(
+            _merge_requests(analysis), analysis["author"], repo_url, summary, output_dir
+        )
+    print(f"✅  Report written to {out_html}")
+    return out_html
+
+
+def _write_report(
+    merge_requests: Iterable[DetailedMergeRequestAnalysis],
+    author: str,
+    repo_url: str,
+    summary: str,
+    output_dir: str,
+) -> str:
     out_html = os.path.join(output_dir, f"{author}.html")
     os.makedirs(output_dir, exist_ok=True)
+    with open(out_html, "w", encoding="utf-8") as fh:
+        fh.writelines(stream_report(merge_requests, author, repo_url, summary))
+    return out_html
 
-    # ── Data collection ────────────────────────────────────────
-    scatter_pts: list[tuple[EffortEnum, int, MergeRequestEnum]] = []
-    issues: list[dict[str, Any]] = []
-    type_counter: Counter[MergeRequestEnum] = Counter()
 
-    for br in analysis["branches"]:
-        for mr in br["mergeRequests"]:
-            # Scatter point
-            scatter_pts.append((mr["effortEstimate"], len(mr["issues"]), mr["type"]))
-            # Type pie
-            type_counter[mr["type"]] += 1
-            # Issues table
-            for iss in mr["issues"]:
-                issues.append(
-                    {
-                        "level": iss["level"],
-                        "filePath": iss["filePath"],
-                        "line": iss["line"],
-                        "issue": iss["issue"],
-                        "proposedSolution": iss["proposedSolution"],
-                        "commit": mr["commitHash"],
-                    }
-                )
-
-    # Sort issues by severity
-    issues.sort(key=lambda i: SEVERITY_ORDER.index(i["level"]))
+# ────────────────────────────────────────────────────────────────
+# Batch entry point – every author of a repository
+# ────────────────────────────────────────────────────────────────
+MANIFEST_FILE = ".reports.json"
 
-    # ── Generate charts ────────────────────────────────────────
-    scatter_b64 = build_scatter(scatter_pts)
-    pie_b64 = build_type_pie(type_counter)
 
-    # ── Jinja2 template env ────────────────────────────────────
-    env = Environment(
-        loader=FileSystemLoader(searchpath=os.path.dirname(__file__) or "."),
-        autoescape=select_autoescape(["html"]),
+class ManifestEntry(TypedDict):
+    # _input_hash of the author JSON, and the report rendered from it
+    hash: str
+    report: str
+
+
+def _input_hash(author_json: Path, repo_url: str) -> str:
+    """Hash of everything a report depends on: input JSON, repo URL, chart
+    backend, template."""
+    digest = hashlib.sha256(author_json.read_bytes())
+    digest.update(repo_url.encode())
+    digest.update(CHART_BACKEND.encode())
+    digest.update(Path(TEMPLATE_DIR, TEMPLATE_FILE).read_bytes())
+    return digest.hexdigest()
+
+
+def _init_worker() -> None:
+    get_template()
+
+
+def _render_author(author_json: str, repo_url: str, output_dir: str) -> str:
+    with open(author_json, "r", encoding="utf-8") as jf:
+        analysis: AuthorsAnalysis = json.load(jf)
+    out_html = os.path.join(output_dir, f"{analysis['author']}.html")
+    html = render_report(analysis, repo_url, analysis.get("summary", ""))
+    with open(out_html, "w", encoding="utf-8") as fh:
+        fh.write(html)
+    return out_html
+
+
+def generate_reports(
+    author_dir: str,
+    repo_url: str,
+    output_dir: str = "out",
+    workers: int | None = None,
+    force: bool = False,
+) -> dict[str, str]:
+    """Render a report for every ``<author>.json`` in *author_dir*.
+
+    Authors are rendered in a process pool. Reports whose inputs hash the same
+    as at the last run (recorded in *output_dir*/.reports.json, together with
+    the report each one was rendered to) are skipped
+    unless *force* is set. Returns ``{author json: report path}`` for the
+    reports that were rendered. If an author fails, the others are still
+    rendered and recorded, then the first error is raised.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    get_template()  # make sure the template exists before hashing it
+    manifest_path = Path(output_dir, MANIFEST_FILE)
+    manifest: dict[str, ManifestEntry] = (
+        json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
     )
-    template_file = "_report_template.html"
 
-    # create default template if missing (developer can edit afterwards)
-    if not os.path.exists(template_file):
-        with open(template_file, "w", encoding="utf-8") as tf:
-            tf.write(DEFAULT_TEMPLATE)
+    todo: dict[str, str] = {}
+    skipped = 0
+    for author_json in sorted(Path(author_dir).glob("*.json")):
+        digest = _input_hash(author_json, repo_url)
+        # The report is named after the JSON's "author", which need not be its stem.
+        entry = manifest.get(str(author_json))
+        if (
+            not force
+            and isinstance(entry, dict)  # not a bare hash from older runs
+            and entry["hash"] == digest
+            and Path(entry["report"]).exists()
+        ):
+            skipped += 1
+            continue
+        todo[str(author_json)] = digest
+
+    rendered: dict[str, str] = {}
+    failed: dict[str, Exception] = {}
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(_render_author, path, repo_url, output_dir): path
+                for path in todo
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    rendered[path] = future.result()
+                except Exception as e:
+                    failed[path] = e
+                    continue
+                manifest[path] = {"hash": todo[path], "report": rendered[path]}
 
-    template = env.get_template(template_file)
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"✅  {len(rendered)} report(s) written to {output_dir}, {skipped} unchanged")
+    if failed:
+        path, error = next(iter(failed.items()))
+        raise RuntimeError(f"{len(failed)} report(s) failed, first {path}: {error}") from error
+    return rendered
 
-    # ── Render HTML ────────────────────────────────────────────
-    html = template.render(
-        author=author,
-        summary=summary,
-        scatter_b64=scatter_b64,
-        pie_b64=pie_b64,
-        repo_url=repo_url.rstrip("/"),
-        issues=[
-            {
-                **i,
-                "markdownSolution": markdown.markdown(i["proposedSolution"]),
+
+def _render_results(spill: str, author: str, summary: str, repo_url: str, output_dir: str) -> str:
+    return _write_report(AuthorResults(spill, author), author, repo_url, summary, output_dir)
+
+
+def generate_reports_from_results(
+    results_path: str,
+    repo_url: str,
+    output_dir: str = "out",
+    workers: int | None = None,
+    summaries: dict[str, str] | None = None,
+) -> dict[str, str]:
+    """Render every author's report straight from ``out/<repo>.results.ndjson``.
+
+    The log is split into one temporary file per author in a single pass and
+    each report streamed from its file, so no author's analyses are ever held
+    in memory at once. Returns ``{author: report path}``.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    summaries = summaries or {}
+    rendered: dict[str, str] = {}
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix=".spill-") as tmp:
+        spills = split_by_author(results_path, tmp)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(
+                    _render_results,
+                    str(spill),
+                    author,
+                    summaries.get(author, ""),
+                    repo_url,
+                    output_dir,
+                ): author
+                for author, spill in spills.items()
             }
-            for i in issues
-        ],
+            for future in as_completed(futures):
+                rendered[futures[future]] = future.result()
+    print(f"✅  {len(rendered)} report(s) written to {output_dir}")
+    return rendered
+
+
+# ────────────────────────────────────────────────────────────────
+# Team dashboard – rendered from rollups only
+# ────────────────────────────────────────────────────────────────
+WEEKS_SHOWN = 52
+
+
+def _rollup_row(name: str, rollup: Rollup, link: str | None = None) -> dict[str, Any]:
+    types = rollup["types"]
+    efforts = [e for e in EFFORT_ORDER for _ in range(rollup["effort"].get(e, 0))]
+    return {
+        "name": name,
+        "link": link,
+        "rollup": rollup,
+        "main_type": max(types, key=types.__getitem__) if types else "–",
+        # median effort class
+        "typical_effort": efforts[len(efforts) // 2] if efforts else "–",
+    }
+
+
+def render_dashboard(rollups: Rollups, repo_url: str) -> str:
+    """Return the team dashboard HTML for *rollups* (see developerscope.rollups)."""
+    repo = rollups.get("repo", {}).get("", empty_rollup())
+    authors = sorted(
+        rollups.get("author", {}).items(), key=lambda kv: (-kv[1]["merges"], kv[0])
+    )
+    branches = sorted(
+        rollups.get("branch", {}).items(), key=lambda kv: (-kv[1]["merges"], kv[0])
     )
+    weeks = sorted(rollups.get("week", {}).items())[-WEEKS_SHOWN:]
 
-    # ── Write file ─────────────────────────────────────────────
-    with open(out_html, "w", encoding="utf-8") as fh:
-        fh.write(html)
+    return get_template(DASHBOARD_TEMPLATE_FILE).render(
+        repo_name=repo_url.rstrip("/").split("/")[-1],
+        repo_url=repo_url.rstrip("/"),
+        repo=repo,
+        severity_order=SEVERITY_ORDER,
+        type_chart=pie_svg(repo["types"], TYPE_COLOURS, "Merges by type"),
+        effort_chart=bar_svg(
+            [(e, repo["effort"].get(e, 0)) for e in EFFORT_ORDER], "Effort histogram"
+        ),
+        weekly_merges_chart=bar_svg(
+            [(week, r["merges"]) for week, r in weeks], "Merges per week"
+        ),
+        weekly_issues_chart=bar_svg(
+            [(week, r["issues"]) for week, r in weeks], "Issues per week", colour="#d62728"
+        ),
+        authors=[_rollup_row(a, r, f"{a}.html") for a, r in authors],
+        branches=[_rollup_row(b, r) for b, r in branches],
+    )
 
-    print(f"✅  Report written to {out_html}")
+
+def generate_dashboard(
+    rollups: Rollups,
+    repo_url: str,
+    output_dir: str = "out",
+    filename: str = "dashboard.html",
+) -> str:
+    """Write the team dashboard to *output_dir/filename*."""
+    os.makedirs(output_dir, exist_ok=True)
+    out_html = os.path.join(output_dir, filename)
+    with open(out_html, "w", encoding="utf-8") as fh:
+        fh.write(render_dashboard(rollups, repo_url))
+    print(f"✅  Dashboard written to {out_html}")
     return out_html
 
 
@@ -270,7 +584,7 @@ DEFAULT_TEMPLATE = """
     gap: 2.5rem;
     align-items: start;
   }
-  .left img { width: 100%; height: auto; border: 1px solid #ddd; border-radius: 4px; margin-bottom: 1.4rem; }
+  .left img, .left svg { width: 100%; height: auto; border: 1px solid #ddd; border-radius: 4px; margin-bottom: 1.4rem; }
   .right { overflow-x: auto; }
 
   /* ------- table ------- */
@@ -331,10 +645,10 @@ DEFAULT_TEMPLATE = """
 <div class="report-container">
   <div class="left">
     <h2>Issues vs. Effort</h2>
-    <img src="data:image/png;base64,{{ scatter_b64 }}" alt="Scatter: issues vs. effort" />
+    {{ scatter_chart | safe }}
 
     <h2>Commits by type</h2>
-    <img src="data:image/png;base64,{{ pie_b64 }}" alt="Pie chart: commits by type" />
+    {{ pie_chart | safe }}
   </div>
 
   <div class="right">
@@ -364,13 +678,23 @@ DEFAULT_TEMPLATE = """
 
 
 # ────────────────────────────────────────────────────────────────
-# Demo runner
+# Command line
 # ────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    AUTHOR = "iliyas.dzabbarov"
-    IN_JSON = f"out/codeutils/{AUTHOR}.json"
-    REPO_URL = "https://github.com/developerscope/codeutils"
-    with open(IN_JSON, "r", encoding="utf-8") as jf:
-        analysis_obj: AuthorsAnalysis = json.load(jf)
-
-    generate_report(analysis_obj, REPO_URL, analysis_obj["summary"])
+    parser = argparse.ArgumentParser(description="Render author reports for a repository.")
+    parser.add_argument("author_dir", nargs="?", default="out/codeutils")
+    parser.add_argument("--results", help="out/<repo>.results.ndjson – stream reports from it instead")
+    parser.add_argument("--repo-url", default="https://github.com/developerscope/codeutils")
+    parser.add_argument("--output-dir", default="out")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="re-render unchanged authors too")
+    parser.add_argument("--rollups", help="out/<repo>.rollups.json – also render the team dashboard")
+    args = parser.parse_args()
+
+    if args.results:
+        generate_reports_from_results(args.results, args.repo_url, args.output_dir, args.workers)
+    else:
+        generate_reports(args.author_dir, args.repo_url, args.output_dir, args.workers, args.force)
+    if args.rollups:
+        with open(args.rollups, "r", encoding="utf-8") as jf:
+            generate_dashboard(json.load(jf), args.repo_url, args.output_dir)